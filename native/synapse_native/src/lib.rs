@@ -1,7 +1,9 @@
 use pyo3::prelude::*;
-use std::collections::HashMap;
+use std::collections::{HashMap, HashSet, VecDeque};
+use std::io;
 use std::mem;
 use std::os::unix::io::RawFd;
+use std::time::{Duration, Instant};
 
 const ACTION_NONE: u8 = 0;
 const ACTION_PASSTHROUGH: u8 = 1;
@@ -10,11 +12,17 @@ const ACTION_SCROLL_UP: u8 = 3;
 const ACTION_SCROLL_DOWN: u8 = 4;
 const ACTION_BTN_X1: u8 = 5;
 const ACTION_BTN_X2: u8 = 6;
+const ACTION_BUTTON: u8 = 7;
+const ACTION_CLICK: u8 = 8;
+const ACTION_DRAG_LOCK: u8 = 9;
+const ACTION_NUDGE: u8 = 10;
 
 const EV_SYN: u16 = 0x00;
 const EV_KEY: u16 = 0x01;
 const EV_REL: u16 = 0x02;
 const SYN_REPORT: u16 = 0x00;
+const REL_X: u16 = 0x00;
+const REL_Y: u16 = 0x01;
 const REL_WHEEL: u16 = 0x08;
 const BTN_SIDE: u16 = 0x113;
 const BTN_EXTRA: u16 = 0x114;
@@ -38,6 +46,7 @@ impl Default for InputEvent {
 struct MappingEntry {
     action_type: u8,
     target_code: u16,
+    argument: i32,
 }
 
 #[inline(always)]
@@ -60,29 +69,98 @@ fn emit_syn(fd: RawFd) {
     emit_event(fd, EV_SYN, SYN_REPORT, 0);
 }
 
+/// Queues `clicks` press/release pairs of `button`, `interval` apart; the
+/// first click is due immediately.
+fn queue_clicks(pending: &mut VecDeque<(Instant, u16, i32)>, button: u16, argument: i32) {
+    let clicks = (argument & 0xff).max(1);
+    let interval = Duration::from_millis(((argument >> 8) & 0xffff) as u64);
+    let mut due = pending.back().map(|entry| entry.0).unwrap_or_else(Instant::now);
+    for index in 0..clicks {
+        if index > 0 {
+            due += interval;
+        }
+        pending.push_back((due, button, 1));
+        pending.push_back((due, button, 0));
+    }
+}
+
+/// Writes every queued click whose time has come.
+fn flush_clicks(fd: RawFd, pending: &mut VecDeque<(Instant, u16, i32)>) {
+    let now = Instant::now();
+    while let Some(&(due, code, value)) = pending.front() {
+        if due > now {
+            break;
+        }
+        pending.pop_front();
+        emit_event(fd, EV_KEY, code, value);
+        emit_syn(fd);
+    }
+}
+
+/// Waits until `fd` is readable or the next queued click is due; returns
+/// false when only the timer fired. Interrupted polls are retried.
+fn wait_readable(fd: RawFd, pending: &VecDeque<(Instant, u16, i32)>) -> io::Result<bool> {
+    loop {
+        let timeout = match pending.front() {
+            None => return Ok(true),
+            Some(&(due, _, _)) => {
+                let remaining = due.saturating_duration_since(Instant::now()).as_micros();
+                ((remaining + 999) / 1000) as libc::c_int
+            }
+        };
+        let mut poll_fd = libc::pollfd { fd, events: libc::POLLIN, revents: 0 };
+        let ready = unsafe { libc::poll(&mut poll_fd, 1, timeout) };
+        if ready >= 0 {
+            return Ok(ready != 0);
+        }
+        let error = io::Error::last_os_error();
+        if error.kind() != io::ErrorKind::Interrupted {
+            return Err(error);
+        }
+    }
+}
+
+/// Remap loop over raw fds.
+///
+/// `mappings` maps an EV_KEY code to `(action, target code, argument)`; the
+/// argument packs per-action data (click count/interval for ACTION_CLICK,
+/// dx/dy for ACTION_NUDGE) as built by `synapse_like.remap.native`.
 #[pyfunction]
 fn run_remap_loop(
     py: Python,
     input_fd: RawFd,
     uinput_fd: RawFd,
-    mappings: HashMap<u16, (u8, u16)>,
+    mappings: HashMap<u16, (u8, u16, i32)>,
 ) -> PyResult<()> {
     let max_code = mappings.keys().max().copied().unwrap_or(0) as usize;
-    let mut fast_map =
-        vec![MappingEntry { action_type: ACTION_PASSTHROUGH, target_code: 0 }; max_code + 1];
+    let mut fast_map = vec![
+        MappingEntry { action_type: ACTION_PASSTHROUGH, target_code: 0, argument: 0 };
+        max_code + 1
+    ];
 
-    for (code, (action, target)) in mappings {
+    for (code, (action, target, argument)) in mappings {
         fast_map[code as usize] = MappingEntry {
             action_type: action,
             target_code: target,
+            argument,
         };
     }
 
     py.allow_threads(|| {
         let mut ev = InputEvent::default();
         let size = mem::size_of::<InputEvent>();
+        let mut pending_clicks: VecDeque<(Instant, u16, i32)> = VecDeque::new();
+        let mut locked_buttons: HashSet<u16> = HashSet::new();
 
         loop {
+            match wait_readable(input_fd, &pending_clicks) {
+                Ok(true) => {}
+                Ok(false) => {
+                    flush_clicks(uinput_fd, &mut pending_clicks);
+                    continue;
+                }
+                Err(_) => break,
+            }
             let ret = unsafe { libc::read(input_fd, &mut ev as *mut _ as *mut libc::c_void, size) };
             if ret <= 0 {
                 break;
@@ -133,6 +211,40 @@ fn run_remap_loop(
                             emit_syn(uinput_fd);
                         }
                     }
+                    ACTION_BUTTON => {
+                        if ev.value != 2 {
+                            emit_event(uinput_fd, EV_KEY, mapping.target_code, ev.value);
+                            emit_syn(uinput_fd);
+                        }
+                    }
+                    ACTION_CLICK => {
+                        if ev.value == 1 {
+                            queue_clicks(&mut pending_clicks, mapping.target_code, mapping.argument);
+                        }
+                    }
+                    ACTION_DRAG_LOCK => {
+                        if ev.value == 1 {
+                            let locked = locked_buttons.insert(mapping.target_code);
+                            if !locked {
+                                locked_buttons.remove(&mapping.target_code);
+                            }
+                            emit_event(uinput_fd, EV_KEY, mapping.target_code, locked as i32);
+                            emit_syn(uinput_fd);
+                        }
+                    }
+                    ACTION_NUDGE => {
+                        if ev.value != 0 {
+                            let dx = (mapping.argument >> 16) as i16 as i32;
+                            let dy = mapping.argument as i16 as i32;
+                            if dx != 0 {
+                                emit_event(uinput_fd, EV_REL, REL_X, dx);
+                            }
+                            if dy != 0 {
+                                emit_event(uinput_fd, EV_REL, REL_Y, dy);
+                            }
+                            emit_syn(uinput_fd);
+                        }
+                    }
                     _ => unsafe {
                         libc::write(uinput_fd, &ev as *const _ as *const libc::c_void, size);
                     },
@@ -142,6 +254,7 @@ fn run_remap_loop(
                     libc::write(uinput_fd, &ev as *const _ as *const libc::c_void, size);
                 }
             }
+            flush_clicks(uinput_fd, &mut pending_clicks);
         }
     });
 
@@ -0,0 +1,113 @@
+"""
+Import-time check for the synapse-like entry points.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter for
+each entry point, reports the cumulative import time and fails when an entry
+fails to import, loads a dependency it should only load on first use
+(PySide6, rich tables, pyudev, openrazer) or exceeds its time budget. An
+entry is only skipped when a dependency listed in OPTIONAL_DEPENDENCIES is
+not installed.
+
+    python scripts/importtime.py                # all entry points
+    python scripts/importtime.py --entry cli --budget-ms 150
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# name -> (module, top-level packages it must not import)
+ENTRY_POINTS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "cli": ("synapse_like.cli.main", ("PySide6", "rich.table", "pyudev", "openrazer", "evdev")),
+    "daemon-client": ("synapse_like.daemon.ipc", ("PySide6", "rich", "pyudev", "openrazer", "evdev")),
+    "profiles": ("synapse_like.core.profiles", ("PySide6", "rich", "pyudev", "openrazer", "evdev")),
+    "profile-service": ("synapse_like.gui.profile_service", ("PySide6", "rich", "pyudev", "openrazer")),
+    "daemon": ("synapse_like.daemon.process", ("PySide6", "rich", "pyudev", "openrazer")),
+}
+DEFAULT_BUDGET_MS = 250.0
+# Dependencies the check environment may lack; a missing one skips the entry.
+OPTIONAL_DEPENDENCIES = ("typer",)
+_MISSING_MODULE = re.compile(r"^ModuleNotFoundError: No module named '([^']+)'$")
+
+
+class ImportReport(NamedTuple):
+    entry: str
+    module: str
+    cumulative_ms: float
+    loaded: List[str]
+    error: Optional[str]
+
+
+def _loaded_modules(stderr: str) -> Dict[str, int]:
+    modules: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if cumulative.isdigit():
+            modules[name] = int(cumulative)
+    return modules
+
+
+def measure(entry: str) -> ImportReport:
+    module, forbidden = ENTRY_POINTS[entry]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(SRC), os.environ.get("PYTHONPATH")])))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    modules = _loaded_modules(result.stderr)
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed"
+        return ImportReport(entry, module, 0.0, [], error)
+    loaded = sorted(
+        name for name in modules if any(name == heavy or name.startswith(heavy + ".") for heavy in forbidden)
+    )
+    return ImportReport(entry, module, modules.get(module, 0) / 1000.0, loaded, None)
+
+
+def missing_optional_dependency(error: str) -> bool:
+    match = _MISSING_MODULE.match(error)
+    return match is not None and match.group(1).split(".")[0] in OPTIONAL_DEPENDENCIES
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entry", action="append", choices=sorted(ENTRY_POINTS), help="entry point to check (repeatable)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="cumulative import budget per entry")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for entry in args.entry or list(ENTRY_POINTS):
+        report = measure(entry)
+        if report.error is not None:
+            if missing_optional_dependency(report.error):
+                print(f"{entry:16} {report.module:36} skipped ({report.error})")
+            else:
+                failed = True
+                print(f"{entry:16} {report.module:36} failed ({report.error})")
+            continue
+        problems = []
+        if report.loaded:
+            problems.append("loads " + ", ".join(report.loaded))
+        if report.cumulative_ms > args.budget_ms:
+            problems.append(f"over budget ({args.budget_ms:.0f} ms)")
+        failed = failed or bool(problems)
+        status = "; ".join(problems) if problems else "ok"
+        print(f"{entry:16} {report.module:36} {report.cumulative_ms:8.1f} ms  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
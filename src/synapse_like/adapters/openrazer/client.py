@@ -5,28 +5,39 @@ from synapse_like.core.models import Device, Profile
 from synapse_like.core.device_provider import DeviceProvider
 from synapse_like.adapters.openrazer.capabilities import get_extractor
 
-try:
-    from openrazer.client import DeviceManager
-
-    OPENRAZER_AVAILABLE = True
-except ImportError:
-    OPENRAZER_AVAILABLE = False
-    logging.getLogger(__name__).debug("OpenRazer python bindings not found. Running in mock mode.")
+def _device_manager_class():
+    # Imported on first use: the bindings pull in dbus and are slow to load.
+    try:
+        from openrazer.client import DeviceManager
+    except ImportError:
+        logging.getLogger(__name__).debug("OpenRazer python bindings not found. Running in mock mode.")
+        return None
+    return DeviceManager
 
 
 class OpenRazerAdapter(DeviceProvider):
     def __init__(self):
-        if OPENRAZER_AVAILABLE:
-            self.device_manager = DeviceManager()
-        else:
-            self.device_manager = None
+        self._device_manager = None
+        self._connected = False
+
+    @property
+    def device_manager(self):
+        if not self._connected:
+            self._connected = True
+            manager_class = _device_manager_class()
+            self._device_manager = manager_class() if manager_class is not None else None
+        return self._device_manager
+
+    @property
+    def available(self) -> bool:
+        return self.device_manager is not None
 
     def list_devices(self) -> List[Device]:
         """
         Return connected devices with extracted capabilities.
         When OpenRazer bindings are missing, returns an empty list.
         """
-        if not OPENRAZER_AVAILABLE:
+        if not self.available:
             return []
 
         devices: List[Device] = []
@@ -76,7 +87,7 @@ class OpenRazerAdapter(DeviceProvider):
         Best-effort persistence for devices that expose onboard profile APIs.
         The exact OpenRazer surface varies by hardware, so this probes common hooks.
         """
-        if not OPENRAZER_AVAILABLE:
+        if not self.available:
             return "OpenRazer indisponivel no ambiente atual."
 
         persisted = 0
@@ -89,7 +100,7 @@ class OpenRazerAdapter(DeviceProvider):
         return f"Perfil persistido em {persisted} dispositivo(s) compatível(is)."
 
     def _find_raw_device_by_serial(self, serial):
-        if not OPENRAZER_AVAILABLE:
+        if not self.available:
             return None
         for dev in self.device_manager.devices:
             if getattr(dev, "serial", None) == serial:
@@ -97,7 +108,7 @@ class OpenRazerAdapter(DeviceProvider):
         return None
 
     def _apply_lighting(self, raw_dev, cfg):
-        if not OPENRAZER_AVAILABLE:
+        if not self.available:
             logging.info("Mock apply lighting: %s -> %s", raw_dev.name, cfg)
             return
         try:
@@ -109,7 +120,7 @@ class OpenRazerAdapter(DeviceProvider):
             logging.error("Failed to apply lighting to %s: %s", raw_dev.name, exc)
 
     def _apply_dpi(self, raw_dev, value: int):
-        if not OPENRAZER_AVAILABLE:
+        if not self.available:
             logging.info("Mock apply DPI: %s -> %s", raw_dev.name, value)
             return
         try:
@@ -119,7 +130,7 @@ class OpenRazerAdapter(DeviceProvider):
             logging.error("Failed to set DPI on %s: %s", raw_dev.name, exc)
 
     def _apply_polling(self, raw_dev, value: int):
-        if not OPENRAZER_AVAILABLE:
+        if not self.available:
             logging.info("Mock apply polling: %s -> %s", raw_dev.name, value)
             return
         try:
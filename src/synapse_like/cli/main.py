@@ -1,13 +1,17 @@
 import typer
-from rich.console import Console
-from rich.table import Table
-
-from synapse_like.core.profiles import load_profile
-from synapse_like.gui import launch as launch_gui
 
 app = typer.Typer()
-console = Console()
 adapter = None
+console = None
+
+
+def get_console():
+    global console
+    if console is None:
+        from rich.console import Console
+
+        console = Console()
+    return console
 
 
 def get_adapter():
@@ -22,6 +26,9 @@ def get_adapter():
 @app.command()
 def devices():
     """List connected Razer devices."""
+    from rich.table import Table
+
+    console = get_console()
     devices = get_adapter().list_devices()
     if not devices:
         console.print("No Razer devices found (or OpenRazer bindings missing).", style="yellow")
@@ -52,6 +59,7 @@ def devices():
 @app.command()
 def capabilities(device_index: int):
     """Show detailed capabilities for a device by index (from 'devices' list)."""
+    console = get_console()
     devices = get_adapter().list_devices()
     if not devices:
         console.print("No devices found.", style="red")
@@ -68,6 +76,9 @@ def capabilities(device_index: int):
 @app.command()
 def apply(profile_name: str):
     """Apply a profile to connected devices."""
+    from synapse_like.core.profiles import load_profile
+
+    console = get_console()
     profile = load_profile(profile_name)
     if not profile:
         console.print(f"Profile '{profile_name}' not found.", style="red")
@@ -81,6 +92,8 @@ def apply(profile_name: str):
 @app.command()
 def gui():
     """Launch GUI remapper (PySide6)."""
+    from synapse_like.gui import launch as launch_gui
+
     launch_gui()
 
 
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from synapse_like.core.models import Profile
+from synapse_like.core.storage import (
+    DEFAULT_JOURNAL_DEPTH,
+    CoalescingWriter,
+    atomic_write_bytes,
+    rollback,
+)
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path.home() / ".config" / "synapse-like" / "profiles"
+PROFILE_SUFFIX = ".json"
+PROFILE_JOURNAL_DEPTH = DEFAULT_JOURNAL_DEPTH
+HARDWARE_SECTION = "hardware"
+HARDWARE_SCHEMA_VERSION = 1
+# Settings a remap document carries next to its mappings, with the value
+# documents saved before they existed are read with.
+REMAP_SECTION_DEFAULTS: Dict[str, Any] = {
+    "motion": None,
+    "layers": {},
+    "chords": {},
+    "shared_output": False,
+}
+
+Document = Dict[str, Any]
+Stamp = Tuple[int, int]
+
+
+def migrate_document(raw: Any) -> Document:
+    """
+    Brings any profile file written by this project to the unified layout.
+
+    Hardware-only files from the old core store (top-level `schema_version`,
+    `targets`, `settings`, no `version`) move under the `hardware` section;
+    remap documents get the sections they predate (motion, layers, chords,
+    shared output) filled with their defaults.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("profile document must be a JSON object")
+    if "version" not in raw and "schema_version" in raw:
+        return {
+            HARDWARE_SECTION: {
+                "schema_version": raw.get("schema_version", HARDWARE_SCHEMA_VERSION),
+                "targets": raw.get("targets", []),
+                "settings": raw.get("settings", {}),
+            }
+        }
+    if "version" in raw:
+        for section, default in REMAP_SECTION_DEFAULTS.items():
+            if section not in raw:
+                raw[section] = json.loads(json.dumps(default))
+    return raw
+
+
+@dataclass(slots=True)
+class ProfileEntry:
+    """Index row: what listing and window matching need without loading mappings."""
+
+    name: str
+    path: Path
+    device_path: str = ""
+    linked_apps: List[str] = field(default_factory=list)
+    has_hardware: bool = False
+
+    @classmethod
+    def from_document(cls, path: Path, document: Document) -> "ProfileEntry":
+        linked_apps = document.get("linked_apps", [])
+        return cls(
+            name=path.stem,
+            path=path,
+            device_path=str(document.get("device_path", "")),
+            linked_apps=[str(app).casefold() for app in linked_apps] if isinstance(linked_apps, list) else [],
+            has_hardware=isinstance(document.get(HARDWARE_SECTION), dict),
+        )
+
+
+class ProfileStore:
+    """
+    The one place that reads and writes ~/.config/synapse-like/profiles.
+
+    Every profile is a single JSON document holding the remap section
+    (mappings, aliases, linked apps) and, optionally, a `hardware` section.
+    The index keeps one entry per file together with its (mtime, size), so a
+    listing only re-reads files that were added or edited since the last one;
+    writes go through the shared atomic writer and are visible to readers
+    before they reach the disk.
+    """
+
+    def __init__(self, profile_dir: Path = PROFILE_DIR, writer: Optional[CoalescingWriter] = None) -> None:
+        self.profile_dir = Path(profile_dir)
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self._writer = writer or CoalescingWriter()
+        self._lock = threading.Lock()
+        self._pending: Dict[Path, Document] = {}
+        self._index: Dict[Path, Tuple[Stamp, Optional[ProfileEntry]]] = {}
+
+    def path_for(self, name: str) -> Path:
+        return self.profile_dir / f"{name}{PROFILE_SUFFIX}"
+
+    def entries(self) -> List[ProfileEntry]:
+        """Indexed profiles, sorted by name; only new or changed files are re-read."""
+        with self._lock:
+            self._refresh_index()
+            index = {entry.name: entry for _, entry in self._index.values() if entry is not None}
+            for path, document in self._pending.items():
+                index[path.stem] = ProfileEntry.from_document(path, document)
+        return [index[name] for name in sorted(index)]
+
+    def _refresh_index(self) -> None:
+        index: Dict[Path, Tuple[Stamp, Optional[ProfileEntry]]] = {}
+        for path in self.profile_dir.glob(f"*{PROFILE_SUFFIX}"):
+            stamp = _stamp(path)
+            if stamp is None:
+                continue
+            cached = self._index.get(path)
+            if cached is not None and cached[0] == stamp:
+                index[path] = cached
+                continue
+            try:
+                document = migrate_document(json.loads(path.read_bytes()))
+            except (OSError, ValueError) as exc:
+                # Remembered as invalid until the file changes again.
+                logger.warning("Skipping invalid profile %s: %s", path, exc)
+                index[path] = (stamp, None)
+                continue
+            index[path] = (stamp, ProfileEntry.from_document(path, document))
+        self._index = index
+
+    def _remember(self, path: Path, document: Document) -> None:
+        """Indexes a document just written to `path` (caller holds the lock)."""
+        stamp = _stamp(path)
+        if stamp is None:
+            self._index.pop(path, None)
+        else:
+            self._index[path] = (stamp, ProfileEntry.from_document(path, document))
+
+    def is_pending(self, name: str) -> bool:
+        with self._lock:
+            return self.path_for(name) in self._pending
+
+    def read_document(self, name: str) -> Optional[Document]:
+        path = self.path_for(name)
+        with self._lock:
+            pending = self._pending.get(path)
+        if pending is not None:
+            return json.loads(json.dumps(pending))
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        return migrate_document(json.loads(raw))
+
+    def write_document(
+        self,
+        name: str,
+        document: Document,
+        *,
+        background: bool = True,
+        on_written: Optional[Callable[[Path], None]] = None,
+    ) -> Path:
+        """
+        Saves `document` as profile `name`. Background writes are coalesced and
+        served from memory until they land; `on_written` runs after the rename.
+        """
+        path = self.path_for(name)
+        data = json.dumps(document, indent=2).encode("utf-8")
+        if not background:
+            # Drop a queued write and wait out one already in flight, so it cannot land after this one.
+            self._writer.cancel(path)
+            self._writer.flush()
+            atomic_write_bytes(path, data, journal_depth=PROFILE_JOURNAL_DEPTH)
+            with self._lock:
+                self._pending.pop(path, None)
+                self._remember(path, document)
+            if on_written is not None:
+                on_written(path)
+            return path
+
+        snapshot = json.loads(data)
+        with self._lock:
+            self._pending[path] = snapshot
+        self._writer.submit(
+            path,
+            data,
+            journal_depth=PROFILE_JOURNAL_DEPTH,
+            on_written=lambda written: self._landed(written, snapshot, on_written),
+        )
+        return path
+
+    def _landed(self, path: Path, snapshot: Document, on_written: Optional[Callable[[Path], None]]) -> None:
+        with self._lock:
+            if self._pending.get(path) is snapshot:
+                del self._pending[path]
+                self._remember(path, snapshot)
+        if on_written is not None:
+            on_written(path)
+
+    def update_document(self, name: str, section: Document, *, background: bool = True) -> Path:
+        """Merges top-level keys of `section` into the stored document (creating it if needed)."""
+        document = self.read_document(name) or {}
+        document.update(section)
+        return self.write_document(name, document, background=background)
+
+    def delete(self, name: str) -> bool:
+        path = self.path_for(name)
+        self._writer.cancel(path)
+        self._writer.flush()
+        with self._lock:
+            pending = self._pending.pop(path, None)
+            self._index.pop(path, None)
+        if not path.exists():
+            return pending is not None
+        path.unlink()
+        return True
+
+    def rollback(self, name: str, steps: int = 1) -> bool:
+        self._writer.flush()
+        path = self.path_for(name)
+        restored = rollback(path, steps, PROFILE_JOURNAL_DEPTH)
+        if restored:
+            with self._lock:
+                self._index.pop(path, None)
+        return restored
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        return self._writer.flush(timeout)
+
+    def load_hardware(self, name: str) -> Optional[Profile]:
+        document = self.read_document(name)
+        hardware = document.get(HARDWARE_SECTION) if document else None
+        if not isinstance(hardware, dict):
+            return None
+        return Profile(
+            schema_version=int(hardware.get("schema_version", HARDWARE_SCHEMA_VERSION)),
+            name=name,
+            targets=list(hardware.get("targets", [])),
+            settings=dict(hardware.get("settings", {})),
+        )
+
+    def save_hardware(self, profile: Profile, *, background: bool = False) -> Path:
+        section = {
+            "schema_version": profile.schema_version,
+            "targets": profile.targets,
+            "settings": profile.settings,
+        }
+        return self.update_document(profile.name, {HARDWARE_SECTION: section}, background=background)
+
+
+_SHARED_STORES: Dict[Path, ProfileStore] = {}
+_SHARED_STORES_LOCK = threading.Lock()
+
+
+def shared_store(profile_dir: Path = PROFILE_DIR) -> ProfileStore:
+    """
+    The process-wide store for `profile_dir`, created on first use.
+
+    Hardware and remap saves must go through one store: two stores keep two
+    pending overlays, and a queued write in one can land over a newer write
+    made through the other.
+    """
+    key = Path(profile_dir).expanduser().resolve()
+    with _SHARED_STORES_LOCK:
+        store = _SHARED_STORES.get(key)
+        if store is None:
+            store = _SHARED_STORES[key] = ProfileStore(key)
+        return store
+
+
+def _stamp(path: Path) -> Optional[Stamp]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+__all__ = [
+    "HARDWARE_SECTION",
+    "PROFILE_DIR",
+    "PROFILE_JOURNAL_DEPTH",
+    "REMAP_SECTION_DEFAULTS",
+    "ProfileEntry",
+    "ProfileStore",
+    "migrate_document",
+    "shared_store",
+]
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import glob
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_DIR = ".journal"
+DEFAULT_JOURNAL_DEPTH = 5
+DEFAULT_COALESCE_SECONDS = 0.3
+
+
+def fsync_directory(directory: Path) -> None:
+    """Makes renames inside `directory` durable."""
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def journal_versions(path: Path) -> List[Path]:
+    """Journaled copies of `path`, newest first."""
+    path = Path(path)
+    journal = path.parent / JOURNAL_DIR
+    versions = []
+    for candidate in journal.glob(f"{glob.escape(path.name)}.*"):
+        suffix = candidate.name[len(path.name) + 1:]
+        if suffix.isdigit():
+            versions.append((int(suffix), candidate))
+    return [candidate for _, candidate in sorted(versions)]
+
+
+def _journal(path: Path, depth: int) -> None:
+    """Keeps the current `path` as `<dir>/.journal/<name>.1`, shifting older copies up to `depth`."""
+    if depth <= 0 or not path.exists():
+        return
+    journal = path.parent / JOURNAL_DIR
+    journal.mkdir(exist_ok=True)
+    for index in range(depth, 0, -1):
+        version = journal / f"{path.name}.{index}"
+        if not version.exists():
+            continue
+        if index == depth:
+            version.unlink()
+        else:
+            os.replace(version, journal / f"{path.name}.{index + 1}")
+    newest = journal / f"{path.name}.1"
+    try:
+        os.link(path, newest)
+    except OSError:
+        shutil.copy2(path, newest)
+
+
+def atomic_write_bytes(
+    path: Path,
+    data: bytes,
+    *,
+    journal_depth: int = 0,
+    durable: bool = True,
+    sync_directory: bool = True,
+) -> None:
+    """
+    Replaces `path` with `data` via a temporary file and rename, so readers see
+    either the old or the new content, never a torn write.
+
+    With `durable`, the file is fsynced before the rename and (unless the
+    caller batches it with `sync_directory=False`) the directory after it.
+    """
+    path = Path(path)
+    # Unique per thread: a synchronous save can race the CoalescingWriter thread.
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temporary, "wb") as handle:
+            handle.write(data)
+            if durable:
+                handle.flush()
+                os.fsync(handle.fileno())
+        _journal(path, journal_depth)
+        os.replace(temporary, path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+    if durable and sync_directory:
+        fsync_directory(path.parent)
+
+
+def atomic_write_json(path: Path, data: Any, **options: Any) -> None:
+    atomic_write_bytes(path, json.dumps(data, indent=2).encode("utf-8"), **options)
+
+
+def rollback(path: Path, steps: int = 1, journal_depth: int = DEFAULT_JOURNAL_DEPTH) -> bool:
+    """Restores the `steps`-th newest journaled copy of `path` (journaling the current one)."""
+    versions = journal_versions(path)
+    if not 1 <= steps <= len(versions):
+        return False
+    data = versions[steps - 1].read_bytes()
+    atomic_write_bytes(path, data, journal_depth=journal_depth)
+    return True
+
+
+WriteJob = Tuple[bytes, int, Optional[Callable[[Path], None]]]
+
+
+class CoalescingWriter:
+    """
+    Background writer for files saved from the GUI thread.
+
+    `submit` only records the bytes; one worker thread writes them after
+    `delay` seconds, so several saves of the same file in quick succession
+    produce a single write. Each batch fsyncs every touched directory once.
+    """
+
+    def __init__(self, delay: float = DEFAULT_COALESCE_SECONDS, clock=time.monotonic) -> None:
+        self.delay = delay
+        self._clock = clock
+        self._pending: Dict[Path, Tuple[float, WriteJob]] = {}
+        self._writing = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(
+        self,
+        path: Path,
+        data: bytes,
+        *,
+        journal_depth: int = 0,
+        on_written: Optional[Callable[[Path], None]] = None,
+    ) -> None:
+        path = Path(path)
+        with self._condition:
+            due = self._pending[path][0] if path in self._pending else self._clock() + self.delay
+            self._pending[path] = (due, (data, journal_depth, on_written))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="synapse-like-writer", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def cancel(self, path: Path) -> None:
+        with self._condition:
+            self._pending.pop(Path(path), None)
+
+    def pending(self) -> List[Path]:
+        with self._condition:
+            return list(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Writes everything pending now; True once the queue is empty."""
+        with self._condition:
+            self._pending = {path: (0.0, job) for path, (_, job) in self._pending.items()}
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def _take_due(self) -> Dict[Path, WriteJob]:
+        with self._condition:
+            while True:
+                if self._pending:
+                    now = self._clock()
+                    due = {path: job for path, (deadline, job) in self._pending.items() if deadline <= now}
+                    if due:
+                        for path in due:
+                            del self._pending[path]
+                        self._writing += 1
+                        return due
+                    wait = min(deadline for deadline, _ in self._pending.values()) - now
+                    self._condition.wait(max(wait, 0.0))
+                else:
+                    self._condition.wait()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_due()
+            directories = set()
+            written = []
+            for path, (data, journal_depth, on_written) in batch.items():
+                try:
+                    atomic_write_bytes(path, data, journal_depth=journal_depth, sync_directory=False)
+                except OSError as exc:
+                    logger.warning("Saving %s failed: %s", path, exc)
+                    continue
+                directories.add(path.parent)
+                written.append((path, on_written))
+            for directory in directories:
+                fsync_directory(directory)
+            for path, on_written in written:
+                if on_written is not None:
+                    try:
+                        on_written(path)
+                    except Exception:
+                        logger.exception("Post-save hook failed for %s", path)
+            with self._condition:
+                self._writing -= 1
+                self._condition.notify_all()
+
+
+__all__ = [
+    "CoalescingWriter",
+    "DEFAULT_COALESCE_SECONDS",
+    "DEFAULT_JOURNAL_DEPTH",
+    "JOURNAL_DIR",
+    "atomic_write_bytes",
+    "atomic_write_json",
+    "fsync_directory",
+    "journal_versions",
+    "rollback",
+]
@@ -1,3 +1,13 @@
-from synapse_like.daemon.process import RemapDaemon, main
+from typing import Any
 
 __all__ = ["RemapDaemon", "main"]
+
+
+def __getattr__(name: str) -> Any:
+    # Clients only need `synapse_like.daemon.ipc`; the daemon itself (and the
+    # whole remap engine behind it) loads on first use.
+    if name in __all__:
+        from synapse_like.daemon import process
+
+        return getattr(process, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
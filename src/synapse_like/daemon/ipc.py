@@ -5,5 +5,6 @@ from pathlib import Path
 SOCKET_PATH = Path("/tmp/synapse-like-daemon.sock")
 DAEMON_ADDRESS = str(SOCKET_PATH)
 DAEMON_AUTHKEY = b"synapse-like-daemon"
+METRICS_PORT_ENV = "SYNAPSE_LIKE_METRICS_PORT"
 
-__all__ = ["DAEMON_ADDRESS", "DAEMON_AUTHKEY", "SOCKET_PATH"]
+__all__ = ["DAEMON_ADDRESS", "DAEMON_AUTHKEY", "METRICS_PORT_ENV", "SOCKET_PATH"]
@@ -4,31 +4,39 @@ import logging
 import os
 import threading
 import time
+from dataclasses import replace
 from multiprocessing.connection import Listener
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from synapse_like.daemon.ipc import DAEMON_ADDRESS, DAEMON_AUTHKEY, SOCKET_PATH
-from synapse_like.remap.actions import Action
+from synapse_like.daemon.ipc import DAEMON_ADDRESS, DAEMON_AUTHKEY, METRICS_PORT_ENV, SOCKET_PATH
+from synapse_like.remap.codes import code_name
 from synapse_like.remap.device_paths import expand_related_paths
-from synapse_like.remap.mapper import InputMapper, MappingConfig
+from synapse_like.remap.launcher import LAUNCHER
+from synapse_like.remap.layers import expand_aliases
+from synapse_like.remap.mapper import InputMapper, MappingConfig, bitmap_codes
+from synapse_like.remap.metrics import MetricsExporter, render_prometheus
+from synapse_like.remap.profiler import ProfileSession, profile_output_path
+from synapse_like.remap.sinks import SinkPool
 from synapse_like.remap.strategy import is_aux_pointer_only_mapping
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="[daemon] %(asctime)s %(levelname)s %(name)s: %(message)s",
-    datefmt="%H:%M:%S",
-)
 logger = logging.getLogger(__name__)
 
 
 class RemapDaemon:
     def __init__(self) -> None:
         self._running = True
+        # Spawn the launch helper while the daemon is still small and single-threaded.
+        LAUNCHER.start()
         self._listener = self._build_listener()
         self._mappers: list[InputMapper] = []
-        self._active_device: Optional[str] = None
-        self._active_mappings: Dict[str, Action] = {}
+        # Bumped whenever the mapper set changes, so input-state generations stay unique.
+        self._state_epoch = 0
+        self._sink_pool = SinkPool()
+        self._active_config: Optional[MappingConfig] = None
+        self._kernel_filter = True
+        self._metrics_exporter = self._build_metrics_exporter()
+        self._profile_session: Optional[ProfileSession] = None
         self._hotplug_thread = threading.Thread(target=self._monitor_hotplug, daemon=True)
         self._hotplug_thread.start()
 
@@ -37,6 +45,18 @@ class RemapDaemon:
             SOCKET_PATH.unlink()
         return Listener(DAEMON_ADDRESS, authkey=DAEMON_AUTHKEY, family="AF_UNIX")
 
+    def _build_metrics_exporter(self) -> Optional[MetricsExporter]:
+        raw_port = os.environ.get(METRICS_PORT_ENV, "").strip()
+        if not raw_port:
+            return None
+        try:
+            exporter = MetricsExporter(int(raw_port), self._render_metrics)
+            exporter.start()
+        except (OSError, ValueError) as exc:
+            logger.warning("Metrics exporter disabled (%s=%s): %s", METRICS_PORT_ENV, raw_port, exc)
+            return None
+        return exporter
+
     def run(self) -> None:
         logger.info("Daemon listening at %s", DAEMON_ADDRESS)
         while self._running:
@@ -53,7 +73,11 @@ class RemapDaemon:
                         payload = connection.recv()
                     except EOFError:
                         break
-                    response = self._handle_message(payload if isinstance(payload, dict) else {})
+                    try:
+                        response = self._handle_message(payload if isinstance(payload, dict) else {})
+                    except Exception as exc:
+                        logger.exception("Rejected malformed request")
+                        response = {"status": "error", "error": str(exc)}
                     connection.send(response)
             finally:
                 connection.close()
@@ -68,21 +92,34 @@ class RemapDaemon:
             return {
                 "status": "ok",
                 "active_count": len(self._mappers),
-                "device": self._active_device,
-                "low_latency": is_aux_pointer_only_mapping(self._active_mappings),
+                "device": self._active_config.device_path if self._active_config is not None else None,
+                "low_latency": self._active_config is not None and self._is_low_latency(self._active_config),
+                "kernel_filtered": sum(1 for mapper in self._mappers if mapper.kernel_filtered),
+                "layers": self._mappers[0].active_layers if self._mappers else [],
+                "sinks": self._sink_pool.stats(),
             }
+        if command == "METRICS":
+            if str(payload.get("format", "")).lower() == "prometheus":
+                return {"status": "ok", "payload": self._render_metrics()}
+            return {"status": "ok", "mappers": self._collect_metrics()}
+        if command == "PROFILE":
+            return self._handle_profile(payload)
         if command == "GET_INPUT_STATE":
-            return {"status": "ok", "active_keys": self._collect_active_keys()}
+            return self._input_state(payload.get("generation"))
         if command == "STOP":
             return self._stop_all()
         if command == "APPLY":
             return self._apply_config(
-                device=str(payload.get("device", "")),
-                mappings=self._deserialize_mappings(payload.get("mappings", {})),
+                self._config_from_payload(payload),
+                kernel_filter=bool(payload.get("kernel_filter", True)),
             )
         if command == "SHUTDOWN":
             response = self._stop_all()
             self._running = False
+            if self._metrics_exporter is not None:
+                self._metrics_exporter.stop()
+            LAUNCHER.stop()
+            self._sink_pool.close_all()
             try:
                 self._listener.close()
             except Exception:
@@ -90,46 +127,137 @@ class RemapDaemon:
             return response
         return {"status": "error", "error": f"Unknown command: {command}"}
 
-    def _apply_config(self, device: str, mappings: Dict[str, Action]) -> Dict[str, Any]:
-        self._active_device = device
-        self._active_mappings = dict(mappings)
+    def _config_from_payload(self, payload: Dict[str, Any]) -> MappingConfig:
+        """Builds the per-device template; grab/passthrough are decided per path."""
+        data: Dict[str, Any] = {"device_path": str(payload.get("device", ""))}
+        for key in (
+            "mappings",
+            "layers",
+            "chords",
+            "aliases",
+            "chord_timeout_ms",
+            "motion",
+            "shared_output",
+            "raw_passthrough",
+        ):
+            if key in payload:
+                data[key] = payload[key]
+        return MappingConfig.from_dict(data)
+
+    def _is_low_latency(self, config: MappingConfig) -> bool:
+        # Layers, chords and motion transforms need the grabbed passthrough path.
+        return (
+            is_aux_pointer_only_mapping(expand_aliases(config.mappings, config.aliases))
+            and not config.layers
+            and not config.chords
+            and (config.motion is None or config.motion.is_identity())
+        )
+
+    def _apply_config(self, template: MappingConfig, kernel_filter: bool = True) -> Dict[str, Any]:
+        device = template.device_path
+        self._active_config = template
+        self._kernel_filter = kernel_filter
         self._stop_all()
 
         failures: list[str] = []
         started_paths: list[str] = []
-        low_latency = is_aux_pointer_only_mapping(mappings)
+        low_latency = self._is_low_latency(template)
         paths = expand_related_paths(device)
         if not paths:
             return {"status": "error", "failures": ["Nenhum device encontrado"], "active_count": 0}
 
+        pending: list[InputMapper] = []
         for path in paths:
             use_fast_mode = low_latency and "-if" in path
+            mapper = InputMapper(
+                replace(
+                    template,
+                    device_path=path,
+                    grab=not use_fast_mode,
+                    passthrough=not use_fast_mode,
+                    kernel_filter=use_fast_mode and kernel_filter,
+                ),
+                sink_pool=self._sink_pool,
+            )
+            if template.shared_output:
+                # Open every interface first so the shared sinks get all capabilities up front.
+                try:
+                    mapper.open_source()
+                except Exception as exc:
+                    failures.append(f"{path}: {exc}")
+                    logger.error("Failed to open %s: %s", path, exc)
+                    continue
+            pending.append(mapper)
+
+        shared_caps = self._shared_caps(pending) if template.shared_output else None
+        for mapper in pending:
+            path = mapper.device_path
             try:
-                mapper = InputMapper(
-                    MappingConfig(
-                        device_path=path,
-                        mappings=mappings,
-                        grab=not use_fast_mode,
-                        passthrough=not use_fast_mode,
-                    )
-                )
-                mapper.start()
+                mapper.start(shared_caps)
                 self._mappers.append(mapper)
                 started_paths.append(path)
             except Exception as exc:
+                mapper.stop()
                 failures.append(f"{path}: {exc}")
                 logger.error("Failed to start mapper for %s: %s", path, exc)
+        self._sink_pool.prune(started_paths)
 
         return {
             "status": "ok",
             "active_count": len(self._mappers),
             "failures": failures,
             "low_latency": low_latency,
+            "kernel_filtered": sum(1 for mapper in self._mappers if mapper.kernel_filtered),
             "paths": started_paths,
         }
 
+    def _shared_caps(self, mappers: List[InputMapper]) -> Dict[str, Dict[int, list[int]]]:
+        merged: Dict[str, Dict[int, set[int]]] = {}
+        for mapper in mappers:
+            for role, caps in mapper.output_caps().items():
+                role_caps = merged.setdefault(role, {})
+                for event_type, codes in caps.items():
+                    role_caps.setdefault(event_type, set()).update(codes)
+        return {
+            role: {event_type: sorted(codes) for event_type, codes in caps.items()}
+            for role, caps in merged.items()
+        }
+
+    def _handle_profile(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        session = self._profile_session
+        if payload.get("stop"):
+            if session is None or not session.active:
+                return {"status": "error", "error": "No profiling session running"}
+            return {"status": "ok", "output": str(session.finish())}
+        if session is not None and session.active:
+            return {"status": "error", "error": f"Profiling already running ({session.output_path})"}
+        if not self._mappers:
+            return {"status": "error", "error": "No active mappers to profile"}
+
+        try:
+            session = ProfileSession(
+                self._mappers,
+                mode=str(payload.get("mode", "stages")),
+                duration=float(payload.get("duration", 10.0)),
+                output_path=profile_output_path(payload.get("output")),
+                interval=float(payload.get("interval_ms", 1.0)) / 1000.0,
+            )
+        except (TypeError, ValueError) as exc:
+            return {"status": "error", "error": str(exc)}
+        session.start()
+        self._profile_session = session
+        return {
+            "status": "ok",
+            "mode": session.mode,
+            "duration": session.duration,
+            "output": str(session.output_path),
+        }
+
     def _stop_all(self) -> Dict[str, Any]:
+        if self._profile_session is not None and self._profile_session.active:
+            self._profile_session.finish()
         failures: list[str] = []
+        self._state_epoch += 1
         while self._mappers:
             mapper = self._mappers.pop()
             try:
@@ -138,20 +266,24 @@ class RemapDaemon:
                 failures.append(str(exc))
         return {"status": "ok", "active_count": 0, "failures": failures}
 
-    def _collect_active_keys(self) -> list[str]:
-        keys: set[str] = set()
-        for mapper in self._mappers:
-            keys.update(mapper.active_keys)
-        return sorted(keys)
+    def _input_state(self, known_generation: Any) -> Dict[str, Any]:
+        """Held keys across mappers; only a generation when the caller is up to date."""
+        mappers = list(self._mappers)
+        snapshots = [mapper.key_snapshot for mapper in mappers]
+        generation = (self._state_epoch << 32) + sum(snapshot.generation for snapshot in snapshots)
+        if known_generation == generation:
+            return {"status": "ok", "generation": generation, "unchanged": True}
+        held = 0
+        for snapshot in snapshots:
+            held |= snapshot.held
+        names = {code_name(code) for code in bitmap_codes(held)}
+        return {"status": "ok", "generation": generation, "active_keys": sorted(names)}
 
-    def _deserialize_mappings(self, raw_mappings: Any) -> Dict[str, Action]:
-        if not isinstance(raw_mappings, dict):
-            return {}
-        return {
-            str(code): Action.from_dict(payload)
-            for code, payload in raw_mappings.items()
-            if isinstance(payload, dict)
-        }
+    def _collect_metrics(self) -> list[Dict[str, Any]]:
+        return [mapper.metrics_snapshot() for mapper in list(self._mappers)]
+
+    def _render_metrics(self) -> str:
+        return render_prometheus(self._collect_metrics(), code_name=code_name)
 
     def _monitor_hotplug(self) -> None:
         try:
@@ -166,11 +298,12 @@ class RemapDaemon:
         for device in iter(monitor.poll, None):
             if not self._running:
                 return
-            if device.action != "add" or not self._active_device or not self._active_mappings:
+            active = self._active_config
+            if device.action != "add" or active is None or not active.device_path or not active.mappings:
                 continue
             time.sleep(0.8)
             logger.info("Hotplug detected; reapplying active configuration")
-            self._apply_config(self._active_device, self._active_mappings)
+            self._apply_config(active, self._kernel_filter)
 
     def _cleanup_socket(self) -> None:
         try:
@@ -182,6 +315,11 @@ class RemapDaemon:
 
 
 def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[daemon] %(asctime)s %(levelname)s %(name)s: %(message)s",
+        datefmt="%H:%M:%S",
+    )
     daemon = RemapDaemon()
     try:
         daemon.run()
@@ -1,3 +1,13 @@
-from synapse_like.gui.remap_gui import RemapGUI, launch
+from typing import Any
 
 __all__ = ["RemapGUI", "launch"]
+
+
+def __getattr__(name: str) -> Any:
+    # PySide6 is only imported when the window is actually needed, so
+    # `synapse_like.gui.mapping_io` & co. stay usable from the CLI.
+    if name in __all__:
+        from synapse_like.gui import remap_gui
+
+        return getattr(remap_gui, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Dict, Optional
 
 from PySide6.QtWidgets import (
+    QCheckBox,
     QComboBox,
     QDialog,
     QDialogButtonBox,
     QFormLayout,
     QLabel,
     QLineEdit,
+    QPlainTextEdit,
+    QSpinBox,
     QStackedWidget,
     QVBoxLayout,
     QWidget,
@@ -16,16 +19,32 @@ from PySide6.QtWidgets import (
 
 from synapse_like.remap.actions import (
     ACTION_STRATEGY_MAP,
+    DEFAULT_CLICK_INTERVAL_MS,
+    DEFAULT_HOLD_MS,
+    LAYER_MODES,
     Action,
     ActionStrategy,
     ActionType,
+    DragLockActionStrategy,
     KeystrokeActionStrategy,
     LaunchAppActionStrategy,
+    LayerActionStrategy,
     MacroActionStrategy,
+    MouseClickActionStrategy,
+    MouseNudgeActionStrategy,
     NoneActionStrategy,
+    POINTER_BUTTONS,
+    REPEAT_MODES,
+    RepeatPolicy,
     ScrollDownActionStrategy,
     ScrollUpActionStrategy,
+    TIMED_REPEAT_MODES,
+    TapHoldActionStrategy,
+    TextActionStrategy,
+    WHEEL_NOTCH,
+    WheelActionStrategy,
 )
+from synapse_like.remap.macros import DEFAULT_TYPING_RATE, TEXT_LAYOUTS
 
 
 class ActionDialog(QDialog):
@@ -43,14 +62,22 @@ class ActionDialog(QDialog):
         self.action_type_combo.currentIndexChanged.connect(self._update_form)
         layout.addWidget(self.action_type_combo)
 
+        self.scroll_inputs: Dict[str, tuple[QSpinBox, QCheckBox, QCheckBox, QSpinBox]] = {}
         self.forms = QStackedWidget()
         self.forms.addWidget(self._build_none_form())
         self.forms.addWidget(self._build_keystroke_form())
-        self.forms.addWidget(self._build_scroll_form("Scroll para cima"))
-        self.forms.addWidget(self._build_scroll_form("Scroll para baixo"))
+        self.forms.addWidget(self._build_scroll_form(ActionType.SCROLL_UP.value, "Scroll para cima"))
+        self.forms.addWidget(self._build_scroll_form(ActionType.SCROLL_DOWN.value, "Scroll para baixo"))
         self.forms.addWidget(self._build_macro_form())
         self.forms.addWidget(self._build_launch_form())
+        self.forms.addWidget(self._build_layer_form())
+        self.forms.addWidget(self._build_tap_hold_form())
+        self.forms.addWidget(self._build_text_form())
+        self.forms.addWidget(self._build_click_form())
+        self.forms.addWidget(self._build_drag_lock_form())
+        self.forms.addWidget(self._build_nudge_form())
         layout.addWidget(self.forms)
+        layout.addWidget(self._build_repeat_form())
 
         buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         buttons.accepted.connect(self.accept)
@@ -68,16 +95,50 @@ class ActionDialog(QDialog):
                 modifiers=modifiers,
             )
         elif selected_type == ActionType.SCROLL_UP.value:
-            strategy = ScrollUpActionStrategy()
+            strategy = ScrollUpActionStrategy.from_dict(self._scroll_payload(selected_type))
         elif selected_type == ActionType.SCROLL_DOWN.value:
-            strategy = ScrollDownActionStrategy()
+            strategy = ScrollDownActionStrategy.from_dict(self._scroll_payload(selected_type))
         elif selected_type == ActionType.MACRO.value:
             strategy = MacroActionStrategy()
         elif selected_type == ActionType.LAUNCH_APP.value:
-            strategy = LaunchAppActionStrategy(command=self.launch_command_input.text().strip())
+            strategy = LaunchAppActionStrategy.from_dict(
+                {
+                    "command": self.launch_command_input.text().strip(),
+                    "shell": True if self.launch_shell_input.isChecked() else None,
+                }
+            )
+        elif selected_type == ActionType.LAYER.value:
+            strategy = LayerActionStrategy(
+                layer=self.layer_name_input.text().strip(),
+                mode=self.layer_mode_combo.currentData(),
+            )
+        elif selected_type == ActionType.TAP_HOLD.value:
+            tap_key = self.tap_key_input.text().strip()
+            hold_key = self.hold_key_input.text().strip()
+            strategy = TapHoldActionStrategy(
+                tap=Action(strategy=KeystrokeActionStrategy(key=tap_key)) if tap_key else None,
+                hold=Action(strategy=KeystrokeActionStrategy(key=hold_key)) if hold_key else None,
+                hold_ms=self.hold_ms_input.value(),
+            )
+        elif selected_type == ActionType.TEXT.value:
+            strategy = TextActionStrategy(
+                text=self.text_input.toPlainText(),
+                layout=self.text_layout_combo.currentData(),
+                rate_cps=float(self.text_rate_input.value()),
+            )
+        elif selected_type == ActionType.MOUSE_CLICK.value:
+            strategy = MouseClickActionStrategy(
+                button=self.click_button_combo.currentData(),
+                clicks=self.click_count_input.value(),
+                interval_ms=self.click_interval_input.value(),
+            )
+        elif selected_type == ActionType.DRAG_LOCK.value:
+            strategy = DragLockActionStrategy(button=self.drag_button_combo.currentData())
+        elif selected_type == ActionType.MOUSE_NUDGE.value:
+            strategy = MouseNudgeActionStrategy(dx=self.nudge_dx_input.value(), dy=self.nudge_dy_input.value())
         else:
             strategy = NoneActionStrategy()
-        return Action(strategy=strategy)
+        return Action(strategy=strategy, repeat=self._selected_repeat_policy())
 
     def set_action(self, action: Action) -> None:
         index = self.action_type_combo.findData(action.type_name)
@@ -89,6 +150,46 @@ class ActionDialog(QDialog):
             self.modifiers_input.setText(",".join(action.strategy.modifiers))
         elif isinstance(action.strategy, LaunchAppActionStrategy):
             self.launch_command_input.setText(action.strategy.command)
+            self.launch_shell_input.setChecked(action.strategy.shell)
+        elif isinstance(action.strategy, WheelActionStrategy):
+            amount, horizontal, hi_res, frames = self.scroll_inputs[action.type_name]
+            amount.setValue(action.strategy.amount)
+            horizontal.setChecked(action.strategy.horizontal)
+            hi_res.setChecked(action.strategy.hi_res)
+            frames.setValue(action.strategy.smooth_frames)
+        elif isinstance(action.strategy, LayerActionStrategy):
+            self.layer_name_input.setText(action.strategy.layer)
+            mode_index = self.layer_mode_combo.findData(action.strategy.mode)
+            if mode_index >= 0:
+                self.layer_mode_combo.setCurrentIndex(mode_index)
+        elif isinstance(action.strategy, TapHoldActionStrategy):
+            for field_input, inner in (
+                (self.tap_key_input, action.strategy.tap),
+                (self.hold_key_input, action.strategy.hold),
+            ):
+                if inner is not None and isinstance(inner.strategy, KeystrokeActionStrategy):
+                    field_input.setText(inner.strategy.key or "")
+            self.hold_ms_input.setValue(action.strategy.hold_ms)
+        elif isinstance(action.strategy, TextActionStrategy):
+            self.text_input.setPlainText(action.strategy.text)
+            layout_index = self.text_layout_combo.findData(action.strategy.layout)
+            if layout_index >= 0:
+                self.text_layout_combo.setCurrentIndex(layout_index)
+            self.text_rate_input.setValue(int(action.strategy.rate_cps))
+        elif isinstance(action.strategy, MouseClickActionStrategy):
+            self.click_button_combo.setCurrentIndex(max(self.click_button_combo.findData(action.strategy.button), 0))
+            self.click_count_input.setValue(action.strategy.clicks)
+            self.click_interval_input.setValue(action.strategy.interval_ms)
+        elif isinstance(action.strategy, DragLockActionStrategy):
+            self.drag_button_combo.setCurrentIndex(max(self.drag_button_combo.findData(action.strategy.button), 0))
+        elif isinstance(action.strategy, MouseNudgeActionStrategy):
+            self.nudge_dx_input.setValue(action.strategy.dx)
+            self.nudge_dy_input.setValue(action.strategy.dy)
+
+        repeat_index = self.repeat_mode_combo.findData(action.repeat.mode if action.repeat else None)
+        self.repeat_mode_combo.setCurrentIndex(max(repeat_index, 0))
+        if action.repeat is not None:
+            self.repeat_rate_input.setValue(int(action.repeat.rate_hz))
 
         self._update_form()
 
@@ -101,6 +202,12 @@ class ActionDialog(QDialog):
             ActionType.SCROLL_DOWN.value: 3,
             ActionType.MACRO.value: 4,
             ActionType.LAUNCH_APP.value: 5,
+            ActionType.LAYER.value: 6,
+            ActionType.TAP_HOLD.value: 7,
+            ActionType.TEXT.value: 8,
+            ActionType.MOUSE_CLICK.value: 9,
+            ActionType.DRAG_LOCK.value: 10,
+            ActionType.MOUSE_NUDGE.value: 11,
         }
         self.forms.setCurrentIndex(index_map.get(selected_type, 0))
 
@@ -120,12 +227,35 @@ class ActionDialog(QDialog):
         layout.addRow("Modificadores", self.modifiers_input)
         return widget
 
-    def _build_scroll_form(self, label: str) -> QWidget:
+    def _build_scroll_form(self, type_name: str, label: str) -> QWidget:
         widget = QWidget()
-        layout = QVBoxLayout(widget)
-        layout.addWidget(QLabel(label))
+        layout = QFormLayout(widget)
+        layout.addRow(QLabel(label))
+        amount = QSpinBox()
+        amount.setRange(1, WHEEL_NOTCH * 10)
+        amount.setValue(WHEEL_NOTCH)
+        amount.setToolTip("Unidades hi-res; 120 = um degrau da roda")
+        horizontal = QCheckBox("Horizontal")
+        hi_res = QCheckBox("Alta resolução (REL_WHEEL_HI_RES)")
+        frames = QSpinBox()
+        frames.setRange(1, 64)
+        frames.setToolTip("Quadros para suavizar cada passo (1 = imediato)")
+        layout.addRow("Passo", amount)
+        layout.addRow(horizontal)
+        layout.addRow(hi_res)
+        layout.addRow("Suavização", frames)
+        self.scroll_inputs[type_name] = (amount, horizontal, hi_res, frames)
         return widget
 
+    def _scroll_payload(self, type_name: str) -> Dict[str, object]:
+        amount, horizontal, hi_res, frames = self.scroll_inputs[type_name]
+        return {
+            "amount": amount.value(),
+            "horizontal": horizontal.isChecked(),
+            "hi_res": hi_res.isChecked(),
+            "smooth_frames": frames.value(),
+        }
+
     def _build_macro_form(self) -> QWidget:
         widget = QWidget()
         layout = QVBoxLayout(widget)
@@ -137,5 +267,132 @@ class ActionDialog(QDialog):
         layout = QFormLayout(widget)
         self.launch_command_input = QLineEdit()
         self.launch_command_input.setPlaceholderText("Ex: flatpak run org.gimp.GIMP")
+        self.launch_shell_input = QCheckBox("Executar via shell (/bin/sh -c)")
         layout.addRow("Comando", self.launch_command_input)
+        layout.addRow(self.launch_shell_input)
+        return widget
+
+    def _build_layer_form(self) -> QWidget:
+        widget = QWidget()
+        layout = QFormLayout(widget)
+        self.layer_name_input = QLineEdit()
+        self.layer_name_input.setPlaceholderText("Ex: hypershift")
+        self.layer_mode_combo = QComboBox()
+        labels = {"momentary": "Segurar", "toggle": "Alternar", "oneshot": "Próxima tecla"}
+        for mode in LAYER_MODES:
+            self.layer_mode_combo.addItem(labels[mode], mode)
+        layout.addRow("Camada", self.layer_name_input)
+        layout.addRow("Modo", self.layer_mode_combo)
+        return widget
+
+    def _build_tap_hold_form(self) -> QWidget:
+        widget = QWidget()
+        layout = QFormLayout(widget)
+        self.tap_key_input = QLineEdit()
+        self.tap_key_input.setPlaceholderText("KEY_ESC")
+        self.hold_key_input = QLineEdit()
+        self.hold_key_input.setPlaceholderText("KEY_LEFTCTRL")
+        self.hold_ms_input = QSpinBox()
+        self.hold_ms_input.setRange(50, 2000)
+        self.hold_ms_input.setSuffix(" ms")
+        self.hold_ms_input.setValue(DEFAULT_HOLD_MS)
+        layout.addRow("Toque", self.tap_key_input)
+        layout.addRow("Segurar", self.hold_key_input)
+        layout.addRow("Limite", self.hold_ms_input)
+        return widget
+
+    def _build_repeat_form(self) -> QWidget:
+        widget = QWidget()
+        layout = QFormLayout(widget)
+        self.repeat_mode_combo = QComboBox()
+        self.repeat_mode_combo.addItem("Padrão da ação", None)
+        labels = {
+            "suppress": "Ignorar",
+            "forward": "Repetir (sistema)",
+            "synthesize": "Repetir (taxa própria)",
+            "turbo": "Turbo (disparo rápido)",
+        }
+        for mode in REPEAT_MODES:
+            self.repeat_mode_combo.addItem(labels[mode], mode)
+        self.repeat_rate_input = QSpinBox()
+        self.repeat_rate_input.setRange(1, 250)
+        self.repeat_rate_input.setSuffix(" Hz")
+        self.repeat_rate_input.setValue(30)
+        layout.addRow("Repetição", self.repeat_mode_combo)
+        layout.addRow("Taxa", self.repeat_rate_input)
+        return widget
+
+    def _selected_repeat_policy(self) -> Optional[RepeatPolicy]:
+        mode = self.repeat_mode_combo.currentData()
+        if mode is None:
+            return None
+        if mode in TIMED_REPEAT_MODES:
+            return RepeatPolicy(mode, rate_hz=float(self.repeat_rate_input.value()))
+        return RepeatPolicy(mode)
+
+    def _build_text_form(self) -> QWidget:
+        widget = QWidget()
+        layout = QFormLayout(widget)
+        self.text_input = QPlainTextEdit()
+        self.text_input.setPlaceholderText("Texto a digitar")
+        self.text_input.setMaximumHeight(90)
+        self.text_layout_combo = QComboBox()
+        for name in TEXT_LAYOUTS:
+            self.text_layout_combo.addItem(name, name)
+        self.text_rate_input = QSpinBox()
+        self.text_rate_input.setRange(1, 1000)
+        self.text_rate_input.setSuffix(" car/s")
+        self.text_rate_input.setValue(int(DEFAULT_TYPING_RATE))
+        layout.addRow("Texto", self.text_input)
+        layout.addRow("Layout", self.text_layout_combo)
+        layout.addRow("Velocidade", self.text_rate_input)
+        return widget
+
+    def _button_combo(self) -> QComboBox:
+        combo = QComboBox()
+        labels = {
+            "BTN_LEFT": "Esquerdo",
+            "BTN_RIGHT": "Direito",
+            "BTN_MIDDLE": "Meio",
+            "BTN_SIDE": "Lateral (voltar)",
+            "BTN_EXTRA": "Lateral (avançar)",
+        }
+        for button in POINTER_BUTTONS:
+            combo.addItem(labels[button], button)
+        return combo
+
+    def _build_click_form(self) -> QWidget:
+        widget = QWidget()
+        layout = QFormLayout(widget)
+        self.click_button_combo = self._button_combo()
+        self.click_count_input = QSpinBox()
+        self.click_count_input.setRange(1, 10)
+        self.click_interval_input = QSpinBox()
+        self.click_interval_input.setRange(0, 1000)
+        self.click_interval_input.setSuffix(" ms")
+        self.click_interval_input.setValue(DEFAULT_CLICK_INTERVAL_MS)
+        self.click_interval_input.setToolTip("Intervalo entre cliques (duplo clique ou mais)")
+        layout.addRow("Botão", self.click_button_combo)
+        layout.addRow("Cliques", self.click_count_input)
+        layout.addRow("Intervalo", self.click_interval_input)
+        return widget
+
+    def _build_drag_lock_form(self) -> QWidget:
+        widget = QWidget()
+        layout = QFormLayout(widget)
+        self.drag_button_combo = self._button_combo()
+        layout.addRow(QLabel("Cada toque prende ou solta o botão."))
+        layout.addRow("Botão", self.drag_button_combo)
+        return widget
+
+    def _build_nudge_form(self) -> QWidget:
+        widget = QWidget()
+        layout = QFormLayout(widget)
+        self.nudge_dx_input = QSpinBox()
+        self.nudge_dy_input = QSpinBox()
+        for spin in (self.nudge_dx_input, self.nudge_dy_input):
+            spin.setRange(-1000, 1000)
+            spin.setSuffix(" px")
+        layout.addRow("Horizontal", self.nudge_dx_input)
+        layout.addRow("Vertical", self.nudge_dy_input)
         return widget
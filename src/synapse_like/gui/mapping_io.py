@@ -1,69 +1,230 @@
 import json
-from typing import Dict, List, Tuple
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from synapse_like.core.storage import atomic_write_bytes
 from synapse_like.gui.constants import KEY_ALIASES, MOUSE_ALIASES
 from synapse_like.remap.actions import Action
+from synapse_like.remap.layers import canonical_mapping_key
+from synapse_like.remap.motion import MotionSettings
+from synapse_like.remap.timing import DEFAULT_CHORD_TIMEOUT_MS, parse_chord_timeout
 
 
-def save_mapping_file(
-    path: str,
+MAPPING_FILE_VERSION = 3
+
+
+@dataclass(slots=True)
+class RemapOptions:
+    """Profile settings the daemon receives alongside the key mappings."""
+
+    motion: Optional[MotionSettings] = None
+    layers: Dict[str, Dict[str, Action]] = field(default_factory=dict)
+    chords: Dict[str, Action] = field(default_factory=dict)
+    chord_timeout_ms: int = DEFAULT_CHORD_TIMEOUT_MS
+    shared_output: bool = False
+
+    def to_document(self) -> Dict[str, object]:
+        return {
+            "motion": self.motion.to_dict() if self.motion is not None else None,
+            "layers": {
+                name: {canonical_mapping_key(code): action.to_dict() for code, action in mappings.items()}
+                for name, mappings in self.layers.items()
+            },
+            "chords": {combo: action.to_dict() for combo, action in self.chords.items()},
+            "chord_timeout_ms": self.chord_timeout_ms,
+            "shared_output": self.shared_output,
+        }
+
+    @classmethod
+    def from_document(cls, raw: Dict[str, object]) -> "RemapOptions":
+        raw_motion = raw.get("motion")
+        raw_layers = raw.get("layers", {})
+        return cls(
+            motion=MotionSettings.from_dict(raw_motion) if isinstance(raw_motion, dict) else None,
+            layers={
+                str(name): _parse_actions(mappings, canonical=True)
+                for name, mappings in raw_layers.items()
+                if isinstance(mappings, dict)
+            }
+            if isinstance(raw_layers, dict)
+            else {},
+            chords=_parse_actions(raw.get("chords", {}), canonical=False),
+            chord_timeout_ms=parse_chord_timeout(raw.get("chord_timeout_ms", DEFAULT_CHORD_TIMEOUT_MS)),
+            shared_output=bool(raw.get("shared_output", False)),
+        )
+
+
+RemapPayload = Tuple[str, Dict[str, Action], Dict[str, List[str]], Dict[str, Dict[str, str]], List[str], RemapOptions]
+
+
+def canonical_keys(keys: Iterable[str]) -> List[str]:
+    """Canonical mapping keys for `keys`, duplicates dropped, order kept."""
+    return list(dict.fromkeys(canonical_mapping_key(str(key)) for key in keys))
+
+
+class AliasIndex:
+    """
+    Canonical key -> canonical alias group lookup.
+
+    The first group that lists a key wins, so built-in groups shadow
+    dynamic ones the same way the old in-order scan did.
+    """
+
+    def __init__(self) -> None:
+        self._groups: Dict[str, List[str]] = {}
+
+    def copy(self) -> "AliasIndex":
+        clone = AliasIndex()
+        clone._groups = dict(self._groups)
+        return clone
+
+    def add_groups(self, aliases: Dict[str, List[str]]) -> None:
+        for group in aliases.values():
+            group = canonical_keys(group)
+            for code in group:
+                self._groups.setdefault(code, group)
+
+    def group_for(self, code: str) -> List[str]:
+        return self._groups.get(code) or [code]
+
+
+_BUILTIN_ALIAS_INDEX = AliasIndex()
+_BUILTIN_ALIAS_INDEX.add_groups(KEY_ALIASES)
+_BUILTIN_ALIAS_INDEX.add_groups(MOUSE_ALIASES)
+
+
+def build_alias_index(dynamic_aliases: Dict[str, List[str]]) -> AliasIndex:
+    """Built-in index extended with the profile's learned aliases."""
+    index = _BUILTIN_ALIAS_INDEX.copy()
+    index.add_groups(dynamic_aliases)
+    return index
+
+
+def compact_actions(
+    mappings: Dict[str, Action],
+    dynamic_aliases: Dict[str, List[str]],
+) -> Dict[str, Action]:
+    """
+    `mappings` with canonical keys and one entry per alias group when the
+    mapped members of the group all carry the same action. This is the form
+    the GUI keeps and sends to the daemon; the mapper expands the groups again.
+    """
+    index = build_alias_index(dynamic_aliases)
+    actions = {canonical_mapping_key(code): action for code, action in mappings.items()}
+    payloads = {code: action.to_dict() for code, action in actions.items()}
+    compact: Dict[str, Action] = {}
+    covered: set[str] = set()
+    for code, payload in payloads.items():
+        if code in covered:
+            continue
+        group = index.group_for(code)
+        if all(payloads.get(member, payload) == payload for member in group):
+            covered.update(group)
+        compact[code] = actions[code]
+    return compact
+
+
+def compact_mappings(
+    mappings: Dict[str, Action],
+    dynamic_aliases: Dict[str, List[str]],
+) -> Dict[str, Dict[str, object]]:
+    """On-disk form of `mappings` (see `compact_actions`)."""
+    return {code: action.to_dict() for code, action in compact_actions(mappings, dynamic_aliases).items()}
+
+
+def alias_groups(
+    mappings: Dict[str, Action],
+    dynamic_aliases: Dict[str, List[str]],
+    layers: Optional[Dict[str, Dict[str, Action]]] = None,
+) -> List[List[str]]:
+    """Alias groups of the mapped keys, for the daemon to expand the compact mappings with."""
+    index = build_alias_index(dynamic_aliases)
+    groups: Dict[Tuple[str, ...], List[str]] = {}
+    for keys in (mappings, *(layers or {}).values()):
+        for code in keys:
+            group = index.group_for(canonical_mapping_key(code))
+            if len(group) > 1:
+                groups.setdefault(tuple(group), group)
+    return list(groups.values())
+
+
+def mapping_document(
     device_path: str,
     mappings: Dict[str, Action],
     dynamic_aliases: Dict[str, List[str]],
     key_id_map: Dict[str, Dict[str, str]],
     linked_apps: List[str] = None,
-) -> None:
-    data = {
-        "version": 2,
+    options: Optional[RemapOptions] = None,
+) -> Dict[str, object]:
+    """Remap section of a profile document (top-level keys)."""
+    return {
+        "version": MAPPING_FILE_VERSION,
         "device_path": device_path,
-        "mappings": {code: action.to_dict() for code, action in mappings.items()},
+        "mappings": compact_mappings(mappings, dynamic_aliases),
         "dynamic_aliases": dynamic_aliases,
         "key_id_map": key_id_map,
         "linked_apps": linked_apps or [],
+        **(options or RemapOptions()).to_document(),
     }
-    with open(path, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2)
 
 
-def load_mapping_file(
+def mapping_file_bytes(
+    device_path: str,
+    mappings: Dict[str, Action],
+    dynamic_aliases: Dict[str, List[str]],
+    key_id_map: Dict[str, Dict[str, str]],
+    linked_apps: List[str] = None,
+    options: Optional[RemapOptions] = None,
+) -> bytes:
+    data = mapping_document(device_path, mappings, dynamic_aliases, key_id_map, linked_apps, options)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def save_mapping_file(
     path: str,
-) -> Tuple[str, Dict[str, Action], Dict[str, List[str]], Dict[str, Dict[str, str]], List[str]]:
+    device_path: str,
+    mappings: Dict[str, Action],
+    dynamic_aliases: Dict[str, List[str]],
+    key_id_map: Dict[str, Dict[str, str]],
+    linked_apps: List[str] = None,
+    options: Optional[RemapOptions] = None,
+) -> None:
+    data = mapping_file_bytes(device_path, mappings, dynamic_aliases, key_id_map, linked_apps, options)
+    atomic_write_bytes(Path(path), data)
+
+
+def load_mapping_file(path: str) -> RemapPayload:
     with open(path, "r", encoding="utf-8") as handle:
-        raw = json.load(handle)
+        return parse_mapping_document(json.load(handle))
 
-    loaded_mappings: Dict[str, Action] = {}
-    for code, payload in raw.get("mappings", {}).items():
-        if isinstance(payload, dict) and "type" in payload:
-            loaded_mappings[code] = Action.from_dict(payload)
 
+def parse_mapping_document(raw: Dict[str, object]) -> RemapPayload:
+    """
+    Reads the remap section of a version 2 or 3 profile document.
+
+    Version 2 files spell one key several ways (KEY_F13, "183", ...) and list
+    every alias; both collapse to canonical keys and one entry per alias group
+    here, so a version 2 profile is migrated the next time it is saved.
+    """
+    loaded_mappings = _parse_actions(raw.get("mappings", {}), canonical=True)
     dynamic_aliases = _sanitize_aliases(raw.get("dynamic_aliases", {}))
     key_id_map = _sanitize_key_id_map(raw.get("key_id_map", {}))
     linked_apps = raw.get("linked_apps", [])
 
-    normalized = normalize_loaded_mappings(loaded_mappings, dynamic_aliases)
+    mappings = compact_actions(loaded_mappings, dynamic_aliases)
     device_path = str(raw.get("device_path", ""))
-    return device_path, normalized, dynamic_aliases, key_id_map, linked_apps
+    return device_path, mappings, dynamic_aliases, key_id_map, linked_apps, RemapOptions.from_document(raw)
 
 
-def normalize_loaded_mappings(
-    mappings: Dict[str, Action],
-    dynamic_aliases: Dict[str, List[str]],
-) -> Dict[str, Action]:
-    alias_groups = (
-        list(KEY_ALIASES.values())
-        + list(MOUSE_ALIASES.values())
-        + list(dynamic_aliases.values())
-    )
-    normalized: Dict[str, Action] = {}
-    for code, action in mappings.items():
-        expanded = [code]
-        for group in alias_groups:
-            if code in group:
-                expanded = group
-                break
-        for key_code in expanded:
-            normalized[key_code] = action
-    return normalized
+def _parse_actions(raw_actions: object, canonical: bool) -> Dict[str, Action]:
+    if not isinstance(raw_actions, dict):
+        return {}
+    actions: Dict[str, Action] = {}
+    for key, payload in raw_actions.items():
+        if isinstance(payload, dict) and "type" in payload:
+            actions[canonical_mapping_key(key) if canonical else str(key)] = Action.from_dict(payload)
+    return actions
 
 
 def _sanitize_aliases(raw_aliases: object) -> Dict[str, List[str]]:
@@ -84,9 +245,9 @@ def _sanitize_key_id_map(raw_map: object) -> Dict[str, Dict[str, str]]:
         if not isinstance(label, str) or not isinstance(payload, dict):
             continue
         entry: Dict[str, str] = {}
-        for field in ("symbolic", "numeric", "path", "scan"):
-            value = payload.get(field)
+        for name in ("symbolic", "numeric", "path", "scan"):
+            value = payload.get(name)
             if value is not None:
-                entry[field] = str(value)
+                entry[name] = str(value)
         sanitized[label] = entry
     return sanitized
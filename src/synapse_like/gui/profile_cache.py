@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import marshal
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from synapse_like.core.storage import atomic_write_bytes
+from synapse_like.gui.mapping_io import RemapOptions, RemapPayload, load_mapping_file
+from synapse_like.remap.actions import Action
+
+logger = logging.getLogger(__name__)
+
+CACHE_SUFFIX = ".bin"
+CACHE_MAGIC = b"SLPC"
+CACHE_VERSION = 3
+
+# magic, cache version, marshal version, sha256 of the JSON file, length of
+# the marshal section that follows.
+HEADER = struct.Struct("<4sHH32sI")
+
+
+@dataclass(slots=True)
+class CompiledProfile:
+    """Profile read from its binary sidecar; keys of one alias group share an Action."""
+
+    device_path: str
+    mappings: Dict[str, Action]
+    dynamic_aliases: Dict[str, List[str]]
+    key_id_map: Dict[str, Dict[str, str]]
+    linked_apps: List[str]
+    options: RemapOptions
+
+    def as_payload(self) -> RemapPayload:
+        return self.device_path, self.mappings, self.dynamic_aliases, self.key_id_map, self.linked_apps, self.options
+
+
+def cache_path(profile_path: Path) -> Path:
+    return Path(profile_path).with_suffix(CACHE_SUFFIX)
+
+
+def write_profile_cache(profile_path: Path) -> Optional[Path]:
+    """
+    Compiles the JSON profile at `profile_path` into its sidecar.
+
+    The JSON is parsed with the regular loader so the cache holds exactly what
+    a JSON load returns. Returns None when the sidecar could not be written.
+    """
+    profile_path = Path(profile_path)
+    try:
+        source = profile_path.read_bytes()
+        device_path, mappings, dynamic_aliases, key_id_map, linked_apps, options = load_mapping_file(str(profile_path))
+    except (OSError, ValueError) as exc:
+        logger.warning("Cannot compile profile %s: %s", profile_path, exc)
+        return None
+
+    actions: List[Action] = []
+    indexes: Dict[int, int] = {}
+    keys: List[tuple[str, int]] = []
+    for key, action in mappings.items():
+        index = indexes.get(id(action))
+        if index is None:
+            index = indexes[id(action)] = len(actions)
+            actions.append(action)
+        keys.append((key, index))
+
+    body = marshal.dumps(
+        {
+            "device_path": device_path,
+            "actions": [action.to_dict() for action in actions],
+            "keys": keys,
+            "dynamic_aliases": dynamic_aliases,
+            "key_id_map": key_id_map,
+            "linked_apps": list(linked_apps),
+            "options": options.to_document(),
+        }
+    )
+    header = HEADER.pack(
+        CACHE_MAGIC,
+        CACHE_VERSION,
+        marshal.version,
+        hashlib.sha256(source).digest(),
+        len(body),
+    )
+    target = cache_path(profile_path)
+    try:
+        # Rebuilt from the JSON whenever missing, so no fsync is needed.
+        atomic_write_bytes(target, header + body, durable=False)
+    except OSError as exc:
+        logger.warning("Cannot write profile cache %s: %s", target, exc)
+        return None
+    return target
+
+
+def load_profile_cache(profile_path: Path) -> Optional[CompiledProfile]:
+    """
+    Reads the sidecar of `profile_path`; None when it is missing, from another
+    format or marshal version, or stale (JSON hash mismatch).
+    """
+    profile_path = Path(profile_path)
+    try:
+        digest = hashlib.sha256(profile_path.read_bytes()).digest()
+        cached = cache_path(profile_path).read_bytes()
+    except OSError:
+        return None
+
+    if len(cached) < HEADER.size:
+        return None
+    magic, version, marshal_version, cached_digest, body_size = HEADER.unpack_from(cached)
+    if (
+        magic != CACHE_MAGIC
+        or version != CACHE_VERSION
+        or marshal_version != marshal.version
+        or cached_digest != digest
+        or len(cached) != HEADER.size + body_size
+    ):
+        return None
+    try:
+        data: Dict[str, Any] = marshal.loads(cached[HEADER.size:])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+    actions = [Action.from_dict(payload) for payload in data["actions"]]
+    return CompiledProfile(
+        device_path=data["device_path"],
+        mappings={key: actions[index] for key, index in data["keys"]},
+        dynamic_aliases=data["dynamic_aliases"],
+        key_id_map=data["key_id_map"],
+        linked_apps=data["linked_apps"],
+        options=RemapOptions.from_document(data["options"]),
+    )
+
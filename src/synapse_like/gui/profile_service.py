@@ -3,15 +3,16 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
 
-from synapse_like.gui.mapping_io import load_mapping_file, save_mapping_file
+from synapse_like.core.profile_store import HARDWARE_SECTION, PROFILE_DIR, ProfileStore, shared_store
+from synapse_like.core.storage import CoalescingWriter
+from synapse_like.gui.mapping_io import RemapOptions, RemapPayload, mapping_document, parse_mapping_document
+from synapse_like.gui.profile_cache import cache_path, load_profile_cache, write_profile_cache
 from synapse_like.remap.actions import Action
 
 logger = logging.getLogger(__name__)
 
-PROFILE_DIR = Path.home() / ".config" / "synapse-like" / "profiles"
-
 
 @dataclass(slots=True)
 class ProfileSummary:
@@ -21,36 +22,43 @@ class ProfileSummary:
     device_path: str
 
 
-ProfilePayload = Tuple[str, Dict[str, Action], Dict[str, List[str]], Dict[str, Dict[str, str]], List[str]]
+ProfilePayload = RemapPayload
 
 
 class ProfileService:
-    """Centralizes profile persistence and discovery."""
+    """
+    Remap view of the shared ProfileStore (the one core.profiles uses, unless
+    a store or writer is passed in).
+
+    Listing comes from the store index; loads prefer the compiled sidecar and
+    fall back to the store document. Saving replaces only the remap section,
+    so hardware settings kept in the same profile survive.
+    """
 
-    def __init__(self, profile_dir: Path = PROFILE_DIR):
-        self.profile_dir = profile_dir
-        self.profile_dir.mkdir(parents=True, exist_ok=True)
+    def __init__(
+        self,
+        profile_dir: Path = PROFILE_DIR,
+        writer: Optional[CoalescingWriter] = None,
+        store: Optional[ProfileStore] = None,
+    ):
+        if store is None:
+            store = ProfileStore(profile_dir, writer) if writer is not None else shared_store(profile_dir)
+        self.store = store
+        self.profile_dir = self.store.profile_dir
 
     def list_profiles(self) -> list[ProfileSummary]:
-        summaries: list[ProfileSummary] = []
-        for path in sorted(self.profile_dir.glob("*.json")):
-            try:
-                device_path, _, _, _, linked_apps = load_mapping_file(str(path))
-            except Exception as exc:
-                logger.warning("Skipping invalid profile %s: %s", path, exc)
-                continue
-            summaries.append(
-                ProfileSummary(
-                    name=path.stem,
-                    path=path,
-                    linked_apps=[app.casefold() for app in linked_apps],
-                    device_path=device_path,
-                )
+        return [
+            ProfileSummary(
+                name=entry.name,
+                path=entry.path,
+                linked_apps=list(entry.linked_apps),
+                device_path=entry.device_path,
             )
-        return summaries
+            for entry in self.store.entries()
+        ]
 
     def get_profile_path(self, name: str) -> Path:
-        return self.profile_dir / f"{name}.json"
+        return self.store.path_for(name)
 
     def save_profile(
         self,
@@ -60,16 +68,22 @@ class ProfileService:
         dynamic_aliases: Dict[str, List[str]],
         key_id_map: Dict[str, Dict[str, str]],
         linked_apps: Optional[List[str]] = None,
+        options: Optional[RemapOptions] = None,
     ) -> None:
-        save_mapping_file(
-            path=filepath,
-            device_path=device_path,
-            mappings=mappings,
-            dynamic_aliases=dynamic_aliases,
-            key_id_map=key_id_map,
-            linked_apps=linked_apps or [],
-        )
-        logger.info("Profile saved to %s", filepath)
+        name = Path(filepath).stem
+        document = mapping_document(device_path, mappings, dynamic_aliases, key_id_map, linked_apps or [], options)
+        stored = self.store.read_document(name) or {}
+        if HARDWARE_SECTION in stored:
+            document[HARDWARE_SECTION] = stored[HARDWARE_SECTION]
+        self.store.write_document(name, document, on_written=self._saved)
+
+    def _saved(self, path: Path) -> None:
+        write_profile_cache(path)
+        logger.info("Profile saved to %s", path)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every submitted save is on disk."""
+        return self.store.flush(timeout)
 
     def save_named_profile(
         self,
@@ -79,6 +93,7 @@ class ProfileService:
         dynamic_aliases: Dict[str, List[str]],
         key_id_map: Dict[str, Dict[str, str]],
         linked_apps: Optional[List[str]] = None,
+        options: Optional[RemapOptions] = None,
     ) -> Path:
         path = self.get_profile_path(name)
         self.save_profile(
@@ -88,22 +103,37 @@ class ProfileService:
             dynamic_aliases=dynamic_aliases,
             key_id_map=key_id_map,
             linked_apps=linked_apps or [],
+            options=options,
         )
         return path
 
     def load_profile(self, filepath: str) -> ProfilePayload:
+        """Loads from the compiled sidecar when it is current, else from the store (and recompiles)."""
+        path = Path(filepath)
+        pending = self.store.is_pending(path.stem)
+        if not pending:
+            compiled = load_profile_cache(path)
+            if compiled is not None:
+                return compiled.as_payload()
         logger.info("Loading profile from %s", filepath)
-        return load_mapping_file(filepath)
+        document = self.store.read_document(path.stem)
+        if document is None:
+            raise FileNotFoundError(filepath)
+        if not pending:
+            write_profile_cache(path)
+        return parse_mapping_document(document)
 
     def load_named_profile(self, name: str) -> ProfilePayload:
         return self.load_profile(str(self.get_profile_path(name)))
 
     def delete_profile(self, name: str) -> bool:
-        path = self.get_profile_path(name)
-        if not path.exists():
-            return False
-        path.unlink()
-        return True
+        deleted = self.store.delete(name)
+        cache_path(self.get_profile_path(name)).unlink(missing_ok=True)
+        return deleted
+
+    def rollback_profile(self, name: str, steps: int = 1) -> bool:
+        """Restores one of the journaled versions of a profile."""
+        return self.store.rollback(name, steps)
 
     def find_profile_for_window_class(self, wm_class: str) -> Optional[ProfileSummary]:
         normalized = wm_class.casefold().strip()
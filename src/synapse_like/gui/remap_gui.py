@@ -13,6 +13,7 @@ from PySide6.QtCore import QObject, QTimer, Signal
 from PySide6.QtGui import QAction, QCloseEvent
 from PySide6.QtWidgets import (
     QApplication,
+    QCheckBox,
     QComboBox,
     QFormLayout,
     QFrame,
@@ -35,6 +36,7 @@ from synapse_like.gui.constants import KEY_ALIASES, KEYMAP, MOUSE_ALIASES, MOUSE
 from synapse_like.gui.device_manager import DeviceInfo, DeviceManager
 from synapse_like.gui.dialogs import ActionDialog
 from synapse_like.gui.icons import build_app_icon
+from synapse_like.gui.mapping_io import RemapOptions, alias_groups, canonical_keys
 from synapse_like.gui.profile_service import ProfileService, ProfileSummary
 from synapse_like.gui.remap_service import RemapService
 from synapse_like.gui.theme import STYLE_SHEET
@@ -77,6 +79,7 @@ class RemapGUI(QMainWindow):
         self.dynamic_aliases: Dict[str, List[str]] = {}
         self.key_id_map: Dict[str, Dict[str, str]] = {}
         self.linked_apps: List[str] = []
+        self.remap_options = RemapOptions()
         self.current_profile: Optional[ProfileSummary] = None
 
         self.capture_active = False
@@ -202,6 +205,13 @@ class RemapGUI(QMainWindow):
         self.device_combo.setEditable(True)
         layout.addWidget(self.device_combo)
 
+        self.shared_output_check = QCheckBox("Saída única para todas as interfaces")
+        self.shared_output_check.setToolTip(
+            "Junta teclado e mouse de todas as interfaces do device em um só dispositivo virtual."
+        )
+        self.shared_output_check.toggled.connect(self._update_shared_output)
+        layout.addWidget(self.shared_output_check)
+
         self.learn_mx_btn = QPushButton("Aprender M-Keys")
         self.learn_all_btn = QPushButton("Aprender Teclado")
         self.learn_mx_btn.clicked.connect(self._toggle_mx_capture)
@@ -408,15 +418,13 @@ class RemapGUI(QMainWindow):
 
         action = dialog.get_action()
         if action.type == ActionType.MACRO:
-            action = Action(ActionType.MACRO, {"events": self.macro_editor.events})
+            action = Action(ActionType.MACRO, {"events": self.macro_editor.events}, repeat=action.repeat)
 
         codes = self._codes_for_label(label, fallback_code)
-        if action.type == ActionType.NONE:
-            for code in codes:
-                self.mappings.pop(code, None)
-        else:
-            for code in codes:
-                self.mappings[code] = action
+        for code in codes:
+            self.mappings.pop(code, None)
+        if action.type != ActionType.NONE:
+            self.mappings[codes[0]] = action
 
         self._sync_visual_state()
         self._set_status(f"{label} -> {self._action_text(action)}")
@@ -430,12 +438,12 @@ class RemapGUI(QMainWindow):
 
     def _codes_for_label(self, label: str, fallback_code: str) -> list[str]:
         if label in self.dynamic_aliases:
-            return self.dynamic_aliases[label]
+            return canonical_keys(self.dynamic_aliases[label])
         if label in KEY_ALIASES:
-            return KEY_ALIASES[label]
+            return canonical_keys(KEY_ALIASES[label])
         if label in MOUSE_ALIASES:
-            return MOUSE_ALIASES[label]
-        return [fallback_code]
+            return canonical_keys(MOUSE_ALIASES[label])
+        return canonical_keys([fallback_code])
 
     def _save_current_profile(self) -> None:
         profile_name = self.profile_name_input.text().strip() or "Default"
@@ -446,6 +454,7 @@ class RemapGUI(QMainWindow):
             dynamic_aliases=self.dynamic_aliases,
             key_id_map=self.key_id_map,
             linked_apps=self.linked_apps,
+            options=self.remap_options,
         )
         self.current_profile = ProfileSummary(
             name=profile_name,
@@ -466,7 +475,8 @@ class RemapGUI(QMainWindow):
 
     def _load_named_profile(self, profile_name: str, apply_after_load: bool = False) -> None:
         try:
-            device_path, mappings, dynamic_aliases, key_id_map, linked_apps = self.profile_service.load_named_profile(profile_name)
+            payload = self.profile_service.load_named_profile(profile_name)
+            device_path, mappings, dynamic_aliases, key_id_map, linked_apps, options = payload
         except Exception as exc:
             QMessageBox.critical(self, "Perfil", f"Nao foi possivel carregar o perfil: {exc}")
             return
@@ -475,6 +485,8 @@ class RemapGUI(QMainWindow):
         self.dynamic_aliases = dynamic_aliases
         self.key_id_map = key_id_map
         self.linked_apps = linked_apps
+        self.remap_options = options
+        self.shared_output_check.setChecked(options.shared_output)
         self.profile_name_input.setText(profile_name)
         self.linked_app_input.setText(", ".join(linked_apps))
         if device_path:
@@ -512,6 +524,8 @@ class RemapGUI(QMainWindow):
         self.dynamic_aliases = {}
         self.key_id_map = {}
         self.linked_apps = []
+        self.remap_options = RemapOptions()
+        self.shared_output_check.setChecked(False)
         self.macro_editor.clear_events()
         self._sync_visual_state()
         self._set_status("Perfil limpo.")
@@ -680,6 +694,9 @@ class RemapGUI(QMainWindow):
     def _update_linked_apps(self, text: str) -> None:
         self.linked_apps = [app.strip().casefold() for app in text.split(",") if app.strip()]
 
+    def _update_shared_output(self, checked: bool) -> None:
+        self.remap_options.shared_output = checked
+
     def _apply(self) -> None:
         if self.remap_service.is_busy():
             self._set_status("Aguardando operação atual terminar.")
@@ -690,7 +707,17 @@ class RemapGUI(QMainWindow):
             return
         self._stop_capture()
         self._set_service_busy(True, "Aplicando remap...")
-        self.remap_service.apply_configuration(device, self.mappings)
+        options = self.remap_options
+        self.remap_service.apply_configuration(
+            device,
+            self.mappings,
+            motion=options.motion,
+            layers=options.layers,
+            chords=options.chords,
+            chord_timeout_ms=options.chord_timeout_ms,
+            shared_output=options.shared_output,
+            aliases=alias_groups(self.mappings, self.dynamic_aliases, options.layers),
+        )
 
     def _stop(self) -> None:
         if self.remap_service.is_busy():
@@ -760,6 +787,8 @@ class RemapGUI(QMainWindow):
         if not self.remap_service.is_active():
             return
         active_keys = self.remap_service.get_input_state()
+        if active_keys is None:
+            return
         self.keyboard_svg.set_active_keys(active_keys)
         self.mouse_svg.set_active_keys(active_keys)
 
@@ -795,6 +824,21 @@ class RemapGUI(QMainWindow):
             return f"Macro ({event_count} eventos)"
         if action.type == ActionType.LAUNCH_APP:
             return f"Lançar app: {action.strategy.command}"
+        if action.type == ActionType.LAYER:
+            return f"Camada {action.strategy.layer} ({action.strategy.mode})"
+        if action.type == ActionType.TEXT:
+            preview = action.strategy.text if len(action.strategy.text) <= 24 else f"{action.strategy.text[:24]}…"
+            return f"Texto: {preview}"
+        if action.type == ActionType.MOUSE_CLICK:
+            suffix = f" x{action.strategy.clicks}" if action.strategy.clicks > 1 else ""
+            return f"Clique {action.strategy.button}{suffix}"
+        if action.type == ActionType.DRAG_LOCK:
+            return f"Travar arraste {action.strategy.button}"
+        if action.type == ActionType.MOUSE_NUDGE:
+            return f"Mover ponteiro ({action.strategy.dx}, {action.strategy.dy})"
+        if action.type == ActionType.TAP_HOLD:
+            parts = [self._action_text(inner) for inner in action.strategy.nested_actions()]
+            return f"Toque/Segurar: {' / '.join(parts)}"
         return action.type.value.replace("_", " ").title()
 
     def _set_status(self, text: str) -> None:
@@ -831,6 +875,7 @@ class RemapGUI(QMainWindow):
         self.window_monitor.stop()
         self.device_manager.stop_monitoring()
         self._stop_capture()
+        self.profile_service.flush(timeout=2.0)
         if self.remap_service.is_active():
             self.remap_service.stop_all()
             if self.remap_service._thread and self.remap_service._thread.is_alive():
@@ -7,10 +7,12 @@ import sys
 import threading
 import time
 from multiprocessing.connection import Client
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from synapse_like.daemon.ipc import DAEMON_ADDRESS, DAEMON_AUTHKEY
 from synapse_like.remap.actions import Action
+from synapse_like.remap.motion import MotionSettings
+from synapse_like.remap.timing import DEFAULT_CHORD_TIMEOUT_MS
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +27,7 @@ class RemapService:
         self.busy = False
         self.service_queue: queue.Queue[Dict[str, Any]] = queue.Queue()
         self._thread: Optional[threading.Thread] = None
+        self._input_generation: Optional[int] = None
 
     def is_busy(self) -> bool:
         return self.busy
@@ -32,13 +35,32 @@ class RemapService:
     def is_active(self) -> bool:
         return self.active_count > 0
 
-    def apply_configuration(self, device_path: str, mappings: Dict[str, Action]) -> None:
+    def apply_configuration(
+        self,
+        device_path: str,
+        mappings: Dict[str, Action],
+        motion: Optional[MotionSettings] = None,
+        layers: Optional[Dict[str, Dict[str, Action]]] = None,
+        chords: Optional[Dict[str, Action]] = None,
+        chord_timeout_ms: int = DEFAULT_CHORD_TIMEOUT_MS,
+        shared_output: bool = False,
+        aliases: Optional[List[List[str]]] = None,
+    ) -> None:
         if self.busy:
             return
         self.busy = True
         self._thread = threading.Thread(
             target=self._apply_worker,
-            args=(device_path, dict(mappings)),
+            args=(
+                device_path,
+                dict(mappings),
+                motion,
+                dict(layers or {}),
+                dict(chords or {}),
+                chord_timeout_ms,
+                shared_output,
+                list(aliases or []),
+            ),
             daemon=True,
         )
         self._thread.start()
@@ -53,21 +75,48 @@ class RemapService:
     def shutdown_daemon(self) -> None:
         self._send_command({"command": "SHUTDOWN"})
 
-    def get_input_state(self) -> list[str]:
+    def get_input_state(self) -> Optional[list[str]]:
+        """Held keys, or None when nothing changed since the previous call."""
         if not self.is_active():
             return []
-        response = self._send_command({"command": "GET_INPUT_STATE"})
+        response = self._send_command({"command": "GET_INPUT_STATE", "generation": self._input_generation})
+        if response.get("unchanged"):
+            return None
+        self._input_generation = response.get("generation")
         return response.get("active_keys", [])
 
     def get_status(self) -> Dict[str, Any]:
         return self._send_command({"command": "STATUS"})
 
-    def _apply_worker(self, device_path: str, mappings: Dict[str, Action]) -> None:
+    def get_metrics(self) -> list[Dict[str, Any]]:
+        response = self._send_command({"command": "METRICS"})
+        return response.get("mappers", [])
+
+    def _apply_worker(
+        self,
+        device_path: str,
+        mappings: Dict[str, Action],
+        motion: Optional[MotionSettings],
+        layers: Dict[str, Dict[str, Action]],
+        chords: Dict[str, Action],
+        chord_timeout_ms: int,
+        shared_output: bool,
+        aliases: List[List[str]],
+    ) -> None:
         response = self._send_command(
             {
                 "command": "APPLY",
                 "device": device_path,
                 "mappings": {code: action.to_dict() for code, action in mappings.items()},
+                "layers": {
+                    name: {code: action.to_dict() for code, action in layer.items()}
+                    for name, layer in layers.items()
+                },
+                "chords": {combo: action.to_dict() for combo, action in chords.items()},
+                "aliases": aliases,
+                "chord_timeout_ms": chord_timeout_ms,
+                "motion": motion.to_dict() if motion is not None else None,
+                "shared_output": shared_output,
             }
         )
         self.active_count = int(response.get("active_count", 0))
@@ -1,10 +1,5 @@
-from evdev import ecodes
+from synapse_like.remap.codes import code_name
 
 
 def event_code_name(code: int) -> str:
-    if code in ecodes.KEY:
-        return ecodes.KEY[code]
-    for name, value in ecodes.ecodes.items():
-        if value == code:
-            return name
-    return str(code)
+    return code_name(code)
@@ -1,4 +1,21 @@
-from synapse_like.remap.actions import ActionType, Action
-from synapse_like.remap.mapper import InputMapper, MappingConfig
+from typing import Any
+
+_EXPORTS = {
+    "ActionType": "synapse_like.remap.actions",
+    "Action": "synapse_like.remap.actions",
+    "InputMapper": "synapse_like.remap.mapper",
+    "MappingConfig": "synapse_like.remap.mapper",
+}
 
 __all__ = ["ActionType", "Action", "InputMapper", "MappingConfig"]
+
+
+def __getattr__(name: str) -> Any:
+    # Importing one submodule (codes, layers, ...) should not drag in the
+    # mapper and its evdev/uinput setup.
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    return getattr(import_module(module_name), name)
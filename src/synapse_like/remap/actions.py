@@ -1,15 +1,24 @@
 from __future__ import annotations
 
-import subprocess
-import threading
-import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, ClassVar, Dict, Iterable, Mapping, Optional, Type
+from typing import Any, ClassVar, Dict, Iterable, Mapping, Optional, Tuple, Type
 
 from evdev import ecodes
 
+from synapse_like.remap import native
+from synapse_like.remap.launcher import LAUNCHER, build_argv, needs_shell
+from synapse_like.remap.macros import (
+    DEFAULT_TEXT_LAYOUT,
+    DEFAULT_TYPING_RATE,
+    MACRO_PLAYER,
+    MacroProgram,
+    compile_macro,
+    compile_text,
+    program_key_codes,
+)
+
 
 class ActionType(str, Enum):
     NONE = "none"
@@ -18,14 +27,81 @@ class ActionType(str, Enum):
     SCROLL_DOWN = "scroll_down"
     MACRO = "macro"
     LAUNCH_APP = "launch_app"
+    LAYER = "layer"
+    TAP_HOLD = "tap_hold"
+    TEXT = "text"
+    MOUSE_CLICK = "mouse_click"
+    DRAG_LOCK = "drag_lock"
+    MOUSE_NUDGE = "mouse_nudge"
+
+
+LAYER_MODES = ("momentary", "toggle", "oneshot")
+DEFAULT_HOLD_MS = 200
+
+REPEAT_SUPPRESS = "suppress"
+REPEAT_FORWARD = "forward"
+REPEAT_SYNTHESIZE = "synthesize"
+REPEAT_TURBO = "turbo"
+REPEAT_MODES = (REPEAT_SUPPRESS, REPEAT_FORWARD, REPEAT_SYNTHESIZE, REPEAT_TURBO)
+# Modes driven by the mapper's repeat timer rather than by kernel autorepeat.
+TIMED_REPEAT_MODES = (REPEAT_SYNTHESIZE, REPEAT_TURBO)
+
+
+@dataclass(slots=True, frozen=True)
+class RepeatPolicy:
+    """
+    What a held key does with autorepeat (value 2) events.
+
+    `suppress` drops them, `forward` passes the kernel's repeats to the action
+    and `synthesize` ignores them and repeats from the mapper's own timer after
+    `delay_ms`, at `rate_hz`. `turbo` (rapid fire) presses and releases the
+    action `rate_hz` times per second for as long as the key is held; only
+    actions that support it (keystrokes, mouse clicks) honour it.
+    """
+
+    mode: str = REPEAT_SUPPRESS
+    delay_ms: int = 250
+    rate_hz: float = 30.0
+
+    @property
+    def delay_ns(self) -> int:
+        return self.delay_ms * 1_000_000
+
+    @property
+    def interval_ns(self) -> int:
+        return int(1_000_000_000 / self.rate_hz)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "delay_ms": self.delay_ms, "rate_hz": self.rate_hz}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "RepeatPolicy":
+        mode = str(data.get("mode", REPEAT_SUPPRESS))
+        try:
+            delay_ms = max(int(data.get("delay_ms", 250)), 0)
+            rate_hz = min(max(float(data.get("rate_hz", 30.0)), 1.0), 1000.0)
+        except (TypeError, ValueError):
+            delay_ms, rate_hz = 250, 30.0
+        return cls(mode=mode if mode in REPEAT_MODES else REPEAT_SUPPRESS, delay_ms=delay_ms, rate_hz=rate_hz)
+
+
+SUPPRESS_REPEAT = RepeatPolicy(REPEAT_SUPPRESS)
+FORWARD_REPEAT = RepeatPolicy(REPEAT_FORWARD)
 
 
 class ActionStrategy(ABC):
     type_name: ClassVar[str] = ActionType.NONE.value
 
     @abstractmethod
-    def execute(self, uinput_device: Any, event_value: int, payload: Dict[str, Any]) -> None:
-        """Executes the action against a writable input sink."""
+    def execute(self, uinput_device: Any, event_value: int, state: Dict[str, Any]) -> None:
+        """
+        Executes the action against a writable input sink.
+
+        Strategies are immutable configuration shared by every mapper the
+        profile runs on; anything an action must remember between events
+        (latches, remainders) lives in `state`, the calling mapper's scratch
+        dict for this action, which the mapper drops when it stops.
+        """
 
     @abstractmethod
     def to_dict(self) -> Dict[str, Any]:
@@ -45,14 +121,35 @@ class ActionStrategy(ABC):
     def required_rel_codes(self) -> Iterable[int]:
         return ()
 
+    def nested_actions(self) -> Iterable["Action"]:
+        return ()
+
+    def writes_output(self) -> bool:
+        """False for control actions interpreted by the mapper itself."""
+        return True
+
+    def default_repeat_policy(self) -> RepeatPolicy:
+        return SUPPRESS_REPEAT
+
+    def supports_turbo(self) -> bool:
+        """True when replaying press/release pairs is meaningful (rapid fire)."""
+        return False
+
+    def native_entry(self) -> Optional[native.NativeEntry]:
+        """`(action, target, argument)` for the native loop, or None if unsupported."""
+        return None
+
 
 @dataclass(slots=True)
 class NoneActionStrategy(ActionStrategy):
     type_name: ClassVar[str] = ActionType.NONE.value
 
-    def execute(self, uinput_device: Any, event_value: int, payload: Dict[str, Any]) -> None:
+    def execute(self, uinput_device: Any, event_value: int, state: Dict[str, Any]) -> None:
         return
 
+    def native_entry(self) -> Optional[native.NativeEntry]:
+        return (native.ACTION_NONE, 0, 0)
+
     def to_dict(self) -> Dict[str, Any]:
         return {}
 
@@ -67,7 +164,7 @@ class KeystrokeActionStrategy(ActionStrategy):
     key: Optional[str] = None
     modifiers: list[str] = field(default_factory=list)
 
-    def execute(self, uinput_device: Any, event_value: int, payload: Dict[str, Any]) -> None:
+    def execute(self, uinput_device: Any, event_value: int, state: Dict[str, Any]) -> None:
         if uinput_device is None or not self.key:
             return
 
@@ -93,6 +190,23 @@ class KeystrokeActionStrategy(ActionStrategy):
             for modifier in reversed(modifier_codes):
                 uinput_device.write(ecodes.EV_KEY, modifier, 0)
             uinput_device.syn()
+            return
+
+        if event_value == 2:
+            uinput_device.write(ecodes.EV_KEY, key_code, 2)
+            uinput_device.syn()
+
+    def default_repeat_policy(self) -> RepeatPolicy:
+        return FORWARD_REPEAT
+
+    def supports_turbo(self) -> bool:
+        return True
+
+    def native_entry(self) -> Optional[native.NativeEntry]:
+        key_code = ecodes.ecodes.get(self.key) if self.key else None
+        if key_code is None or self.modifiers:
+            return None
+        return (native.ACTION_KEYSTROKE, key_code, 0)
 
     def to_dict(self) -> Dict[str, Any]:
         return {"key": self.key, "modifiers": list(self.modifiers)}
@@ -114,87 +228,265 @@ class KeystrokeActionStrategy(ActionStrategy):
         return codes
 
 
+WHEEL_NOTCH = 120
+SMOOTH_FRAME_MS = 8
+
+
 @dataclass(slots=True)
-class ScrollUpActionStrategy(ActionStrategy):
-    type_name: ClassVar[str] = ActionType.SCROLL_UP.value
+class WheelActionStrategy(ActionStrategy):
+    """
+    Wheel output in hi-res units (120 per notch, as in the kernel ABI).
+
+    Legacy REL_WHEEL/REL_HWHEEL notches are derived from the accumulated
+    units, so fractional steps still produce whole notches for old clients;
+    with `hi_res` the matching *_HI_RES axis is written as well. Horizontal
+    scroll treats "up" as right. `smooth_frames` > 1 lets the mapper spread
+    one step across frames `SMOOTH_FRAME_MS` apart.
+    """
+
+    direction: ClassVar[int] = 1
+    amount: int = WHEEL_NOTCH
+    horizontal: bool = False
+    hi_res: bool = False
+    smooth_frames: int = 1
+
+    def execute(self, uinput_device: Any, event_value: int, state: Dict[str, Any]) -> None:
+        if uinput_device is None or event_value == 0:
+            return
+        self.emit_units(uinput_device, self.direction * self.amount, state)
 
-    def execute(self, uinput_device: Any, event_value: int, payload: Dict[str, Any]) -> None:
-        if uinput_device is None or event_value != 1:
+    def frame_units(self, index: int) -> int:
+        """Units for frame `index` of a smooth burst; frames sum to `amount`."""
+        frames = self.smooth_frames
+        return self.direction * ((self.amount * (index + 1)) // frames - (self.amount * index) // frames)
+
+    def emit_units(self, uinput_device: Any, units: int, state: Dict[str, Any]) -> None:
+        if not units:
             return
-        uinput_device.write(ecodes.EV_REL, ecodes.REL_WHEEL, 1)
+        if self.hi_res:
+            uinput_device.write(
+                ecodes.EV_REL,
+                ecodes.REL_HWHEEL_HI_RES if self.horizontal else ecodes.REL_WHEEL_HI_RES,
+                units,
+            )
+        remainder = state.get("remainder", 0) + units
+        notches = int(remainder / WHEEL_NOTCH)
+        state["remainder"] = remainder - notches * WHEEL_NOTCH
+        if notches:
+            uinput_device.write(ecodes.EV_REL, ecodes.REL_HWHEEL if self.horizontal else ecodes.REL_WHEEL, notches)
         uinput_device.syn()
 
     def to_dict(self) -> Dict[str, Any]:
-        return {}
+        return {
+            "amount": self.amount,
+            "horizontal": self.horizontal,
+            "hi_res": self.hi_res,
+            "smooth_frames": self.smooth_frames,
+        }
 
     @classmethod
-    def from_dict(cls, data: Mapping[str, Any]) -> "ScrollUpActionStrategy":
-        return cls()
+    def from_dict(cls, data: Mapping[str, Any]) -> "WheelActionStrategy":
+        try:
+            amount = int(data.get("amount", WHEEL_NOTCH))
+            smooth_frames = int(data.get("smooth_frames", 1))
+        except (TypeError, ValueError):
+            amount, smooth_frames = WHEEL_NOTCH, 1
+        return cls(
+            amount=amount if amount > 0 else WHEEL_NOTCH,
+            horizontal=bool(data.get("horizontal", False)),
+            hi_res=bool(data.get("hi_res", False)),
+            smooth_frames=min(max(smooth_frames, 1), 64),
+        )
 
     def prefers_pointer_output(self) -> bool:
         return True
 
+    def native_entry(self) -> Optional[native.NativeEntry]:
+        if self.amount != WHEEL_NOTCH or self.horizontal or self.hi_res or self.smooth_frames > 1:
+            return None
+        return (native.ACTION_SCROLL_UP if self.direction > 0 else native.ACTION_SCROLL_DOWN, 0, 0)
+
     def required_rel_codes(self) -> Iterable[int]:
-        return (ecodes.REL_WHEEL,)
+        if self.horizontal:
+            return (ecodes.REL_HWHEEL, ecodes.REL_HWHEEL_HI_RES) if self.hi_res else (ecodes.REL_HWHEEL,)
+        return (ecodes.REL_WHEEL, ecodes.REL_WHEEL_HI_RES) if self.hi_res else (ecodes.REL_WHEEL,)
 
 
 @dataclass(slots=True)
-class ScrollDownActionStrategy(ActionStrategy):
+class ScrollUpActionStrategy(WheelActionStrategy):
+    type_name: ClassVar[str] = ActionType.SCROLL_UP.value
+    direction: ClassVar[int] = 1
+
+
+@dataclass(slots=True)
+class ScrollDownActionStrategy(WheelActionStrategy):
     type_name: ClassVar[str] = ActionType.SCROLL_DOWN.value
+    direction: ClassVar[int] = -1
+
+
+POINTER_BUTTONS = ("BTN_LEFT", "BTN_RIGHT", "BTN_MIDDLE", "BTN_SIDE", "BTN_EXTRA")
+DEFAULT_CLICK_INTERVAL_MS = 30
+
+
+def _pointer_button(data: Mapping[str, Any]) -> str:
+    button = data.get("button", POINTER_BUTTONS[0])
+    return button if button in POINTER_BUTTONS else POINTER_BUTTONS[0]
 
-    def execute(self, uinput_device: Any, event_value: int, payload: Dict[str, Any]) -> None:
+
+@dataclass(slots=True)
+class PointerButtonActionStrategy(ActionStrategy):
+    """Base for actions that drive a mouse button on the shared pointer sink."""
+
+    button: str = POINTER_BUTTONS[0]
+
+    @property
+    def button_code(self) -> int:
+        return ecodes.ecodes[self.button]
+
+    def prefers_pointer_output(self) -> bool:
+        return True
+
+    def required_key_codes(self) -> Iterable[int]:
+        return (self.button_code,)
+
+
+@dataclass(slots=True)
+class MouseClickActionStrategy(PointerButtonActionStrategy):
+    """
+    Mouse button click.
+
+    A single click follows the key (press holds the button, so dragging works).
+    With `clicks` > 1 the whole sequence goes out on press through the macro
+    player, `interval_ms` between clicks (0 sends them back to back).
+    """
+
+    type_name: ClassVar[str] = ActionType.MOUSE_CLICK.value
+    clicks: int = 1
+    interval_ms: int = DEFAULT_CLICK_INTERVAL_MS
+    _program: MacroProgram = field(default=(), init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        code = self.button_code
+        interval = self.interval_ms / 1000.0
+        steps = []
+        for index in range(self.clicks if self.clicks > 1 else 0):
+            steps.extend(((interval if index else 0.0, code, 1), (0.0, code, 0)))
+        self._program = tuple(steps)
+
+    def execute(self, uinput_device: Any, event_value: int, state: Dict[str, Any]) -> None:
+        if uinput_device is None or event_value == 2:
+            return
+        if self._program:
+            if event_value == 1:
+                MACRO_PLAYER.submit(uinput_device, self._program)
+            return
+        uinput_device.write(ecodes.EV_KEY, self.button_code, event_value)
+        uinput_device.syn()
+
+    def supports_turbo(self) -> bool:
+        return True
+
+    def native_entry(self) -> Optional[native.NativeEntry]:
+        if self.clicks > 1:
+            return (native.ACTION_CLICK, self.button_code, native.pack_click(self.clicks, self.interval_ms))
+        return (native.ACTION_BUTTON, self.button_code, 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"button": self.button, "clicks": self.clicks, "interval_ms": self.interval_ms}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "MouseClickActionStrategy":
+        try:
+            clicks = int(data.get("clicks", 1))
+            interval_ms = int(data.get("interval_ms", DEFAULT_CLICK_INTERVAL_MS))
+        except (TypeError, ValueError):
+            clicks, interval_ms = 1, DEFAULT_CLICK_INTERVAL_MS
+        return cls(
+            button=_pointer_button(data),
+            clicks=min(max(clicks, 1), 10),
+            interval_ms=min(max(interval_ms, 0), 1000),
+        )
+
+
+@dataclass(slots=True)
+class DragLockActionStrategy(PointerButtonActionStrategy):
+    """Each press toggles the button between held and released (drag lock)."""
+
+    type_name: ClassVar[str] = ActionType.DRAG_LOCK.value
+
+    def execute(self, uinput_device: Any, event_value: int, state: Dict[str, Any]) -> None:
         if uinput_device is None or event_value != 1:
             return
-        uinput_device.write(ecodes.EV_REL, ecodes.REL_WHEEL, -1)
+        locked = state["locked"] = not state.get("locked", False)
+        uinput_device.write(ecodes.EV_KEY, self.button_code, 1 if locked else 0)
         uinput_device.syn()
 
+    def native_entry(self) -> Optional[native.NativeEntry]:
+        return (native.ACTION_DRAG_LOCK, self.button_code, 0)
+
     def to_dict(self) -> Dict[str, Any]:
-        return {}
+        return {"button": self.button}
 
     @classmethod
-    def from_dict(cls, data: Mapping[str, Any]) -> "ScrollDownActionStrategy":
-        return cls()
+    def from_dict(cls, data: Mapping[str, Any]) -> "DragLockActionStrategy":
+        return cls(button=_pointer_button(data))
+
+
+@dataclass(slots=True)
+class MouseNudgeActionStrategy(ActionStrategy):
+    """Moves the pointer by (`dx`, `dy`) pixels per press and per key repeat."""
+
+    type_name: ClassVar[str] = ActionType.MOUSE_NUDGE.value
+    dx: int = 0
+    dy: int = 0
+
+    def execute(self, uinput_device: Any, event_value: int, state: Dict[str, Any]) -> None:
+        if uinput_device is None or event_value == 0 or not (self.dx or self.dy):
+            return
+        if self.dx:
+            uinput_device.write(ecodes.EV_REL, ecodes.REL_X, self.dx)
+        if self.dy:
+            uinput_device.write(ecodes.EV_REL, ecodes.REL_Y, self.dy)
+        uinput_device.syn()
+
+    def default_repeat_policy(self) -> RepeatPolicy:
+        return FORWARD_REPEAT
+
+    def native_entry(self) -> Optional[native.NativeEntry]:
+        return (native.ACTION_NUDGE, 0, native.pack_nudge(self.dx, self.dy))
 
     def prefers_pointer_output(self) -> bool:
         return True
 
     def required_rel_codes(self) -> Iterable[int]:
-        return (ecodes.REL_WHEEL,)
+        return (ecodes.REL_X, ecodes.REL_Y)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"dx": self.dx, "dy": self.dy}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "MouseNudgeActionStrategy":
+        try:
+            dx = int(data.get("dx", 0))
+            dy = int(data.get("dy", 0))
+        except (TypeError, ValueError):
+            dx, dy = 0, 0
+        return cls(dx=min(max(dx, -1000), 1000), dy=min(max(dy, -1000), 1000))
 
 
 @dataclass(slots=True)
 class MacroActionStrategy(ActionStrategy):
     type_name: ClassVar[str] = ActionType.MACRO.value
     events: list[Dict[str, Any]] = field(default_factory=list)
+    _program: MacroProgram = field(default=(), init=False, repr=False, compare=False)
 
-    def execute(self, uinput_device: Any, event_value: int, payload: Dict[str, Any]) -> None:
-        if uinput_device is None or event_value != 1 or not self.events:
-            return
-        threading.Thread(target=self._run, args=(uinput_device,), daemon=True).start()
-
-    def _run(self, uinput_device: Any) -> None:
-        for event in self.events:
-            event_type = event.get("type")
-            if event_type == "delay":
-                delay_ms = int(event.get("value", 0))
-                if delay_ms > 0:
-                    time.sleep(delay_ms / 1000.0)
-                continue
-
-            if event_type != "key":
-                continue
-
-            code_name = event.get("code")
-            if not isinstance(code_name, str):
-                continue
+    def __post_init__(self) -> None:
+        self._program = compile_macro(self.events)
 
-            code = ecodes.ecodes.get(code_name)
-            if code is None:
-                continue
-
-            state = int(event.get("state", 1))
-            uinput_device.write(ecodes.EV_KEY, code, state)
-            uinput_device.syn()
+    def execute(self, uinput_device: Any, event_value: int, state: Dict[str, Any]) -> None:
+        if uinput_device is None or event_value != 1:
+            return
+        MACRO_PLAYER.submit(uinput_device, self._program)
 
     def to_dict(self) -> Dict[str, Any]:
         return {"events": [dict(event) for event in self.events]}
@@ -207,36 +499,159 @@ class MacroActionStrategy(ActionStrategy):
         return cls(events=[dict(event) for event in raw_events if isinstance(event, Mapping)])
 
     def required_key_codes(self) -> Iterable[int]:
-        codes: list[int] = []
-        for event in self.events:
-            if event.get("type") != "key":
-                continue
-            code_name = event.get("code")
-            if not isinstance(code_name, str):
-                continue
-            code = ecodes.ecodes.get(code_name)
-            if code is not None:
-                codes.append(code)
-        return codes
+        return program_key_codes(self._program)
+
+
+@dataclass(slots=True)
+class TextActionStrategy(ActionStrategy):
+    """
+    Types a Unicode string ("Texto Rápido").
+
+    The text is compiled once into key/shift steps for `layout`; characters the
+    layout cannot type fall back to Unicode input. Playback goes through the
+    shared macro player at `rate_cps` characters per second.
+    """
+
+    type_name: ClassVar[str] = ActionType.TEXT.value
+    text: str = ""
+    layout: str = DEFAULT_TEXT_LAYOUT
+    rate_cps: float = DEFAULT_TYPING_RATE
+    _program: MacroProgram = field(default=(), init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._program = compile_text(self.text, self.layout, self.rate_cps)
+
+    def execute(self, uinput_device: Any, event_value: int, state: Dict[str, Any]) -> None:
+        if uinput_device is None or event_value != 1:
+            return
+        MACRO_PLAYER.submit(uinput_device, self._program)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"text": self.text, "layout": self.layout, "rate_cps": self.rate_cps}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "TextActionStrategy":
+        text = data.get("text", "")
+        layout = data.get("layout", DEFAULT_TEXT_LAYOUT)
+        try:
+            rate_cps = min(max(float(data.get("rate_cps", DEFAULT_TYPING_RATE)), 1.0), 1000.0)
+        except (TypeError, ValueError):
+            rate_cps = DEFAULT_TYPING_RATE
+        return cls(
+            text=str(text) if text else "",
+            layout=str(layout) if layout else DEFAULT_TEXT_LAYOUT,
+            rate_cps=rate_cps,
+        )
+
+    def required_key_codes(self) -> Iterable[int]:
+        return program_key_codes(self._program)
 
 
 @dataclass(slots=True)
 class LaunchAppActionStrategy(ActionStrategy):
+    """
+    Starts a program through the shared spawner process.
+
+    The command is split into argv once; it only runs through /bin/sh when
+    `shell` is set (legacy commands using shell syntax get it automatically).
+    """
+
     type_name: ClassVar[str] = ActionType.LAUNCH_APP.value
     command: str = ""
+    shell: bool = False
+    _argv: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._argv = build_argv(self.command, self.shell)
 
-    def execute(self, uinput_device: Any, event_value: int, payload: Dict[str, Any]) -> None:
-        if event_value != 1 or not self.command.strip():
+    def execute(self, uinput_device: Any, event_value: int, state: Dict[str, Any]) -> None:
+        if event_value != 1 or not self._argv:
             return
-        subprocess.Popen(self.command, shell=True)
+        LAUNCHER.launch(self._argv)
 
     def to_dict(self) -> Dict[str, Any]:
-        return {"command": self.command}
+        return {"command": self.command, "shell": self.shell}
 
     @classmethod
     def from_dict(cls, data: Mapping[str, Any]) -> "LaunchAppActionStrategy":
-        command = data.get("command", "")
-        return cls(command=str(command) if command else "")
+        command = str(data.get("command", "") or "")
+        shell = data.get("shell")
+        return cls(command=command, shell=bool(shell) if shell is not None else needs_shell(command))
+
+
+@dataclass(slots=True)
+class LayerActionStrategy(ActionStrategy):
+    """
+    Switches the mapper's active keymap layer.
+
+    The mapper's layer engine interprets it; nothing is written to the sink.
+    """
+
+    type_name: ClassVar[str] = ActionType.LAYER.value
+    layer: str = ""
+    mode: str = "momentary"
+
+    def execute(self, uinput_device: Any, event_value: int, state: Dict[str, Any]) -> None:
+        return
+
+    def writes_output(self) -> bool:
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"layer": self.layer, "mode": self.mode}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "LayerActionStrategy":
+        layer = data.get("layer", "")
+        mode = str(data.get("mode", "momentary"))
+        return cls(
+            layer=str(layer) if layer else "",
+            mode=mode if mode in LAYER_MODES else "momentary",
+        )
+
+
+@dataclass(slots=True)
+class TapHoldActionStrategy(ActionStrategy):
+    """
+    Dual-role key: `tap` when released before `hold_ms`, `hold` otherwise.
+
+    Resolved by the mapper's timing stage; the inner actions do the writing.
+    """
+
+    type_name: ClassVar[str] = ActionType.TAP_HOLD.value
+    tap: Optional["Action"] = None
+    hold: Optional["Action"] = None
+    hold_ms: int = DEFAULT_HOLD_MS
+
+    def execute(self, uinput_device: Any, event_value: int, state: Dict[str, Any]) -> None:
+        return
+
+    def writes_output(self) -> bool:
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tap": self.tap.to_dict() if self.tap is not None else None,
+            "hold": self.hold.to_dict() if self.hold is not None else None,
+            "hold_ms": self.hold_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "TapHoldActionStrategy":
+        tap = data.get("tap")
+        hold = data.get("hold")
+        try:
+            hold_ms = int(data.get("hold_ms", DEFAULT_HOLD_MS))
+        except (TypeError, ValueError):
+            hold_ms = DEFAULT_HOLD_MS
+        return cls(
+            tap=Action.from_dict(tap) if isinstance(tap, Mapping) else None,
+            hold=Action.from_dict(hold) if isinstance(hold, Mapping) else None,
+            hold_ms=hold_ms if hold_ms > 0 else DEFAULT_HOLD_MS,
+        )
+
+    def nested_actions(self) -> Iterable["Action"]:
+        return [action for action in (self.tap, self.hold) if action is not None]
 
 
 ACTION_STRATEGY_MAP: Dict[str, Type[ActionStrategy]] = {
@@ -246,6 +661,12 @@ ACTION_STRATEGY_MAP: Dict[str, Type[ActionStrategy]] = {
     ActionType.SCROLL_DOWN.value: ScrollDownActionStrategy,
     ActionType.MACRO.value: MacroActionStrategy,
     ActionType.LAUNCH_APP.value: LaunchAppActionStrategy,
+    ActionType.LAYER.value: LayerActionStrategy,
+    ActionType.TAP_HOLD.value: TapHoldActionStrategy,
+    ActionType.TEXT.value: TextActionStrategy,
+    ActionType.MOUSE_CLICK.value: MouseClickActionStrategy,
+    ActionType.DRAG_LOCK.value: DragLockActionStrategy,
+    ActionType.MOUSE_NUDGE.value: MouseNudgeActionStrategy,
 }
 
 
@@ -256,7 +677,9 @@ class Action:
         payload: Optional[Mapping[str, Any]] = None,
         *,
         strategy: Optional[ActionStrategy] = None,
+        repeat: Optional[RepeatPolicy] = None,
     ) -> None:
+        self.repeat = repeat
         if strategy is not None:
             self.strategy = strategy
             return
@@ -284,8 +707,19 @@ class Action:
     def type_name(self) -> str:
         return self.strategy.type_name
 
+    @property
+    def repeat_policy(self) -> RepeatPolicy:
+        """Explicit policy, or the strategy's native behaviour when unset or unsupported."""
+        repeat = self.repeat
+        if repeat is None or (repeat.mode == REPEAT_TURBO and not self.strategy.supports_turbo()):
+            return self.strategy.default_repeat_policy()
+        return repeat
+
     def to_dict(self) -> Dict[str, Any]:
-        return {"type": self.strategy.type_name, "payload": self.strategy.to_dict()}
+        data: Dict[str, Any] = {"type": self.strategy.type_name, "payload": self.strategy.to_dict()}
+        if self.repeat is not None:
+            data["repeat"] = self.repeat.to_dict()
+        return data
 
     @classmethod
     def from_dict(cls, data: Mapping[str, Any]) -> "Action":
@@ -293,7 +727,11 @@ class Action:
         payload = data.get("payload", {})
         strategy_class = ACTION_STRATEGY_MAP.get(type_name, NoneActionStrategy)
         payload_mapping = payload if isinstance(payload, Mapping) else {}
-        return cls(strategy=strategy_class.from_dict(payload_mapping))
+        repeat = data.get("repeat")
+        return cls(
+            strategy=strategy_class.from_dict(payload_mapping),
+            repeat=RepeatPolicy.from_dict(repeat) if isinstance(repeat, Mapping) else None,
+        )
 
 
 __all__ = [
@@ -301,10 +739,31 @@ __all__ = [
     "Action",
     "ActionStrategy",
     "ActionType",
+    "DEFAULT_CLICK_INTERVAL_MS",
+    "DEFAULT_HOLD_MS",
+    "DragLockActionStrategy",
     "KeystrokeActionStrategy",
+    "LAYER_MODES",
     "LaunchAppActionStrategy",
+    "LayerActionStrategy",
     "MacroActionStrategy",
+    "MouseClickActionStrategy",
+    "MouseNudgeActionStrategy",
     "NoneActionStrategy",
+    "POINTER_BUTTONS",
+    "PointerButtonActionStrategy",
+    "REPEAT_FORWARD",
+    "REPEAT_MODES",
+    "REPEAT_SUPPRESS",
+    "REPEAT_SYNTHESIZE",
+    "REPEAT_TURBO",
+    "RepeatPolicy",
     "ScrollDownActionStrategy",
     "ScrollUpActionStrategy",
+    "SMOOTH_FRAME_MS",
+    "TIMED_REPEAT_MODES",
+    "TapHoldActionStrategy",
+    "TextActionStrategy",
+    "WHEEL_NOTCH",
+    "WheelActionStrategy",
 ]
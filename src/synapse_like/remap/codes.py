@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from evdev import ecodes
+
+# Codes evdev lists under several names resolve to the name the kernel header
+# defines them with; group markers (BTN_MOUSE, BTN_GAMEPAD, ...) and later
+# aliases never become canonical.
+CANONICAL_ALIASES: Dict[int, str] = {
+    ecodes.KEY_MUTE: "KEY_MUTE",
+    ecodes.KEY_HANGEUL: "KEY_HANGEUL",
+    ecodes.KEY_COFFEE: "KEY_COFFEE",
+    ecodes.KEY_ROTATE_DISPLAY: "KEY_ROTATE_DISPLAY",
+    ecodes.KEY_ALL_APPLICATIONS: "KEY_ALL_APPLICATIONS",
+    ecodes.KEY_BRIGHTNESS_AUTO: "KEY_BRIGHTNESS_AUTO",
+    ecodes.KEY_WWAN: "KEY_WWAN",
+    ecodes.KEY_FULL_SCREEN: "KEY_FULL_SCREEN",
+    ecodes.KEY_ASPECT_RATIO: "KEY_ASPECT_RATIO",
+    ecodes.KEY_DISPLAYTOGGLE: "KEY_DISPLAYTOGGLE",
+    ecodes.BTN_0: "BTN_0",
+    ecodes.BTN_LEFT: "BTN_LEFT",
+    ecodes.BTN_TRIGGER: "BTN_TRIGGER",
+    ecodes.BTN_SOUTH: "BTN_SOUTH",
+    ecodes.BTN_EAST: "BTN_EAST",
+    ecodes.BTN_NORTH: "BTN_NORTH",
+    ecodes.BTN_WEST: "BTN_WEST",
+    ecodes.BTN_TOOL_PEN: "BTN_TOOL_PEN",
+    ecodes.BTN_GEAR_DOWN: "BTN_GEAR_DOWN",
+    ecodes.BTN_TRIGGER_HAPPY1: "BTN_TRIGGER_HAPPY1",
+}
+
+_PREFIXES = ("KEY_", "BTN_", "REL_", "MSC_")
+_RANGE_MARKERS = ("_MAX", "_CNT")
+
+
+def _dense_names(size: int, *sources: Dict[int, object]) -> List[Optional[str]]:
+    names: List[Optional[str]] = [None] * size
+    for source in sources:
+        for code, name in source.items():
+            if not 0 <= code < size:
+                continue
+            if isinstance(name, (list, tuple)):
+                name = CANONICAL_ALIASES.get(code, name[-1])
+            if not name.endswith(_RANGE_MARKERS):
+                names[code] = name
+    return names
+
+
+def _name_codes() -> Dict[str, int]:
+    table: Dict[str, int] = {}
+    for name, code in ecodes.ecodes.items():
+        if name.startswith(_PREFIXES) and not name.endswith(_RANGE_MARKERS):
+            table[name] = code
+    return table
+
+
+# Code -> canonical name, one dense list per event type (built once at import).
+KEY_NAMES: List[Optional[str]] = _dense_names(ecodes.KEY_CNT, ecodes.KEY, ecodes.BTN)
+REL_NAMES: List[Optional[str]] = _dense_names(ecodes.REL_CNT, ecodes.REL)
+MSC_NAMES: List[Optional[str]] = _dense_names(ecodes.MSC_CNT, ecodes.MSC)
+# Any accepted spelling (aliases included) -> code.
+NAME_CODES: Dict[str, int] = _name_codes()
+
+_NAMES_BY_TYPE = {ecodes.EV_KEY: KEY_NAMES, ecodes.EV_REL: REL_NAMES, ecodes.EV_MSC: MSC_NAMES}
+
+
+def code_name(code: int, event_type: int = ecodes.EV_KEY) -> str:
+    """Canonical name for `code`, or its decimal string when it has none."""
+    names = _NAMES_BY_TYPE.get(event_type)
+    if names is not None and 0 <= code < len(names):
+        name = names[code]
+        if name is not None:
+            return name
+    return str(code)
+
+
+def name_code(name: str) -> Optional[int]:
+    """Code for a `KEY_`/`BTN_`/`REL_`/`MSC_` name (aliases included) or a decimal string."""
+    code = NAME_CODES.get(name)
+    if code is None and name.isdigit():
+        return int(name)
+    return code
+
+
+def canonical_name(name: str) -> str:
+    """Rewrites an EV_KEY alias (e.g. BTN_MOUSE) to its canonical name; other strings pass through."""
+    if not name.startswith(("KEY_", "BTN_")):
+        return name
+    code = NAME_CODES.get(name)
+    if code is None or not 0 <= code < len(KEY_NAMES):
+        return name
+    return KEY_NAMES[code] or name
+
+
+__all__ = [
+    "CANONICAL_ALIASES",
+    "KEY_NAMES",
+    "MSC_NAMES",
+    "NAME_CODES",
+    "REL_NAMES",
+    "canonical_name",
+    "code_name",
+    "name_code",
+]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import ctypes
+import fcntl
+import logging
+import struct
+import sys
+from typing import Iterable, Optional
+
+from evdev import ecodes
+
+logger = logging.getLogger(__name__)
+
+# struct input_mask { __u32 type; __u32 codes_size; __u64 codes_ptr; }
+_INPUT_MASK = struct.Struct("IIQ")
+_IOC_WRITE = 1
+
+
+def _iow(kind: str, number: int, size: int) -> int:
+    return (_IOC_WRITE << 30) | (size << 16) | (ord(kind) << 8) | number
+
+
+EVIOCSMASK = _iow("E", 0x93, _INPUT_MASK.size)
+_TYPE_MASK_SLOT = 0  # the EV_SYN slot carries the event-type mask
+
+
+def build_code_bitmap(codes: Iterable[int], count: int) -> bytearray:
+    """Builds a kernel `unsigned long[]` bitmap (little-endian layout)."""
+    bitmap = bytearray(((count + 63) // 64) * 8)
+    for code in codes:
+        if 0 <= code < count:
+            bitmap[code >> 3] |= 1 << (code & 7)
+    return bitmap
+
+
+def apply_event_mask(fd: int, key_codes: Optional[Iterable[int]], include_scan: bool = False) -> bool:
+    """
+    Restricts what the kernel queues for this evdev client to the given EV_KEY
+    codes (all keys when `key_codes` is None) plus optional MSC_SCAN.
+
+    Everything else keeps flowing on the native kernel path and never wakes the
+    mapper; empty SYN_REPORT frames are dropped by evdev itself. Returns False
+    when the kernel or platform does not support EVIOCSMASK, so callers can fall
+    back to reading every event.
+    """
+    if sys.byteorder != "little":
+        return False
+
+    allowed_types = [ecodes.EV_KEY]
+    if include_scan:
+        allowed_types.append(ecodes.EV_MSC)
+
+    try:
+        _set_mask(fd, _TYPE_MASK_SLOT, build_code_bitmap(allowed_types, ecodes.EV_CNT))
+        if key_codes is not None:
+            _set_mask(fd, ecodes.EV_KEY, build_code_bitmap(key_codes, ecodes.KEY_CNT))
+        if include_scan:
+            _set_mask(fd, ecodes.EV_MSC, build_code_bitmap([ecodes.MSC_SCAN], ecodes.MSC_CNT))
+    except OSError as exc:
+        logger.debug("EVIOCSMASK unavailable on fd %s: %s", fd, exc)
+        return False
+    return True
+
+
+def _set_mask(fd: int, event_type: int, bitmap: bytearray) -> None:
+    buffer = (ctypes.c_ubyte * len(bitmap)).from_buffer(bitmap)
+    request = _INPUT_MASK.pack(event_type, len(bitmap), ctypes.addressof(buffer))
+    fcntl.ioctl(fd, EVIOCSMASK, request)
+
+
+__all__ = ["EVIOCSMASK", "apply_event_mask", "build_code_bitmap"]
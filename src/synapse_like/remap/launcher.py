@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import select
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEDUP_WINDOW_SECONDS = 0.5
+SHELL_METACHARACTERS = frozenset("|&;<>()$`*?[]#~={}\n")
+_DEVNULL_ACTIONS = [(os.POSIX_SPAWN_OPEN, fd, os.devnull, os.O_RDWR, 0) for fd in (0, 1, 2)]
+
+
+def build_argv(command: str, shell: bool) -> Tuple[str, ...]:
+    """Turns a launch command into argv; only `shell` commands go through /bin/sh."""
+    command = command.strip()
+    if not command:
+        return ()
+    if shell:
+        return ("/bin/sh", "-c", command)
+    try:
+        return tuple(shlex.split(command))
+    except ValueError:
+        return ()
+
+
+def needs_shell(command: str) -> bool:
+    """True when a legacy command string relies on shell syntax."""
+    return any(char in SHELL_METACHARACTERS for char in command)
+
+
+def spawn_detached(argv: Sequence[str]) -> int:
+    """posix_spawn in a new session with stdio on /dev/null; returns the pid."""
+    return os.posix_spawnp(
+        argv[0],
+        list(argv),
+        os.environ,
+        file_actions=_DEVNULL_ACTIONS,
+        setsid=True,
+    )
+
+
+class SpawnHelper:
+    """
+    Helper-side loop: reads launch requests, spawns, deduplicates and reaps.
+    """
+
+    def __init__(self, dedup_window: float = DEDUP_WINDOW_SECONDS, clock=time.monotonic, spawn=spawn_detached):
+        self.dedup_window = dedup_window
+        self._clock = clock
+        self._spawn = spawn
+        self._last_launch: Dict[Tuple[str, ...], float] = {}
+        self.children: set[int] = set()
+
+    def handle(self, argv: Sequence[str]) -> Optional[int]:
+        key = tuple(argv)
+        if not key:
+            return None
+        now = self._clock()
+        last = self._last_launch.get(key)
+        if last is not None and now - last < self.dedup_window:
+            return None
+        self._last_launch[key] = now
+        try:
+            pid = self._spawn(key)
+        except OSError as exc:
+            logger.warning("Launch failed for %s: %s", key[0], exc)
+            return None
+        self.children.add(pid)
+        return pid
+
+    def reap(self) -> None:
+        for pid in list(self.children):
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done:
+                self.children.discard(pid)
+
+    def serve(self, fd: int) -> None:
+        pending = b""
+        while True:
+            readable, _, _ = select.select([fd], [], [], 1.0 if self.children else None)
+            if readable:
+                chunk = os.read(fd, 4096)
+                if not chunk:
+                    break
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    self._handle_line(line)
+            self.reap()
+
+    def _handle_line(self, line: bytes) -> None:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return
+        argv = request.get("argv") if isinstance(request, dict) else None
+        if isinstance(argv, list) and all(isinstance(part, str) for part in argv):
+            self.handle(argv)
+
+
+class LaunchClient:
+    """
+    Mapper-side handle to the spawner process.
+
+    Started once, outside the input loop; `launch` only writes one line to a
+    pipe. If the helper is unavailable the command is spawned in-process with
+    posix_spawn, which still avoids a shell and a full fork.
+    """
+
+    def __init__(self) -> None:
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._fallback = SpawnHelper(dedup_window=0.0)
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> bool:
+        with self._lock:
+            if self.running:
+                return True
+            try:
+                self._process = subprocess.Popen(
+                    [sys.executable, "-m", "synapse_like.remap.spawner"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                    close_fds=True,
+                    start_new_session=True,
+                )
+            except OSError as exc:
+                logger.warning("Launch helper unavailable: %s", exc)
+                self._process = None
+                return False
+            return True
+
+    def launch(self, argv: Sequence[str]) -> None:
+        if not argv:
+            return
+        process = self._process
+        if process is not None and process.stdin is not None:
+            try:
+                process.stdin.write(json.dumps({"argv": list(argv)}).encode("utf-8") + b"\n")
+                process.stdin.flush()
+                return
+            except (BrokenPipeError, ValueError, OSError) as exc:
+                logger.warning("Launch helper gone (%s); spawning in-process", exc)
+                self._process = None
+        self._fallback.reap()
+        self._fallback.handle(argv)
+
+    def stop(self) -> None:
+        with self._lock:
+            process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            if process.stdin is not None:
+                process.stdin.close()
+            process.wait(timeout=1.0)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+
+
+LAUNCHER = LaunchClient()
+
+
+__all__ = [
+    "DEDUP_WINDOW_SECONDS",
+    "LAUNCHER",
+    "LaunchClient",
+    "SpawnHelper",
+    "build_argv",
+    "needs_shell",
+    "spawn_detached",
+]
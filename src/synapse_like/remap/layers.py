@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from evdev import ecodes
+
+from synapse_like.remap.actions import Action, LayerActionStrategy
+from synapse_like.remap.codes import code_name, name_code
+
+BASE_LAYER = "base"
+TABLE_SIZE = ecodes.KEY_CNT
+
+
+@dataclass(slots=True)
+class CompiledLayer:
+    """
+    Dense per-layer lookup: `codes[code]` is the action for an EV_KEY code.
+
+    Scan-code bindings are sparse by nature and stay in a dict.
+    """
+
+    name: str
+    codes: List[Optional[Action]] = field(default_factory=lambda: [None] * TABLE_SIZE)
+    scans: Dict[int, Action] = field(default_factory=dict)
+
+
+def parse_mapping_key(key: str) -> tuple[Optional[int], Optional[int]]:
+    """Returns `(key_code, scan_code)` for a mapping key; both None when unknown."""
+    if key.startswith("MSC_SCAN:"):
+        try:
+            return None, int(key.split(":", 1)[1])
+        except ValueError:
+            return None, None
+    if key.startswith("MSC_SCAN_HEX:"):
+        try:
+            return None, int(key.split(":", 1)[1], 16)
+        except ValueError:
+            return None, None
+
+    return name_code(key), None
+
+
+def canonical_mapping_key(key: str) -> str:
+    """
+    Single spelling for a mapping key: the canonical code name (decimal when
+    the code has none) or `MSC_SCAN:<decimal>`. Unparseable keys pass through.
+    """
+    code, scan = parse_mapping_key(key)
+    if scan is not None:
+        return f"MSC_SCAN:{scan}"
+    if code is not None:
+        return code_name(code)
+    return key
+
+
+def compile_layer(name: str, mappings: Mapping[str, Action]) -> CompiledLayer:
+    layer = CompiledLayer(name)
+    for key, action in mappings.items():
+        code, scan = parse_mapping_key(key)
+        if scan is not None:
+            layer.scans[scan] = action
+        elif code is not None and 0 <= code < TABLE_SIZE:
+            layer.codes[code] = action
+    return layer
+
+
+def expand_aliases(mappings: Mapping[str, Action], aliases: Iterable[Iterable[str]]) -> Dict[str, Action]:
+    """
+    `mappings` with each binding copied onto the other keys of its alias
+    group. Profiles store one key per group; keys bound on their own win.
+    """
+    groups: Dict[str, List[str]] = {}
+    for group in aliases:
+        members = list(dict.fromkeys(canonical_mapping_key(str(key)) for key in group))
+        for key in members:
+            groups.setdefault(key, members)
+    if not groups:
+        return dict(mappings)
+
+    expanded = {canonical_mapping_key(key): action for key, action in mappings.items()}
+    for key, action in list(expanded.items()):
+        for member in groups.get(key, ()):
+            expanded.setdefault(member, action)
+    return expanded
+
+
+class LayerEngine:
+    """
+    Layer stack for one mapper (base + momentary/toggle/one-shot layers).
+
+    Every layer is compiled once into a dense table. When the stack changes the
+    visible tables are merged into `codes`/`scans`, so per-event lookup is a
+    single list index no matter how many layers a profile defines. Entries left
+    unset in a layer fall through to the layers below it. Alias groups are
+    expanded here, so every spelling of a key lands in the tables.
+    """
+
+    __slots__ = ("_layers", "_base", "_stack", "_oneshot", "codes", "scans", "layered")
+
+    def __init__(
+        self,
+        base: Mapping[str, Action],
+        layers: Optional[Mapping[str, Mapping[str, Action]]] = None,
+        aliases: Iterable[Iterable[str]] = (),
+    ):
+        aliases = list(aliases)
+        self._base = compile_layer(BASE_LAYER, expand_aliases(base, aliases))
+        self._layers: Dict[str, CompiledLayer] = {
+            name: compile_layer(name, expand_aliases(mappings, aliases))
+            for name, mappings in (layers or {}).items()
+            if name != BASE_LAYER
+        }
+        self._stack: List[str] = []
+        self._oneshot: Optional[str] = None
+        self.layered = bool(self._layers)
+        self.codes: List[Optional[Action]] = self._base.codes
+        self.scans: Dict[int, Action] = self._base.scans
+
+    @property
+    def active_layers(self) -> List[str]:
+        active = [BASE_LAYER, *self._stack]
+        if self._oneshot is not None:
+            active.append(self._oneshot)
+        return active
+
+    @property
+    def has_scan_codes(self) -> bool:
+        return bool(self._base.scans) or any(layer.scans for layer in self._layers.values())
+
+    def mapped_key_codes(self) -> set[int]:
+        codes: set[int] = set()
+        for layer in (self._base, *self._layers.values()):
+            codes.update(code for code, action in enumerate(layer.codes) if action is not None)
+        return codes
+
+    def iter_actions(self) -> Iterable[Action]:
+        for layer in (self._base, *self._layers.values()):
+            yield from (action for action in layer.codes if action is not None)
+            yield from layer.scans.values()
+
+    def handle(self, strategy: LayerActionStrategy, event_value: int) -> None:
+        """Applies a layer key press (1) or release (0); repeats are ignored."""
+        name = strategy.layer
+        if name not in self._layers:
+            return
+        if strategy.mode == "momentary":
+            if event_value == 1:
+                self._push(name)
+            elif event_value == 0:
+                self._remove(name)
+        elif event_value == 1:
+            if strategy.mode == "toggle":
+                if name in self._stack:
+                    self._remove(name)
+                else:
+                    self._push(name)
+            elif strategy.mode == "oneshot":
+                self._oneshot = name
+                self._rebuild()
+
+    def consume_oneshot(self) -> None:
+        """Drops an armed one-shot layer after the key press it applied to."""
+        if self._oneshot is not None:
+            self._oneshot = None
+            self._rebuild()
+
+    def reset(self) -> None:
+        self._stack.clear()
+        self._oneshot = None
+        self._rebuild()
+
+    def _push(self, name: str) -> None:
+        if name in self._stack:
+            self._stack.remove(name)
+        self._stack.append(name)
+        self._rebuild()
+
+    def _remove(self, name: str) -> None:
+        if name in self._stack:
+            self._stack.remove(name)
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        visible = [self._layers[name] for name in self._stack]
+        if self._oneshot is not None:
+            visible.append(self._layers[self._oneshot])
+        if not visible:
+            self.codes = self._base.codes
+            self.scans = self._base.scans
+            return
+
+        codes = list(self._base.codes)
+        scans = dict(self._base.scans)
+        for layer in visible:
+            for code, action in enumerate(layer.codes):
+                if action is not None:
+                    codes[code] = action
+            scans.update(layer.scans)
+        self.codes = codes
+        self.scans = scans
+
+
+__all__ = [
+    "BASE_LAYER",
+    "CompiledLayer",
+    "LayerEngine",
+    "canonical_mapping_key",
+    "compile_layer",
+    "expand_aliases",
+    "parse_mapping_key",
+]
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from evdev import ecodes
+
+logger = logging.getLogger(__name__)
+
+# (delay before the write in seconds, EV_KEY code, value)
+MacroStep = Tuple[float, int, int]
+MacroProgram = Tuple[MacroStep, ...]
+
+DEFAULT_TEXT_LAYOUT = "us"
+DEFAULT_TYPING_RATE = 60.0
+
+
+def _layout(base: Dict[str, str], shifted: Dict[str, str]) -> Dict[str, Tuple[int, bool]]:
+    table: Dict[str, Tuple[int, bool]] = {}
+    for letter in "abcdefghijklmnopqrstuvwxyz":
+        code = ecodes.ecodes[f"KEY_{letter.upper()}"]
+        table[letter] = (code, False)
+        table[letter.upper()] = (code, True)
+    for digit in "0123456789":
+        table[digit] = (ecodes.ecodes[f"KEY_{digit}"], False)
+    table[" "] = (ecodes.KEY_SPACE, False)
+    table["\n"] = (ecodes.KEY_ENTER, False)
+    table["\t"] = (ecodes.KEY_TAB, False)
+    for char, name in base.items():
+        table[char] = (ecodes.ecodes[name], False)
+    for char, name in shifted.items():
+        table[char] = (ecodes.ecodes[name], True)
+    return table
+
+
+# Character -> (key code, needs shift). Dead keys are left out on purpose and
+# go through the Unicode fallback instead.
+TEXT_LAYOUTS: Dict[str, Dict[str, Tuple[int, bool]]] = {
+    "us": _layout(
+        {
+            "-": "KEY_MINUS", "=": "KEY_EQUAL", "[": "KEY_LEFTBRACE", "]": "KEY_RIGHTBRACE",
+            "\\": "KEY_BACKSLASH", ";": "KEY_SEMICOLON", "'": "KEY_APOSTROPHE", "`": "KEY_GRAVE",
+            ",": "KEY_COMMA", ".": "KEY_DOT", "/": "KEY_SLASH",
+        },
+        {
+            "!": "KEY_1", "@": "KEY_2", "#": "KEY_3", "$": "KEY_4", "%": "KEY_5", "^": "KEY_6",
+            "&": "KEY_7", "*": "KEY_8", "(": "KEY_9", ")": "KEY_0", "_": "KEY_MINUS", "+": "KEY_EQUAL",
+            "{": "KEY_LEFTBRACE", "}": "KEY_RIGHTBRACE", "|": "KEY_BACKSLASH", ":": "KEY_SEMICOLON",
+            '"': "KEY_APOSTROPHE", "~": "KEY_GRAVE", "<": "KEY_COMMA", ">": "KEY_DOT", "?": "KEY_SLASH",
+        },
+    ),
+    "br-abnt2": _layout(
+        {
+            "-": "KEY_MINUS", "=": "KEY_EQUAL", "[": "KEY_RIGHTBRACE", "]": "KEY_BACKSLASH",
+            "ç": "KEY_SEMICOLON", "'": "KEY_GRAVE", ",": "KEY_COMMA", ".": "KEY_DOT",
+            ";": "KEY_SLASH", "/": "KEY_RO", "\\": "KEY_102ND",
+        },
+        {
+            "!": "KEY_1", "@": "KEY_2", "#": "KEY_3", "$": "KEY_4", "%": "KEY_5", "&": "KEY_7",
+            "*": "KEY_8", "(": "KEY_9", ")": "KEY_0", "_": "KEY_MINUS", "+": "KEY_EQUAL",
+            "{": "KEY_RIGHTBRACE", "}": "KEY_BACKSLASH", "Ç": "KEY_SEMICOLON", '"': "KEY_GRAVE",
+            "<": "KEY_COMMA", ">": "KEY_DOT", ":": "KEY_SLASH", "?": "KEY_RO", "|": "KEY_102ND",
+        },
+    ),
+}
+
+
+def compile_macro(events: Iterable[Mapping[str, Any]]) -> MacroProgram:
+    """Compiles editor timeline events (`key`/`delay`) into a program."""
+    steps: List[MacroStep] = []
+    delay = 0.0
+    for event in events:
+        event_type = event.get("type")
+        if event_type == "delay":
+            try:
+                delay_ms = int(event.get("value", 0))
+            except (TypeError, ValueError):
+                continue
+            if delay_ms > 0:
+                delay += delay_ms / 1000.0
+            continue
+        if event_type != "key":
+            continue
+        code_name = event.get("code")
+        code = ecodes.ecodes.get(code_name) if isinstance(code_name, str) else None
+        if code is None:
+            continue
+        steps.append((delay, code, int(event.get("state", 1))))
+        delay = 0.0
+    return tuple(steps)
+
+
+def compile_text(text: str, layout: str = DEFAULT_TEXT_LAYOUT, rate_cps: float = DEFAULT_TYPING_RATE) -> MacroProgram:
+    """
+    Compiles a string into key/shift steps for the given keyboard layout.
+
+    Characters the layout cannot type are entered as Ctrl+Shift+U <hex> Space,
+    the Unicode input sequence understood by GTK/IBus and Qt input methods.
+    """
+    table = TEXT_LAYOUTS.get(layout, TEXT_LAYOUTS[DEFAULT_TEXT_LAYOUT])
+    char_delay = 1.0 / rate_cps if rate_cps > 0 else 0.0
+    steps: List[MacroStep] = []
+    for char in text:
+        mapped = table.get(char)
+        if mapped is not None:
+            code, shift = mapped
+            if shift:
+                steps.append((char_delay, ecodes.KEY_LEFTSHIFT, 1))
+                steps.extend(((0.0, code, 1), (0.0, code, 0), (0.0, ecodes.KEY_LEFTSHIFT, 0)))
+            else:
+                steps.extend(((char_delay, code, 1), (0.0, code, 0)))
+            continue
+
+        steps.extend(
+            (
+                (char_delay, ecodes.KEY_LEFTCTRL, 1),
+                (0.0, ecodes.KEY_LEFTSHIFT, 1),
+                (0.0, ecodes.KEY_U, 1),
+                (0.0, ecodes.KEY_U, 0),
+                (0.0, ecodes.KEY_LEFTSHIFT, 0),
+                (0.0, ecodes.KEY_LEFTCTRL, 0),
+            )
+        )
+        for digit in f"{ord(char):x}":
+            code = ecodes.ecodes[f"KEY_{digit.upper()}"]
+            steps.extend(((0.0, code, 1), (0.0, code, 0)))
+        steps.extend(((0.0, ecodes.KEY_SPACE, 1), (0.0, ecodes.KEY_SPACE, 0)))
+    return tuple(steps)
+
+
+def program_key_codes(program: MacroProgram) -> List[int]:
+    return sorted({code for _, code, _ in program})
+
+
+class MacroPlayer:
+    """
+    Shared scheduler for macro and text programs.
+
+    One worker thread plays programs in submission order, so overlapping
+    triggers queue up instead of interleaving keystrokes.
+    """
+
+    def __init__(self) -> None:
+        self._queue: "queue.SimpleQueue[Tuple[Any, MacroProgram]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, uinput_device: Any, program: MacroProgram) -> None:
+        if uinput_device is None or not program:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="synapse-like-macros", daemon=True)
+                self._thread.start()
+        self._queue.put((uinput_device, program))
+
+    def _run(self) -> None:
+        while True:
+            uinput_device, program = self._queue.get()
+            try:
+                play_program(uinput_device, program)
+            except OSError as exc:
+                logger.warning("Macro playback aborted: %s", exc)
+
+
+def play_program(uinput_device: Any, program: MacroProgram, sleep=time.sleep) -> None:
+    """Plays `program`; stops early once the sink is detached (mapper stopped)."""
+    for delay, code, value in program:
+        if delay:
+            sleep(delay)
+        if not getattr(uinput_device, "active", True):
+            return
+        uinput_device.write(ecodes.EV_KEY, code, value)
+        uinput_device.syn()
+
+
+MACRO_PLAYER = MacroPlayer()
+
+
+__all__ = [
+    "DEFAULT_TEXT_LAYOUT",
+    "DEFAULT_TYPING_RATE",
+    "MACRO_PLAYER",
+    "MacroPlayer",
+    "MacroProgram",
+    "TEXT_LAYOUTS",
+    "compile_macro",
+    "compile_text",
+    "play_program",
+    "program_key_codes",
+]
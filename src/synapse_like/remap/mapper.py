@@ -2,46 +2,118 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import select
+import struct
+import sys
 import threading
+import time
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
 
 from evdev import InputDevice, UInput, ecodes
 
-from synapse_like.remap.actions import Action
+from synapse_like.remap.actions import (
+    REPEAT_FORWARD,
+    TIMED_REPEAT_MODES,
+    Action,
+    LayerActionStrategy,
+    TapHoldActionStrategy,
+    WheelActionStrategy,
+)
+from synapse_like.remap.codes import code_name
+from synapse_like.remap.kernel_filter import apply_event_mask
+from synapse_like.remap.layers import LayerEngine
+from synapse_like.remap.metrics import MapperMetrics
+from synapse_like.remap.motion import MotionPipeline, MotionSettings
+from synapse_like.remap.profiler import STAGE_EXECUTE, STAGE_READ, STAGE_RESOLVE, STAGE_WRITE, StageTracer
+from synapse_like.remap.sinks import SHARED_SOURCE, MeteredSink, SharedKeyState, SinkPool
+from synapse_like.remap.timing import (
+    DEFAULT_CHORD_TIMEOUT_MS,
+    RepeatScheduler,
+    TimingResolver,
+    WheelAnimator,
+    parse_chord_timeout,
+    parse_chords,
+)
 
 logger = logging.getLogger(__name__)
 
+# Raw `struct input_event` layout for the running ABI (timeval + type/code/value).
+_EVENT_TIME = struct.Struct("ll")
+_EVENT_KEY_FIELDS = struct.Struct("=Hi")
+_EVENT = struct.Struct("llHHi")
+EVENT_SIZE = _EVENT.size
+_TYPE_BYTE = _EVENT_TIME.size if sys.byteorder == "little" else _EVENT_TIME.size + 1
+_CODE_OFFSET = _EVENT_TIME.size + 2
+_CODE_BYTE = _CODE_OFFSET if sys.byteorder == "little" else _CODE_OFFSET + 1
+RAW_BATCH_EVENTS = 64
+
 
 @dataclass(slots=True)
 class MappingConfig:
     device_path: str
     mappings: Dict[str, Action] = field(default_factory=dict)
+    layers: Dict[str, Dict[str, Action]] = field(default_factory=dict)
+    chords: Dict[str, Action] = field(default_factory=dict)
+    aliases: List[List[str]] = field(default_factory=list)
+    chord_timeout_ms: int = DEFAULT_CHORD_TIMEOUT_MS
     grab: bool = True
     passthrough: bool = True
+    raw_passthrough: bool = False
+    kernel_filter: bool = False
+    shared_output: bool = False
+    motion: Optional[MotionSettings] = None
 
     def to_dict(self) -> Dict[str, object]:
         return {
             "device_path": self.device_path,
             "mappings": {key: action.to_dict() for key, action in self.mappings.items()},
+            "layers": {
+                name: {key: action.to_dict() for key, action in mappings.items()}
+                for name, mappings in self.layers.items()
+            },
+            "chords": {combo: action.to_dict() for combo, action in self.chords.items()},
+            "aliases": [list(group) for group in self.aliases],
+            "chord_timeout_ms": self.chord_timeout_ms,
             "grab": self.grab,
             "passthrough": self.passthrough,
+            "raw_passthrough": self.raw_passthrough,
+            "kernel_filter": self.kernel_filter,
+            "shared_output": self.shared_output,
+            "motion": self.motion.to_dict() if self.motion is not None else None,
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, object]) -> "MappingConfig":
-        raw_mappings = data.get("mappings", {})
+        raw_layers = data.get("layers", {})
+        raw_motion = data.get("motion")
+        raw_aliases = data.get("aliases", [])
         return cls(
             device_path=str(data["device_path"]),
-            mappings={
-                str(key): Action.from_dict(value)
-                for key, value in raw_mappings.items()
-                if isinstance(value, dict)
+            mappings=_actions_from_dict(data.get("mappings", {})),
+            layers={
+                str(name): _actions_from_dict(mappings)
+                for name, mappings in raw_layers.items()
+                if isinstance(mappings, dict)
             }
-            if isinstance(raw_mappings, dict)
+            if isinstance(raw_layers, dict)
             else {},
+            chords=_actions_from_dict(data.get("chords", {})),
+            aliases=[
+                [str(key) for key in group]
+                for group in raw_aliases
+                if isinstance(group, list)
+            ]
+            if isinstance(raw_aliases, list)
+            else [],
+            chord_timeout_ms=parse_chord_timeout(data.get("chord_timeout_ms", DEFAULT_CHORD_TIMEOUT_MS)),
             grab=bool(data.get("grab", True)),
             passthrough=bool(data.get("passthrough", True)),
+            raw_passthrough=bool(data.get("raw_passthrough", False)),
+            kernel_filter=bool(data.get("kernel_filter", False)),
+            shared_output=bool(data.get("shared_output", False)),
+            motion=MotionSettings.from_dict(raw_motion) if isinstance(raw_motion, dict) else None,
         )
 
     def save(self, path: str) -> None:
@@ -53,60 +125,190 @@ class MappingConfig:
         with open(path, encoding="utf-8") as handle:
             return cls.from_dict(json.load(handle))
 
+    def iter_actions(self) -> Iterable[Action]:
+        """Yields every configured action, including ones nested in tap-hold keys."""
+        pending = [*self.mappings.values(), *self.chords.values()]
+        for mappings in self.layers.values():
+            pending.extend(mappings.values())
+        while pending:
+            action = pending.pop()
+            yield action
+            pending.extend(action.strategy.nested_actions())
+
+    def needs_timing(self) -> bool:
+        return bool(self.chords) or any(
+            isinstance(action.strategy, TapHoldActionStrategy) for action in self.iter_actions()
+        )
+
+
+class KeySnapshot(NamedTuple):
+    """
+    Immutable view of a mapper's physically held keys.
+
+    `held` has one bit per EV_KEY code. The mapper thread publishes a new
+    snapshot with a single attribute store whenever a bit changes, so other
+    threads read a consistent (generation, held) pair without locks or copies.
+    """
+
+    generation: int
+    held: int
+
+
+EMPTY_KEY_SNAPSHOT = KeySnapshot(0, 0)
+
+
+def bitmap_codes(mask: int) -> list[int]:
+    """Key codes of the set bits in `mask`, ascending."""
+    codes: list[int] = []
+    while mask:
+        low = mask & -mask
+        codes.append(low.bit_length() - 1)
+        mask ^= low
+    return codes
+
+
+def _actions_from_dict(raw_mappings: object) -> Dict[str, Action]:
+    if not isinstance(raw_mappings, dict):
+        return {}
+    return {
+        str(key): Action.from_dict(value)
+        for key, value in raw_mappings.items()
+        if isinstance(value, dict)
+    }
+
 
 class InputMapper:
     """
     User-space remapper that translates events from a source device to one or two
     virtual uinput devices.
+
+    With `raw_passthrough` (opt-in, off by default) the loop reads `input_event`
+    records in bulk and copies unmapped runs fd-to-fd; only EV_KEY records are
+    decoded in Python.
     """
 
-    def __init__(self, config: MappingConfig):
+    def __init__(self, config: MappingConfig, sink_pool: Optional[SinkPool] = None):
         self.config = config
+        self._sink_pool = sink_pool
         self._running = False
         self._thread: Optional[threading.Thread] = None
         self._src: Optional[InputDevice] = None
         self._sink: Optional[UInput] = None
         self._pointer_sink: Optional[UInput] = None
+        self._key_output: Optional[MeteredSink] = None
+        self._pointer_output: Optional[MeteredSink] = None
+        self._raw_out_fd = -1
+        self._shared_keys: Optional[SharedKeyState] = None
+        self._pending_scan: Optional[int] = None
+        self._motion: Optional[MotionPipeline] = None
+        self._frame_dx = 0
+        self._frame_dy = 0
+        self._motion_buffer = bytearray(EVENT_SIZE * 2)
         self._grabbed = False
-        self._fast_code_map: Dict[int, Action] = {}
-        self._fast_scan_map: Dict[int, Action] = {}
-        self._name_cache: Dict[int, str] = {}
+        self.kernel_filtered = False
+        self._layers = LayerEngine(config.mappings, config.layers, config.aliases)
+        self._held: Dict[int, Optional[Action]] = {}
+        # Runtime state of stateful actions, keyed by id(strategy): strategies
+        # are shared by every mapper the profile runs on.
+        self._action_state: Dict[int, Dict[str, Any]] = {}
+        self._timing: Optional[TimingResolver] = self._build_timing()
+        self._repeater: Optional[RepeatScheduler] = self._build_repeater()
+        self._animator: Optional[WheelAnimator] = self._build_animator()
         self._debug_enabled = False
-        self.active_keys: set[str] = set()
-        self._build_fast_lookups()
+        self.key_snapshot = EMPTY_KEY_SNAPSHOT
+        self.metrics = MapperMetrics()
+        self._tracer: Optional[StageTracer] = None
 
     @property
     def device_path(self) -> str:
         return self.config.device_path
 
-    def start(self) -> None:
-        if self._running:
-            return
+    @property
+    def active_layers(self) -> list[str]:
+        return self._layers.active_layers
 
-        logger.info("Starting mapper for %s", self.config.device_path)
+    @property
+    def active_keys(self) -> set[str]:
+        return {self.code_name(code) for code in self.active_codes()}
+
+    @property
+    def state_generation(self) -> int:
+        return self.key_snapshot.generation
+
+    def active_codes(self) -> list[int]:
+        return bitmap_codes(self.key_snapshot.held)
+
+    @property
+    def thread_id(self) -> Optional[int]:
+        return self._thread.ident if self._thread is not None else None
+
+    def set_tracer(self, tracer: Optional[StageTracer]) -> None:
+        """Attaches a per-stage tracer; picked up by the loop on the next event."""
+        self._tracer = tracer
+
+    def metrics_snapshot(self) -> Dict[str, object]:
+        snapshot = self.metrics.snapshot()
+        snapshot["device_path"] = self.config.device_path
+        return snapshot
+
+    def open_source(self) -> None:
+        """Opens (and grabs) the source device; `start` does it when needed."""
+        if self._src is not None:
+            return
         self._src = InputDevice(self.config.device_path)
         if self.config.grab:
             self._src.grab()
             self._grabbed = True
 
-        raw_caps = self._src.capabilities(absinfo=False)
+    def output_caps(self) -> Dict[str, Dict[int, list[int]]]:
+        """Capabilities wanted per output role ("keys"/"pointer"); needs an open source."""
+        caps: Dict[str, Dict[int, list[int]]] = {}
         if self.config.passthrough or self._needs_keystroke_output():
-            self._sink = UInput(
-                self._build_caps(raw_caps),
-                name=f"{self._src.name} (synapse-like)",
-                bustype=self._src.info.bustype,
-            )
+            caps["keys"] = self._build_caps(self._src.capabilities(absinfo=False))
         if self._needs_pointer_output():
-            self._pointer_sink = UInput(
-                self._pointer_caps(),
-                name=f"{self._src.name} (synapse-like pointer)",
-                bustype=self._src.info.bustype,
-            )
+            caps["pointer"] = self._pointer_caps()
+        return caps
+
+    def start(self, shared_caps: Optional[Dict[str, Dict[int, list[int]]]] = None) -> None:
+        """
+        Starts the mapper thread.
+
+        With `shared_output` (and a sink pool) output goes to the daemon-wide
+        shared sinks; `shared_caps` is the union of every sharing mapper's
+        `output_caps`, so the shared devices are created once with all of them.
+        """
+        if self._running:
+            return
 
-        self._build_fast_lookups()
+        logger.info("Starting mapper for %s", self.config.device_path)
+        self.open_source()
+        for role, caps in self.output_caps().items():
+            if shared_caps is not None and role in shared_caps:
+                caps = shared_caps[role]
+            sink = self._open_sink(role, caps)
+            if role == "keys":
+                self._sink = sink
+            else:
+                self._pointer_sink = sink
+
+        self._bind_outputs()
+        self._layers = LayerEngine(self.config.mappings, self.config.layers, self.config.aliases)
+        self._held.clear()
+        self._action_state.clear()
+        self._timing = self._build_timing()
+        self._repeater = self._build_repeater()
+        self._animator = self._build_animator()
+        if self.config.kernel_filter and not self._grabbed:
+            has_scan_codes = self._layers.has_scan_codes
+            self.kernel_filtered = apply_event_mask(
+                self._src.fd,
+                None if has_scan_codes else self._layers.mapped_key_codes(),
+                include_scan=has_scan_codes,
+            )
         self._debug_enabled = logger.isEnabledFor(logging.DEBUG)
         self._running = True
-        self._thread = threading.Thread(target=self._loop, daemon=True)
+        loop = self._raw_loop if self.config.raw_passthrough else self._loop
+        self._thread = threading.Thread(target=loop, daemon=True)
         self._thread.start()
         logger.info("Mapper active for %s", self.config.device_path)
 
@@ -129,42 +331,160 @@ class InputMapper:
             self._thread.join(timeout=0.3)
             self._thread = None
 
-        if self._sink:
-            self._sink.close()
-        if self._pointer_sink:
-            self._pointer_sink.close()
+        self.release_synthetic_keys()
+        for sink, output in ((self._sink, self._key_output), (self._pointer_sink, self._pointer_output)):
+            if sink is None:
+                continue
+            if output is not None:
+                output.detach()
+                if output.key_state is not None:
+                    self._release_shared_keys(sink, output.key_state)
+            if self._sink_pool is not None:
+                self._sink_pool.release(sink)
+            else:
+                sink.close()
 
         self._src = None
         self._sink = None
         self._pointer_sink = None
-        self.active_keys.clear()
+        self._key_output = None
+        self._pointer_output = None
+        self._raw_out_fd = -1
+        self._shared_keys = None
+        self._pending_scan = None
+        self._motion = None
+        self._frame_dx = 0
+        self._frame_dy = 0
+        self.kernel_filtered = False
+        self._layers.reset()
+        self._held.clear()
+        self._action_state.clear()
+        if self._timing is not None:
+            self._timing.reset()
+        if self._repeater is not None:
+            self._repeater.reset()
+        if self._animator is not None:
+            self._animator.reset()
+        self.key_snapshot = KeySnapshot(self.key_snapshot.generation + 1, 0)
         logger.info("Mapper stopped for %s", self.config.device_path)
 
-    def _build_fast_lookups(self) -> None:
-        self._fast_code_map.clear()
-        self._fast_scan_map.clear()
-
-        for key, action in self.config.mappings.items():
-            if key.startswith("MSC_SCAN:"):
-                try:
-                    self._fast_scan_map[int(key.split(":", 1)[1])] = action
-                    continue
-                except ValueError:
-                    continue
-
-            if key.startswith("MSC_SCAN_HEX:"):
-                try:
-                    self._fast_scan_map[int(key.split(":", 1)[1], 16)] = action
-                    continue
-                except ValueError:
-                    continue
+    def _open_sink(self, role: str, caps: Dict[int, list[int]]) -> UInput:
+        pool = self._sink_pool
+        if pool is not None and self.config.shared_output:
+            name = "synapse-like pointer" if role == "pointer" else "synapse-like keyboard"
+            return pool.acquire(SHARED_SOURCE, role, caps, name, ecodes.BUS_VIRTUAL, shared=True)
+        suffix = " pointer" if role == "pointer" else ""
+        name = f"{self._src.name} (synapse-like{suffix})"
+        bustype = self._src.info.bustype
+        if pool is not None:
+            return pool.acquire(self.config.device_path, role, caps, name, bustype)
+        return UInput(caps, name=name, bustype=bustype)
+
+    def release_synthetic_keys(self) -> None:
+        """
+        Releases every key the mapper synthesized and has not released yet.
+
+        Runs on stop (so profile switches and shutdown never leave Ctrl held
+        down on a pooled sink) and when the loop dies with an error.
+        """
+        for output in (self._key_output, self._pointer_output):
+            if output is None:
+                continue
+            released = output.release_all()
+            if released:
+                logger.info("Released %d stuck key(s) on %s", len(released), self.config.device_path)
+
+    def _release_shared_keys(self, sink: Any, key_state: SharedKeyState) -> None:
+        released = key_state.forget(self)
+        if not released:
+            return
+        try:
+            for code in released:
+                sink.write(ecodes.EV_KEY, code, 0)
+            sink.syn()
+        except OSError:
+            pass
+
+    def _bind_outputs(self) -> None:
+        pool = self._sink_pool
+        outputs: list[Optional[MeteredSink]] = []
+        for sink in (self._sink, self._pointer_sink):
+            if sink is None:
+                outputs.append(None)
+                continue
+            key_state = pool.key_state(sink) if pool is not None and self.config.shared_output else None
+            outputs.append(MeteredSink(sink, self.metrics, key_state, self))
+        self._key_output, self._pointer_output = outputs
+        self._shared_keys = self._key_output.key_state if self._key_output is not None else None
+        self._raw_out_fd = self._sink.fd if self._sink is not None and self.config.passthrough else -1
+        self._motion = MotionPipeline.from_settings(self.config.motion) if self.config.passthrough else None
+        self._frame_dx = 0
+        self._frame_dy = 0
+
+    def _build_timing(self) -> Optional[TimingResolver]:
+        if not self.config.needs_timing():
+            return None
+        return TimingResolver(
+            parse_chords(self.config.chords),
+            emit=self._execute,
+            replay=self._replay_key,
+            chord_timeout_ms=self.config.chord_timeout_ms,
+        )
 
-            code = ecodes.ecodes.get(key)
-            if code is None and key.isdigit():
-                code = int(key)
+    def _build_repeater(self) -> Optional[RepeatScheduler]:
+        if not any(action.repeat_policy.mode in TIMED_REPEAT_MODES for action in self.config.iter_actions()):
+            return None
+        return RepeatScheduler(self._execute)
+
+    def _build_animator(self) -> Optional[WheelAnimator]:
+        if not any(
+            isinstance(action.strategy, WheelActionStrategy) and action.strategy.smooth_frames > 1
+            for action in self.config.iter_actions()
+        ):
+            return None
+        return WheelAnimator()
+
+    def _has_timers(self) -> bool:
+        return self._timing is not None or self._repeater is not None or self._animator is not None
+
+    def _timer_timeout(self) -> Optional[float]:
+        """Seconds until the earliest timing/repeat deadline, or None when idle."""
+        deadline = None
+        for timer in (self._timing, self._repeater, self._animator):
+            if timer is None:
+                continue
+            candidate = timer.next_deadline()
+            if candidate is not None and (deadline is None or candidate < deadline):
+                deadline = candidate
+        if deadline is None:
+            return None
+        return max(deadline - time.monotonic_ns(), 0) / 1e9
+
+    def _expire_timers(self) -> None:
+        now = time.monotonic_ns()
+        if self._timing is not None:
+            self._timing.expire(now)
+        if self._repeater is not None:
+            self._repeater.expire(now)
+        if self._animator is not None:
+            self._animator.expire(now)
+
+    def _read_events(self) -> Iterable[Any]:
+        """Source events; with timers configured, also wakes up for their deadlines."""
+        if not self._has_timers():
+            yield from self._src.read_loop()
+            return
 
-            if code is not None:
-                self._fast_code_map[code] = action
+        fd = self._src.fd
+        while self._running:
+            readable, _, _ = select.select([fd], [], [], self._timer_timeout())
+            self._expire_timers()
+            if not readable:
+                continue
+            try:
+                yield from self._src.read()
+            except BlockingIOError:
+                continue
 
     def _loop(self) -> None:
         if self._src is None:
@@ -172,40 +492,60 @@ class InputMapper:
 
         pending_scan: Optional[int] = None
         sink = self._sink
-        debug_enabled = self._debug_enabled
+        metrics = self.metrics
+        motion = self._motion
+        clock = time.perf_counter_ns
 
         try:
-            for event in self._src.read_loop():
+            for event in self._read_events():
                 if not self._running:
                     break
 
+                started = clock()
+                metrics.events_in += 1
+                tracer = self._tracer
+                if tracer is not None:
+                    tracer.add(STAGE_READ, time.time_ns() - event.sec * 1_000_000_000 - event.usec * 1000)
+
                 if event.type == ecodes.EV_MSC and event.code == ecodes.MSC_SCAN:
                     pending_scan = int(event.value)
+                    metrics.observe_loop(clock() - started)
                     continue
 
+                if motion is not None and event.type == ecodes.EV_REL:
+                    if event.code == ecodes.REL_X:
+                        self._frame_dx += event.value
+                        metrics.observe_loop(clock() - started)
+                        continue
+                    if event.code == ecodes.REL_Y:
+                        self._frame_dy += event.value
+                        metrics.observe_loop(clock() - started)
+                        continue
+
                 if event.type == ecodes.EV_SYN and event.code == ecodes.SYN_REPORT:
                     pending_scan = None
+                    if self._frame_dx or self._frame_dy:
+                        self._emit_motion_events()
 
                 if event.type == ecodes.EV_KEY:
-                    mapping = self._resolve_mapping(
-                        self._code_name(event.code),
-                        event.code,
-                        pending_scan,
-                    )
                     self._update_active_keys(event.code, event.value)
-                    if mapping is not None:
-                        if debug_enabled and event.value == 1:
-                            logger.debug(
-                                "[%s] mapping hit: code=%s -> %s",
-                                self.config.device_path,
-                                event.code,
-                                mapping.type_name,
-                            )
-                        self._handle_action(mapping, event.value)
+                    if self._handle_key_event(event.code, event.value, pending_scan):
+                        metrics.observe_loop(clock() - started)
                         continue
 
                 if sink is not None and self.config.passthrough:
-                    sink.write_event(event)
+                    if tracer is not None:
+                        write_started = clock()
+                    try:
+                        sink.write_event(event)
+                    except OSError:
+                        metrics.write_errors += 1
+                    else:
+                        metrics.passthrough += 1
+                        metrics.events_out += 1
+                    if tracer is not None:
+                        tracer.add(STAGE_WRITE, clock() - write_started)
+                metrics.observe_loop(clock() - started)
         except OSError as exc:
             if self._running:
                 logger.warning("Mapper loop error on %s: %s", self.config.device_path, exc)
@@ -213,6 +553,228 @@ class InputMapper:
             logger.exception("Unexpected mapper error on %s: %s", self.config.device_path, exc)
         finally:
             self._running = False
+            self.release_synthetic_keys()
+
+    def _raw_loop(self) -> None:
+        if self._src is None:
+            return
+
+        fd = self._src.fd
+        buffer = bytearray(EVENT_SIZE * RAW_BATCH_EVENTS)
+        view = memoryview(buffer)
+
+        try:
+            while self._running:
+                if not self._has_timers():
+                    select.select([fd], [], [])
+                else:
+                    readable, _, _ = select.select([fd], [], [], self._timer_timeout())
+                    self._expire_timers()
+                    if not readable:
+                        continue
+                if not self._running:
+                    break
+                try:
+                    length = os.readv(fd, [buffer])
+                except BlockingIOError:
+                    continue
+                if length <= 0:
+                    break
+                self._process_raw(view, length - length % EVENT_SIZE)
+        except (OSError, ValueError) as exc:
+            if self._running:
+                logger.warning("Mapper loop error on %s: %s", self.config.device_path, exc)
+        except Exception as exc:
+            logger.exception("Unexpected mapper error on %s: %s", self.config.device_path, exc)
+        finally:
+            self._running = False
+            self.release_synthetic_keys()
+
+    def _process_raw(self, view: memoryview, length: int) -> None:
+        """
+        Handles a batch of raw `input_event` records.
+
+        Records are only decoded when they are EV_KEY (or scan bookkeeping is
+        needed); everything else stays in contiguous runs that are copied to the
+        sink with a single write.
+        """
+        metrics = self.metrics
+        clock = time.perf_counter_ns
+        started = clock()
+        metrics.events_in += length // EVENT_SIZE
+        tracer = self._tracer
+        if tracer is not None and length:
+            seconds, micros = _EVENT_TIME.unpack_from(view, 0)
+            tracer.add(STAGE_READ, time.time_ns() - seconds * 1_000_000_000 - micros * 1000)
+
+        forward = self._raw_out_fd >= 0
+        # Timed keys may replay buffered presses, so earlier records go out first.
+        flush_before_keys = forward and self._has_timers()
+        track_scan = self._layers.has_scan_codes
+        motion = self._motion if forward else None
+        pending_scan = self._pending_scan
+        ev_key = ecodes.EV_KEY
+        ev_rel = ecodes.EV_REL
+        ev_syn = ecodes.EV_SYN
+        run_start = 0
+        offset = 0
+
+        while offset < length:
+            event_type = view[offset + _TYPE_BYTE]
+            if event_type == ev_key:
+                code, value = _EVENT_KEY_FIELDS.unpack_from(view, offset + _CODE_OFFSET)
+                self._update_active_keys(code, value)
+                if flush_before_keys and offset > run_start:
+                    self._forward_raw(view[run_start:offset])
+                    run_start = offset
+                if self._handle_key_event(code, value, pending_scan):
+                    if forward and offset > run_start:
+                        self._forward_raw(view[run_start:offset])
+                    run_start = offset + EVENT_SIZE
+            elif event_type == ev_rel:
+                if motion is not None:
+                    code, value = _EVENT_KEY_FIELDS.unpack_from(view, offset + _CODE_OFFSET)
+                    if code == ecodes.REL_X or code == ecodes.REL_Y:
+                        if code == ecodes.REL_X:
+                            self._frame_dx += value
+                        else:
+                            self._frame_dy += value
+                        if offset > run_start:
+                            self._forward_raw(view[run_start:offset])
+                        run_start = offset + EVENT_SIZE
+            elif event_type == ev_syn:
+                if view[offset + _CODE_BYTE] == ecodes.SYN_REPORT:
+                    pending_scan = None
+                    if motion is not None and (self._frame_dx or self._frame_dy):
+                        if offset > run_start:
+                            self._forward_raw(view[run_start:offset])
+                        run_start = offset
+                        self._emit_motion_raw()
+            elif track_scan and event_type == ecodes.EV_MSC:
+                code, value = _EVENT_KEY_FIELDS.unpack_from(view, offset + _CODE_OFFSET)
+                if code == ecodes.MSC_SCAN:
+                    pending_scan = value
+            offset += EVENT_SIZE
+
+        if forward and length > run_start:
+            self._forward_raw(view[run_start:length])
+        self._pending_scan = pending_scan
+        metrics.observe_loop(clock() - started)
+
+    def _emit_motion_raw(self) -> None:
+        motion = self._motion
+        motion.transform(self._frame_dx, self._frame_dy)
+        self._frame_dx = 0
+        self._frame_dy = 0
+        buffer = self._motion_buffer
+        size = 0
+        if motion.out_x:
+            _EVENT.pack_into(buffer, size, 0, 0, ecodes.EV_REL, ecodes.REL_X, motion.out_x)
+            size += EVENT_SIZE
+        if motion.out_y:
+            _EVENT.pack_into(buffer, size, 0, 0, ecodes.EV_REL, ecodes.REL_Y, motion.out_y)
+            size += EVENT_SIZE
+        if not size:
+            return
+        try:
+            os.write(self._raw_out_fd, memoryview(buffer)[:size])
+        except OSError:
+            self.metrics.write_errors += size // EVENT_SIZE
+        else:
+            self.metrics.events_out += size // EVENT_SIZE
+
+    def _emit_motion_events(self) -> None:
+        motion = self._motion
+        sink = self._key_output
+        motion.transform(self._frame_dx, self._frame_dy)
+        self._frame_dx = 0
+        self._frame_dy = 0
+        if sink is None:
+            return
+        if motion.out_x:
+            sink.write(ecodes.EV_REL, ecodes.REL_X, motion.out_x)
+        if motion.out_y:
+            sink.write(ecodes.EV_REL, ecodes.REL_Y, motion.out_y)
+
+    def _forward_raw(self, chunk: memoryview) -> None:
+        count = len(chunk) // EVENT_SIZE
+        tracer = self._tracer
+        if tracer is not None:
+            write_started = time.perf_counter_ns()
+        try:
+            os.write(self._raw_out_fd, chunk)
+        except OSError:
+            self.metrics.write_errors += count
+        else:
+            self.metrics.passthrough += count
+            self.metrics.events_out += count
+        if tracer is not None:
+            tracer.add(STAGE_WRITE, time.perf_counter_ns() - write_started)
+
+    def _handle_key_event(self, code: int, value: int, scan_code: Optional[int]) -> bool:
+        """Resolves and executes a key event; returns True when it was consumed."""
+        timing = self._timing
+        if timing is not None and timing.intercept(code, value, time.monotonic_ns()):
+            if value == 0:
+                self._held.pop(code, None)
+            return True
+        if self._dispatch_key(code, value, scan_code):
+            return True
+        shared = self._shared_keys
+        if shared is not None and value != 2:
+            # Passthrough on a shared sink: drop presses/releases other interfaces still hold.
+            return not shared.update(code, value, self)
+        return False
+
+    def _dispatch_key(self, code: int, value: int, scan_code: Optional[int]) -> bool:
+        tracer = self._tracer
+        if tracer is not None:
+            started = time.perf_counter_ns()
+        layers = self._layers
+        if layers.layered and value != 1 and code in self._held:
+            # Releases and repeats follow the layer the key was pressed on.
+            mapping = self._held.pop(code) if value == 0 else self._held[code]
+        else:
+            mapping = self._resolve_mapping(self.code_name(code), code, scan_code)
+            if layers.layered and value == 1:
+                self._held[code] = mapping
+                if mapping is None or not isinstance(mapping.strategy, LayerActionStrategy):
+                    layers.consume_oneshot()
+        if tracer is not None:
+            resolved = time.perf_counter_ns()
+            tracer.add(STAGE_RESOLVE, resolved - started)
+        if mapping is None:
+            return False
+
+        if value == 1:
+            self.metrics.record_hit(code)
+            if self._debug_enabled:
+                logger.debug(
+                    "[%s] mapping hit: code=%s -> %s",
+                    self.config.device_path,
+                    code,
+                    mapping.type_name,
+                )
+        strategy = mapping.strategy
+        if isinstance(strategy, TapHoldActionStrategy):
+            if value == 1 and self._timing is not None:
+                self._timing.start_tap_hold(code, strategy, time.monotonic_ns())
+        elif value == 2:
+            if mapping.repeat_policy.mode == REPEAT_FORWARD:
+                self._execute(mapping, 2)
+        else:
+            repeater = self._repeater
+            emit = True
+            if repeater is not None:
+                if value == 0:
+                    emit = repeater.stop(code)
+                elif mapping.repeat_policy.mode in TIMED_REPEAT_MODES:
+                    repeater.start(code, mapping, time.monotonic_ns())
+            if emit:
+                self._execute(mapping, value)
+        if tracer is not None:
+            tracer.add(STAGE_EXECUTE, time.perf_counter_ns() - resolved)
+        return True
 
     def _resolve_mapping(
         self,
@@ -220,49 +782,71 @@ class InputMapper:
         numeric_code: int,
         scan_code: Optional[int],
     ) -> Optional[Action]:
+        layers = self._layers
         if scan_code is not None:
-            mapped = self._fast_scan_map.get(scan_code)
+            mapped = layers.scans.get(scan_code)
             if mapped is not None:
                 return mapped
 
-        mapped = self._fast_code_map.get(numeric_code)
-        if mapped is not None:
-            return mapped
+        if 0 <= numeric_code < len(layers.codes):
+            mapped = layers.codes[numeric_code]
+            if mapped is not None:
+                return mapped
 
         return self.config.mappings.get(key_name)
 
+    def _execute(self, action: Action, event_value: int) -> None:
+        if isinstance(action.strategy, LayerActionStrategy):
+            self._layers.handle(action.strategy, event_value)
+        elif action.strategy.writes_output():
+            self._handle_action(action, event_value)
+
+    def _replay_key(self, code: int, value: int) -> None:
+        """Re-injects a key the timing stage held back, through normal resolution."""
+        if self._dispatch_key(code, value, None):
+            return
+        sink = self._key_output
+        if sink is not None and self.config.passthrough:
+            sink.write(ecodes.EV_KEY, code, value)
+            sink.syn()
+
     def _handle_action(self, action: Action, event_value: int) -> None:
-        sink = self._pointer_sink if action.strategy.prefers_pointer_output() else self._sink
+        sink = self._pointer_output if action.strategy.prefers_pointer_output() else self._key_output
         if sink is None:
-            sink = self._sink or self._pointer_sink
+            sink = self._key_output or self._pointer_output
         if sink is None:
             return
-        action.strategy.execute(sink, event_value, action.strategy.to_dict())
+        strategy = action.strategy
+        state = self._action_state.get(id(strategy))
+        if state is None:
+            state = self._action_state[id(strategy)] = {}
+        if (
+            event_value != 0
+            and self._animator is not None
+            and isinstance(strategy, WheelActionStrategy)
+            and strategy.smooth_frames > 1
+        ):
+            self._animator.start(strategy, sink, state, time.monotonic_ns())
+            return
+        strategy.execute(sink, event_value, state)
 
     def _update_active_keys(self, code: int, value: int) -> None:
-        name = self._code_name(code)
-        if value == 1:
-            self.active_keys.add(name)
-        elif value == 0:
-            self.active_keys.discard(name)
-
-    def _code_name(self, code: int) -> str:
-        cached = self._name_cache.get(code)
-        if cached:
-            return cached
+        if value == 2 or code >= ecodes.KEY_CNT:
+            return
+        snapshot = self.key_snapshot
+        held = snapshot.held
+        updated = held | (1 << code) if value else held & ~(1 << code)
+        if updated != held:
+            self.key_snapshot = KeySnapshot(snapshot.generation + 1, updated)
 
-        if code in ecodes.KEY:
-            name = ecodes.KEY[code]
-        else:
-            name = str(code)
-        self._name_cache[code] = name
-        return name
+    def code_name(self, code: int) -> str:
+        return code_name(code)
 
     def _build_caps(self, raw_caps: Dict[int, Iterable[int]]) -> Dict[int, list[int]]:
         keys = set(raw_caps.get(ecodes.EV_KEY, []))
         rels = set(raw_caps.get(ecodes.EV_REL, []))
 
-        for action in self.config.mappings.values():
+        for action in self.config.iter_actions():
             keys.update(action.strategy.required_key_codes())
             rels.update(action.strategy.required_rel_codes())
 
@@ -274,22 +858,25 @@ class InputMapper:
         return caps
 
     def _pointer_caps(self) -> Dict[int, list[int]]:
-        return {
-            ecodes.EV_KEY: [
-                ecodes.BTN_LEFT,
-                ecodes.BTN_RIGHT,
-                ecodes.BTN_MIDDLE,
-                ecodes.BTN_SIDE,
-                ecodes.BTN_EXTRA,
-            ],
-            ecodes.EV_REL: [ecodes.REL_WHEEL, ecodes.REL_X, ecodes.REL_Y],
-        }
+        keys = {ecodes.BTN_LEFT, ecodes.BTN_RIGHT, ecodes.BTN_MIDDLE, ecodes.BTN_SIDE, ecodes.BTN_EXTRA}
+        rels = {ecodes.REL_WHEEL, ecodes.REL_X, ecodes.REL_Y}
+        for action in self.config.iter_actions():
+            if action.strategy.prefers_pointer_output():
+                keys.update(action.strategy.required_key_codes())
+                rels.update(action.strategy.required_rel_codes())
+        return {ecodes.EV_KEY: sorted(keys), ecodes.EV_REL: sorted(rels)}
 
     def _needs_pointer_output(self) -> bool:
-        return any(action.strategy.prefers_pointer_output() for action in self.config.mappings.values())
+        return any(
+            action.strategy.writes_output() and action.strategy.prefers_pointer_output()
+            for action in self.config.iter_actions()
+        )
 
     def _needs_keystroke_output(self) -> bool:
-        return any(not action.strategy.prefers_pointer_output() for action in self.config.mappings.values())
+        return any(
+            action.strategy.writes_output() and not action.strategy.prefers_pointer_output()
+            for action in self.config.iter_actions()
+        )
 
 
-__all__ = ["InputMapper", "MappingConfig"]
+__all__ = ["EVENT_SIZE", "InputMapper", "KeySnapshot", "MappingConfig", "bitmap_codes"]
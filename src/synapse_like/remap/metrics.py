@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import logging
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_US = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000)
+_BUCKET_BOUNDS_NS = tuple(bound * 1000 for bound in LATENCY_BUCKETS_US)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@dataclass(slots=True)
+class MapperMetrics:
+    """
+    Hot-path counters owned by a single mapper thread.
+
+    Only the mapper thread writes; readers take `snapshot()` copies.
+    """
+
+    events_in: int = 0
+    events_out: int = 0
+    passthrough: int = 0
+    write_errors: int = 0
+    max_loop_ns: int = 0
+    latency_sum_ns: int = 0
+    mapping_hits: Dict[int, int] = field(default_factory=dict)
+    latency_buckets: list[int] = field(default_factory=lambda: [0] * (len(_BUCKET_BOUNDS_NS) + 1))
+
+    def record_hit(self, code: int) -> None:
+        self.mapping_hits[code] = self.mapping_hits.get(code, 0) + 1
+
+    def observe_loop(self, elapsed_ns: int) -> None:
+        if elapsed_ns > self.max_loop_ns:
+            self.max_loop_ns = elapsed_ns
+        self.latency_sum_ns += elapsed_ns
+        self.latency_buckets[bisect_left(_BUCKET_BOUNDS_NS, elapsed_ns)] += 1
+
+    def reset(self) -> None:
+        self.events_in = 0
+        self.events_out = 0
+        self.passthrough = 0
+        self.write_errors = 0
+        self.max_loop_ns = 0
+        self.latency_sum_ns = 0
+        self.mapping_hits.clear()
+        self.latency_buckets = [0] * (len(_BUCKET_BOUNDS_NS) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "events_in": self.events_in,
+            "events_out": self.events_out,
+            "passthrough": self.passthrough,
+            "write_errors": self.write_errors,
+            "max_loop_us": self.max_loop_ns / 1000.0,
+            "mapping_hits": dict(self.mapping_hits),
+            "latency": {
+                "buckets_us": list(LATENCY_BUCKETS_US),
+                "counts": list(self.latency_buckets),
+                "sum_us": self.latency_sum_ns / 1000.0,
+            },
+        }
+
+
+def render_prometheus(
+    snapshots: Iterable[Dict[str, Any]],
+    code_name: Callable[[int], str] = str,
+) -> str:
+    """Renders mapper snapshots (with a `device_path` entry) as Prometheus text."""
+    entries = list(snapshots)
+    lines: list[str] = []
+
+    def family(name: str, kind: str, help_text: str) -> None:
+        lines.append(f"# HELP synapse_like_{name} {help_text}")
+        lines.append(f"# TYPE synapse_like_{name} {kind}")
+
+    counters = (
+        ("events_in", "Events read from the source device."),
+        ("events_out", "Events written to virtual sinks."),
+        ("passthrough", "Events forwarded without remapping."),
+        ("write_errors", "Dropped or failed sink writes."),
+    )
+    for key, help_text in counters:
+        family(f"{key}_total", "counter", help_text)
+        for entry in entries:
+            lines.append(f"synapse_like_{key}_total{{{_device_label(entry)}}} {int(entry.get(key, 0))}")
+
+    family("max_loop_seconds", "gauge", "Slowest mapper loop iteration since start.")
+    for entry in entries:
+        lines.append(
+            f"synapse_like_max_loop_seconds{{{_device_label(entry)}}} {float(entry.get('max_loop_us', 0.0)) / 1e6:.9f}"
+        )
+
+    family("mapping_hits_total", "counter", "Mapped key presses per source code.")
+    for entry in entries:
+        for code, count in sorted(entry.get("mapping_hits", {}).items()):
+            key_label = _escape(code_name(int(code)))
+            lines.append(
+                f'synapse_like_mapping_hits_total{{{_device_label(entry)},key="{key_label}"}} {int(count)}'
+            )
+
+    family("loop_latency_seconds", "histogram", "Mapper loop iteration time.")
+    for entry in entries:
+        latency = entry.get("latency", {})
+        bounds = latency.get("buckets_us", LATENCY_BUCKETS_US)
+        counts = latency.get("counts", [])
+        device = _device_label(entry)
+        cumulative = 0
+        for bound, count in zip(bounds, counts):
+            cumulative += int(count)
+            lines.append(f'synapse_like_loop_latency_seconds_bucket{{{device},le="{bound / 1e6:g}"}} {cumulative}')
+        cumulative += sum(int(count) for count in counts[len(bounds):])
+        lines.append(f'synapse_like_loop_latency_seconds_bucket{{{device},le="+Inf"}} {cumulative}')
+        lines.append(
+            f"synapse_like_loop_latency_seconds_sum{{{device}}} {float(latency.get('sum_us', 0.0)) / 1e6:.9f}"
+        )
+        lines.append(f"synapse_like_loop_latency_seconds_count{{{device}}} {cumulative}")
+
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """
+    Serves Prometheus text on a loopback HTTP socket for node exporters.
+    """
+
+    def __init__(self, port: int, render: Callable[[], str], host: str = "127.0.0.1") -> None:
+        self.host = host
+        self.port = port
+        self._render = render
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._server is not None:
+            return
+        render = self._render
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info("Metrics exporter listening on http://%s:%s/metrics", self.host, self.port)
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+
+
+def _device_label(entry: Dict[str, Any]) -> str:
+    return f'device="{_escape(str(entry.get("device_path", "")))}"'
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+__all__ = [
+    "LATENCY_BUCKETS_US",
+    "MapperMetrics",
+    "MetricsExporter",
+    "render_prometheus",
+]
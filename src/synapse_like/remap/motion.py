@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+FIXED_SHIFT = 16
+FIXED_ONE = 1 << FIXED_SHIFT
+CURVE_TABLE_SIZE = 128
+
+
+@dataclass(slots=True)
+class MotionSettings:
+    """
+    Per-profile pointer motion transform.
+
+    `curve` holds (speed, gain) points where speed is counts per report on the
+    dominant axis; gains between points are interpolated linearly.
+    """
+
+    sensitivity: float = 1.0
+    curve: List[Tuple[float, float]] = field(default_factory=list)
+    swap_axes: bool = False
+    invert_x: bool = False
+    invert_y: bool = False
+
+    def is_identity(self) -> bool:
+        return (
+            self.sensitivity == 1.0
+            and all(gain == 1.0 for _, gain in self.curve)
+            and not self.swap_axes
+            and not self.invert_x
+            and not self.invert_y
+        )
+
+    def gain_at(self, speed: float) -> float:
+        points = sorted(self.curve)
+        if not points:
+            return 1.0
+        if speed <= points[0][0]:
+            return points[0][1]
+        for (left_speed, left_gain), (right_speed, right_gain) in zip(points, points[1:]):
+            if speed <= right_speed:
+                span = right_speed - left_speed
+                if span <= 0:
+                    return right_gain
+                return left_gain + (right_gain - left_gain) * (speed - left_speed) / span
+        return points[-1][1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sensitivity": self.sensitivity,
+            "curve": [[speed, gain] for speed, gain in self.curve],
+            "swap_axes": self.swap_axes,
+            "invert_x": self.invert_x,
+            "invert_y": self.invert_y,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "MotionSettings":
+        curve: List[Tuple[float, float]] = []
+        raw_curve = data.get("curve", [])
+        if isinstance(raw_curve, list):
+            for point in raw_curve:
+                if isinstance(point, (list, tuple)) and len(point) == 2:
+                    try:
+                        speed, gain = float(point[0]), float(point[1])
+                    except (TypeError, ValueError):
+                        continue
+                    if math.isfinite(speed) and math.isfinite(gain):
+                        curve.append((speed, gain))
+        try:
+            sensitivity = float(data.get("sensitivity", 1.0))
+        except (TypeError, ValueError):
+            sensitivity = 1.0
+        return cls(
+            sensitivity=sensitivity if math.isfinite(sensitivity) and sensitivity > 0 else 1.0,
+            curve=curve,
+            swap_axes=bool(data.get("swap_axes", False)),
+            invert_x=bool(data.get("invert_x", False)),
+            invert_y=bool(data.get("invert_y", False)),
+        )
+
+
+class MotionPipeline:
+    """
+    Fixed-point REL_X/REL_Y transform with sub-pixel carry.
+
+    The gain lookup table is built once per profile; `transform` only does
+    integer arithmetic on preallocated slots and leaves the result in
+    `out_x`/`out_y`, so no containers are created per report.
+    """
+
+    __slots__ = ("_gains", "_last_index", "_swap", "_sign_x", "_sign_y", "carry_x", "carry_y", "out_x", "out_y")
+
+    def __init__(self, settings: MotionSettings) -> None:
+        self._gains = [
+            int(round(settings.sensitivity * settings.gain_at(float(speed)) * FIXED_ONE))
+            for speed in range(CURVE_TABLE_SIZE)
+        ]
+        self._last_index = CURVE_TABLE_SIZE - 1
+        self._swap = settings.swap_axes
+        self._sign_x = -1 if settings.invert_x else 1
+        self._sign_y = -1 if settings.invert_y else 1
+        self.carry_x = 0
+        self.carry_y = 0
+        self.out_x = 0
+        self.out_y = 0
+
+    @classmethod
+    def from_settings(cls, settings: Optional[MotionSettings]) -> Optional["MotionPipeline"]:
+        if settings is None or settings.is_identity():
+            return None
+        return cls(settings)
+
+    def transform(self, dx: int, dy: int) -> None:
+        if self._swap:
+            dx, dy = dy, dx
+        speed = dx if dx >= 0 else -dx
+        other = dy if dy >= 0 else -dy
+        if other > speed:
+            speed = other
+        gain = self._gains[speed if speed < self._last_index else self._last_index]
+
+        scaled = dx * self._sign_x * gain + self.carry_x
+        self.out_x = scaled >> FIXED_SHIFT
+        self.carry_x = scaled - (self.out_x << FIXED_SHIFT)
+
+        scaled = dy * self._sign_y * gain + self.carry_y
+        self.out_y = scaled >> FIXED_SHIFT
+        self.carry_y = scaled - (self.out_y << FIXED_SHIFT)
+
+    def reset(self) -> None:
+        self.carry_x = 0
+        self.carry_y = 0
+        self.out_x = 0
+        self.out_y = 0
+
+
+__all__ = ["CURVE_TABLE_SIZE", "MotionPipeline", "MotionSettings"]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+# Action codes understood by `synapse_native.run_remap_loop`; keep in sync with
+# native/synapse_native/src/lib.rs.
+ACTION_NONE = 0
+ACTION_PASSTHROUGH = 1
+ACTION_KEYSTROKE = 2
+ACTION_SCROLL_UP = 3
+ACTION_SCROLL_DOWN = 4
+ACTION_BTN_X1 = 5
+ACTION_BTN_X2 = 6
+ACTION_BUTTON = 7
+ACTION_CLICK = 8
+ACTION_DRAG_LOCK = 9
+ACTION_NUDGE = 10
+
+# (action code, target code, argument)
+NativeEntry = Tuple[int, int, int]
+
+
+def pack_click(clicks: int, interval_ms: int) -> int:
+    """ACTION_CLICK argument: click count in the low byte, interval (ms) above it."""
+    return (min(max(interval_ms, 0), 0xFFFF) << 8) | min(max(clicks, 1), 0xFF)
+
+
+def pack_nudge(dx: int, dy: int) -> int:
+    """ACTION_NUDGE argument: signed 16-bit dx in the high half, dy in the low half."""
+    dx = min(max(dx, -0x8000), 0x7FFF)
+    dy = min(max(dy, -0x8000), 0x7FFF)
+    value = ((dx & 0xFFFF) << 16) | (dy & 0xFFFF)
+    return value - (1 << 32) if value & 0x80000000 else value
+
+
+def compile_native_table(
+    codes: Sequence[Optional[Any]],
+    scans: Optional[Dict[int, Any]] = None,
+) -> Optional[Dict[int, NativeEntry]]:
+    """
+    Builds the `mappings` argument of the native loop from a dense layer table.
+
+    Returns None when any bound action has no native equivalent (or scan-code
+    bindings are present), so the caller keeps the Python engine.
+    """
+    if scans:
+        return None
+    table: Dict[int, NativeEntry] = {}
+    for code, action in enumerate(codes):
+        if action is None:
+            continue
+        entry = action.strategy.native_entry()
+        if entry is None:
+            return None
+        table[code] = entry
+    return table
+
+
+__all__ = [
+    "ACTION_BTN_X1",
+    "ACTION_BTN_X2",
+    "ACTION_BUTTON",
+    "ACTION_CLICK",
+    "ACTION_DRAG_LOCK",
+    "ACTION_KEYSTROKE",
+    "ACTION_NONE",
+    "ACTION_NUDGE",
+    "ACTION_PASSTHROUGH",
+    "ACTION_SCROLL_DOWN",
+    "ACTION_SCROLL_UP",
+    "NativeEntry",
+    "compile_native_table",
+    "pack_click",
+    "pack_nudge",
+]
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STAGE_READ = 0
+STAGE_RESOLVE = 1
+STAGE_EXECUTE = 2
+STAGE_WRITE = 3
+STAGE_NAMES = ("read", "resolve", "execute", "write")
+
+PROFILE_MODES = ("stages", "sampling")
+MAX_PROFILE_SECONDS = 120.0
+PROFILE_DIR = Path("/tmp/synapse-like-profiles")
+ROOT_FRAME = "synapse-like"
+
+
+class StageTracer:
+    """
+    Accumulates time spent per loop stage for one mapper.
+
+    Attached to a running mapper for a bounded window; `None` when idle so the
+    loop only pays for an attribute read.
+    """
+
+    __slots__ = ("totals_ns", "counts")
+
+    def __init__(self) -> None:
+        self.totals_ns = [0] * len(STAGE_NAMES)
+        self.counts = [0] * len(STAGE_NAMES)
+
+    def add(self, stage: int, elapsed_ns: int) -> None:
+        if elapsed_ns < 0:
+            return
+        self.totals_ns[stage] += elapsed_ns
+        self.counts[stage] += 1
+
+    def folded(self, label: str) -> List[str]:
+        """Returns flamegraph folded lines weighted in microseconds."""
+        lines: List[str] = []
+        for name, total in zip(STAGE_NAMES, self.totals_ns):
+            weight = total // 1000
+            if weight > 0:
+                lines.append(f"{ROOT_FRAME};{_frame(label)};{name} {weight}")
+        return lines
+
+
+class SamplingProfiler:
+    """
+    Periodically samples the Python stacks of the given threads.
+    """
+
+    def __init__(self, threads: Dict[int, str], interval: float = 0.001) -> None:
+        self.threads = dict(threads)
+        self.interval = max(interval, 0.0002)
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def sample_once(self) -> None:
+        frames = sys._current_frames()
+        for thread_id, label in self.threads.items():
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.append(label)
+            stack.append(ROOT_FRAME)
+            self.samples[";".join(_frame(item) for item in reversed(stack))] += 1
+
+    def folded(self) -> List[str]:
+        return [f"{stack} {count}" for stack, count in sorted(self.samples.items())]
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample_once()
+
+
+class ProfileSession:
+    """
+    Bounded profiling window over a set of running mappers.
+
+    Results are written as folded stacks, ready for `flamegraph.pl` or speedscope.
+    """
+
+    def __init__(
+        self,
+        mappers: Iterable[Any],
+        mode: str = "stages",
+        duration: float = 10.0,
+        output_path: Optional[str] = None,
+        interval: float = 0.001,
+    ) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mappers = list(mappers)
+        self.mode = mode
+        self.duration = min(max(float(duration), 0.1), MAX_PROFILE_SECONDS)
+        self.output_path = Path(output_path or default_profile_path())
+        self.interval = interval
+        self._tracers: list[tuple[Any, StageTracer]] = []
+        self._sampler: Optional[SamplingProfiler] = None
+        self._timer: Optional[threading.Timer] = None
+        self._finished = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self._timer is not None and not self._finished.is_set()
+
+    def start(self) -> None:
+        if self.mode == "stages":
+            for mapper in self.mappers:
+                tracer = StageTracer()
+                mapper.set_tracer(tracer)
+                self._tracers.append((mapper, tracer))
+        else:
+            threads = {
+                mapper.thread_id: mapper.device_path
+                for mapper in self.mappers
+                if mapper.thread_id is not None
+            }
+            self._sampler = SamplingProfiler(threads, interval=self.interval)
+            self._sampler.start()
+
+        self._timer = threading.Timer(self.duration, self.finish)
+        self._timer.daemon = True
+        self._timer.start()
+        logger.info("Profiling %d mapper(s) for %.1fs (%s)", len(self.mappers), self.duration, self.mode)
+
+    def finish(self) -> Path:
+        with self._lock:
+            if self._finished.is_set():
+                return self.output_path
+            if self._timer is not None:
+                self._timer.cancel()
+
+            lines: List[str] = []
+            for mapper, tracer in self._tracers:
+                mapper.set_tracer(None)
+                lines.extend(tracer.folded(mapper.device_path))
+            if self._sampler is not None:
+                self._sampler.stop()
+                lines.extend(self._sampler.folded())
+
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self.output_path.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8")
+            self._finished.set()
+            logger.info("Profile written to %s", self.output_path)
+            return self.output_path
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._finished.wait(timeout)
+
+
+def default_profile_path() -> str:
+    return str(PROFILE_DIR / f"synapse-like-profile-{time.strftime('%Y%m%d-%H%M%S')}.folded")
+
+
+def profile_output_path(name: Optional[str]) -> str:
+    """
+    Output path for a trace name sent over IPC. The daemon runs as root, so
+    clients only pick a file name; traces always land in PROFILE_DIR.
+    """
+    if not name:
+        return default_profile_path()
+    name = str(name)
+    if name in (".", "..") or Path(name).name != name:
+        raise ValueError(f"Profile output must be a file name inside {PROFILE_DIR}: {name}")
+    return str(PROFILE_DIR / name)
+
+
+def _frame(value: str) -> str:
+    return value.replace(";", ":")
+
+
+__all__ = [
+    "MAX_PROFILE_SECONDS",
+    "PROFILE_DIR",
+    "PROFILE_MODES",
+    "ProfileSession",
+    "STAGE_EXECUTE",
+    "STAGE_NAMES",
+    "STAGE_READ",
+    "STAGE_RESOLVE",
+    "STAGE_WRITE",
+    "SamplingProfiler",
+    "StageTracer",
+    "default_profile_path",
+    "profile_output_path",
+]
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from evdev import UInput, ecodes
+
+from synapse_like.remap.metrics import MapperMetrics
+
+logger = logging.getLogger(__name__)
+
+SinkFactory = Callable[[Dict[int, List[int]], str, int], Any]
+
+
+SHARED_SOURCE = "*shared*"
+
+
+class SharedKeyState:
+    """
+    Which mappers hold each key down on a sink shared by several interfaces.
+
+    A press goes out when the first holder appears and a release only when the
+    last one lets go, so a modifier held on one interface stays down while
+    another interface releases its own copy of it.
+    """
+
+    __slots__ = ("_holders", "_lock")
+
+    def __init__(self) -> None:
+        self._holders: Dict[int, set] = {}
+        self._lock = threading.Lock()
+
+    def update(self, code: int, value: int, owner: Any) -> bool:
+        """Records a press (1) or release (0); returns True when it should be written."""
+        with self._lock:
+            holders = self._holders.get(code)
+            if value:
+                if holders is None:
+                    self._holders[code] = {owner}
+                    return True
+                holders.add(owner)
+                return False
+            if holders is None:
+                return True
+            holders.discard(owner)
+            if holders:
+                return False
+            del self._holders[code]
+            return True
+
+    def forget(self, owner: Any) -> List[int]:
+        """Drops every key held by `owner`; returns the keys nobody holds anymore."""
+        released: List[int] = []
+        with self._lock:
+            for code, holders in list(self._holders.items()):
+                if owner in holders:
+                    holders.discard(owner)
+                    if not holders:
+                        del self._holders[code]
+                        released.append(code)
+        return released
+
+
+class MeteredSink:
+    """
+    Thin proxy handed to action strategies so synthesized writes are counted.
+
+    Failed writes are counted and dropped instead of tearing down the loop. On a
+    shared sink, key writes also go through the sink's `SharedKeyState`.
+
+    Every synthetic key press is tracked in `pressed`, a bitset indexed by key
+    code, so `release_all` can let go of whatever is still down when the mapper
+    stops or crashes. After `detach` the proxy drops all writes, which also
+    aborts macros still playing into it.
+    """
+
+    __slots__ = ("device", "metrics", "key_state", "owner", "pressed", "active", "_lock")
+
+    def __init__(
+        self,
+        device: Any,
+        metrics: MapperMetrics,
+        key_state: Optional[SharedKeyState] = None,
+        owner: Any = None,
+    ) -> None:
+        self.device = device
+        self.metrics = metrics
+        self.key_state = key_state
+        self.owner = owner
+        self.pressed = 0
+        self.active = True
+        self._lock = threading.Lock()
+
+    def write(self, event_type: int, code: int, value: int) -> None:
+        if not self.active:
+            return
+        if event_type != ecodes.EV_KEY or value == 2:
+            self._write(event_type, code, value)
+            return
+        # Re-checked under the lock `detach` takes, so a press either lands
+        # before its releases or not at all.
+        with self._lock:
+            if not self.active:
+                return
+            if value:
+                self.pressed |= 1 << code
+            else:
+                self.pressed &= ~(1 << code)
+            key_state = self.key_state
+            if key_state is not None and not key_state.update(code, value, self.owner):
+                return
+            self._write(event_type, code, value)
+
+    def syn(self) -> None:
+        if not self.active:
+            return
+        self._syn()
+
+    def write_event(self, event: Any) -> None:
+        if not self.active:
+            return
+        try:
+            self.device.write_event(event)
+        except OSError:
+            self.metrics.write_errors += 1
+            return
+        self.metrics.events_out += 1
+
+    def release_all(self) -> List[int]:
+        """Releases every synthetic key still pressed; returns their codes."""
+        with self._lock:
+            mask, self.pressed = self.pressed, 0
+        return self._release(mask)
+
+    def detach(self) -> None:
+        """Stops accepting writes, then releases what this proxy left pressed."""
+        with self._lock:
+            self.active = False
+            mask, self.pressed = self.pressed, 0
+        self._release(mask)
+
+    def close(self) -> None:
+        self.device.close()
+
+    def _release(self, mask: int) -> List[int]:
+        released: List[int] = []
+        while mask:
+            low = mask & -mask
+            code = low.bit_length() - 1
+            mask ^= low
+            released.append(code)
+            if self.key_state is None or self.key_state.update(code, 0, self.owner):
+                self._write(ecodes.EV_KEY, code, 0)
+        if released:
+            self._syn()
+        return released
+
+    def _write(self, event_type: int, code: int, value: int) -> None:
+        try:
+            self.device.write(event_type, code, value)
+        except OSError:
+            self.metrics.write_errors += 1
+            return
+        self.metrics.events_out += 1
+
+    def _syn(self) -> None:
+        try:
+            self.device.syn()
+        except OSError:
+            self.metrics.write_errors += 1
+            return
+        self.metrics.events_out += 1
+
+
+def _create_uinput(caps: Dict[int, List[int]], name: str, bustype: int) -> UInput:
+    return UInput(caps, name=name, bustype=bustype)
+
+
+@dataclass(slots=True)
+class _PooledSink:
+    device: Any
+    caps: Dict[int, FrozenSet[int]]
+    users: int = 1
+    key_state: Optional[SharedKeyState] = None
+
+
+class SinkPool:
+    """
+    Virtual uinput devices kept alive across APPLY cycles.
+
+    Sinks are keyed by (source device, role). A released sink is handed back
+    on the next acquire as long as its capabilities cover the request; only a
+    growing capability set replaces it (with the union, so the next shrink
+    reuses it again). Desktops therefore do not see the virtual devices vanish
+    and reappear on every profile change.
+    """
+
+    def __init__(self, factory: SinkFactory = _create_uinput) -> None:
+        self._factory = factory
+        self._sinks: Dict[Tuple[str, str], _PooledSink] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(
+        self,
+        source: str,
+        role: str,
+        caps: Mapping[int, Iterable[int]],
+        name: str,
+        bustype: int,
+        shared: bool = False,
+    ) -> Any:
+        """
+        Hands out the sink for (source, role).
+
+        `shared` sinks (source `SHARED_SOURCE`) may be held by several mappers
+        at once; callers pass the union of their capabilities so the device
+        never has to grow while in use.
+        """
+        wanted = {event_type: frozenset(codes) for event_type, codes in caps.items()}
+        key = (source, role)
+        with self._lock:
+            pooled = self._sinks.get(key)
+            if pooled is not None and (not pooled.users or pooled.key_state is not None):
+                if _covers(pooled.caps, wanted):
+                    pooled.users += 1
+                    self.reused += 1
+                    return pooled.device
+                if pooled.users:
+                    logger.warning("Shared %s sink lacks capabilities; using a private one", role)
+                    self.created += 1
+                    return self._factory(_caps_lists(wanted), name, bustype)
+                for event_type, codes in pooled.caps.items():
+                    wanted[event_type] = wanted.get(event_type, frozenset()) | codes
+                del self._sinks[key]
+                _close(pooled.device)
+            elif pooled is not None:
+                # Same source claimed twice: hand out a private, unpooled sink.
+                self.created += 1
+                return self._factory(_caps_lists(wanted), name, bustype)
+            device = self._factory(_caps_lists(wanted), name, bustype)
+            self.created += 1
+            self._sinks[key] = _PooledSink(device, wanted, key_state=SharedKeyState() if shared else None)
+            return device
+
+    def key_state(self, device: Any) -> Optional[SharedKeyState]:
+        with self._lock:
+            pooled = next((entry for entry in self._sinks.values() if entry.device is device), None)
+            return pooled.key_state if pooled is not None else None
+
+    def release(self, device: Any) -> None:
+        """Returns a sink to the pool; the last user releases every key. Unpooled sinks are closed."""
+        with self._lock:
+            pooled = next((entry for entry in self._sinks.values() if entry.device is device), None)
+            if pooled is None:
+                _close(device)
+                return
+            pooled.users = max(pooled.users - 1, 0)
+            if pooled.users:
+                return
+        _release_keys(device, pooled.caps.get(ecodes.EV_KEY, ()))
+
+    def prune(self, keep_sources: Iterable[str]) -> None:
+        """Closes idle sinks whose source is no longer mapped."""
+        keep = set(keep_sources)
+        with self._lock:
+            stale = [key for key, entry in self._sinks.items() if not entry.users and key[0] not in keep]
+            for key in stale:
+                _close(self._sinks.pop(key).device)
+
+    def close_all(self) -> None:
+        with self._lock:
+            entries = list(self._sinks.values())
+            self._sinks.clear()
+        for entry in entries:
+            _close(entry.device)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pooled": len(self._sinks),
+                "idle": sum(1 for entry in self._sinks.values() if not entry.users),
+                "created": self.created,
+                "reused": self.reused,
+            }
+
+
+def _covers(have: Mapping[int, FrozenSet[int]], wanted: Mapping[int, FrozenSet[int]]) -> bool:
+    return all(codes <= have.get(event_type, frozenset()) for event_type, codes in wanted.items())
+
+
+def _caps_lists(caps: Mapping[int, FrozenSet[int]]) -> Dict[int, List[int]]:
+    return {event_type: sorted(codes) for event_type, codes in caps.items() if codes}
+
+
+def _release_keys(device: Any, key_codes: Iterable[int]) -> None:
+    # The input core drops releases for keys that are not down, so this only
+    # reaches clients for keys the previous mapper left pressed.
+    try:
+        for code in key_codes:
+            device.write(ecodes.EV_KEY, code, 0)
+        device.syn()
+    except OSError as exc:
+        logger.debug("Could not reset pooled sink: %s", exc)
+
+
+def _close(device: Any) -> None:
+    try:
+        device.close()
+    except OSError:
+        pass
+
+
+__all__ = ["MeteredSink", "SHARED_SOURCE", "SharedKeyState", "SinkPool"]
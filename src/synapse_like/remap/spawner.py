@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import sys
+
+from synapse_like.remap.launcher import SpawnHelper
+
+
+def main() -> None:
+    SpawnHelper().serve(sys.stdin.fileno())
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ from typing import Dict, Set
 from evdev import ecodes
 
 from synapse_like.remap.actions import Action, ActionType
+from synapse_like.remap.codes import name_code
 
 POINTER_ACTIONS = {
     ActionType.NONE,
@@ -53,7 +54,7 @@ def _parse_key_code(value: str) -> int | None:
     if value.startswith("MSC_SCAN:") or value.startswith("MSC_SCAN_HEX:"):
         return None
     if value.startswith(("KEY_", "BTN_")):
-        return ecodes.ecodes.get(value)
+        return name_code(value)
     return None
 
 
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional
+
+from synapse_like.remap.actions import (
+    REPEAT_TURBO,
+    SMOOTH_FRAME_MS,
+    Action,
+    TapHoldActionStrategy,
+    WheelActionStrategy,
+)
+from synapse_like.remap.layers import parse_mapping_key
+
+DEFAULT_CHORD_TIMEOUT_MS = 50
+# Longer windows would make every chord key feel stuck.
+MAX_CHORD_TIMEOUT_MS = 1000
+
+Emit = Callable[[Action, int], None]
+Replay = Callable[[int, int], None]
+
+
+def parse_chord_timeout(value: object) -> int:
+    """Chord window in ms from untrusted input: the default when unparsable, else clamped to 1..MAX."""
+    try:
+        timeout = int(value)
+    except (TypeError, ValueError, OverflowError):
+        return DEFAULT_CHORD_TIMEOUT_MS
+    return min(max(timeout, 1), MAX_CHORD_TIMEOUT_MS)
+
+
+def parse_chords(chords: Mapping[str, Action]) -> Dict[FrozenSet[int], Action]:
+    """Parses `"KEY_J+KEY_K"` chord keys; chords with unknown or single keys are dropped."""
+    parsed: Dict[FrozenSet[int], Action] = {}
+    for combo, action in chords.items():
+        codes = [parse_mapping_key(part.strip())[0] for part in combo.split("+")]
+        if len(codes) < 2 or any(code is None for code in codes):
+            continue
+        parsed[frozenset(codes)] = action
+    return parsed
+
+
+class TimingResolver:
+    """
+    Timing-aware stage for dual-role (tap-hold) keys and chords.
+
+    Only ambiguous keys are buffered: a tap-hold key until it is released, the
+    hold threshold passes or another key is pressed (which resolves it as hold),
+    and chord members until the chord completes or the window closes. Every
+    other key goes straight through. All methods take the current monotonic time
+    in nanoseconds, so the caller owns the clock and tests can drive it.
+    """
+
+    __slots__ = (
+        "_chords",
+        "_members",
+        "_chord_timeout_ns",
+        "_emit",
+        "_replay",
+        "_pending",
+        "_holding",
+        "_buffer",
+        "_chord_deadline",
+        "_chord_action",
+        "_chord_down",
+    )
+
+    def __init__(
+        self,
+        chords: Mapping[FrozenSet[int], Action],
+        emit: Emit,
+        replay: Replay,
+        chord_timeout_ms: int = DEFAULT_CHORD_TIMEOUT_MS,
+    ) -> None:
+        self._chords = dict(chords)
+        self._members = frozenset(code for combo in self._chords for code in combo)
+        self._chord_timeout_ns = max(int(chord_timeout_ms), 1) * 1_000_000
+        self._emit = emit
+        self._replay = replay
+        self._pending: Dict[int, tuple[TapHoldActionStrategy, int]] = {}
+        self._holding: Dict[int, Optional[Action]] = {}
+        self._buffer: List[int] = []
+        self._chord_deadline = 0
+        self._chord_action: Optional[Action] = None
+        self._chord_down: set[int] = set()
+
+    def next_deadline(self) -> Optional[int]:
+        deadline: Optional[int] = self._chord_deadline if self._buffer else None
+        for _, pending_deadline in self._pending.values():
+            if deadline is None or pending_deadline < deadline:
+                deadline = pending_deadline
+        return deadline
+
+    def timeout(self, now_ns: int) -> Optional[float]:
+        """Seconds until the next deadline (for select), or None when idle."""
+        deadline = self.next_deadline()
+        if deadline is None:
+            return None
+        return max(deadline - now_ns, 0) / 1e9
+
+    def expire(self, now_ns: int) -> None:
+        if self._buffer and now_ns >= self._chord_deadline:
+            self._flush_chord()
+        for code, (strategy, deadline) in list(self._pending.items()):
+            if now_ns >= deadline:
+                self._resolve_hold(code, strategy)
+
+    def intercept(self, code: int, value: int, now_ns: int) -> bool:
+        """Runs before normal resolution; returns True when the event was consumed."""
+        self.expire(now_ns)
+        if value == 1:
+            return self._on_press(code, now_ns)
+        if code in self._pending or code in self._holding:
+            if value == 0:
+                self._on_tap_hold_release(code)
+            return True
+        if code in self._chord_down:
+            if value == 0:
+                self._chord_down.discard(code)
+                if self._chord_action is not None:
+                    self._emit(self._chord_action, 0)
+                    self._chord_action = None
+            return True
+        if code in self._buffer:
+            if value == 2:
+                return True
+            self._flush_chord()
+        return False
+
+    def start_tap_hold(self, code: int, strategy: TapHoldActionStrategy, now_ns: int) -> None:
+        self._pending[code] = (strategy, now_ns + strategy.hold_ms * 1_000_000)
+
+    def reset(self) -> None:
+        self._pending.clear()
+        self._holding.clear()
+        self._buffer.clear()
+        self._chord_action = None
+        self._chord_down.clear()
+
+    def _on_press(self, code: int, now_ns: int) -> bool:
+        # Another key going down settles pending dual-role keys as holds, so
+        # the hold (e.g. a modifier) applies to it.
+        for pending_code, (strategy, _) in list(self._pending.items()):
+            if pending_code != code:
+                self._resolve_hold(pending_code, strategy)
+
+        if code not in self._members:
+            if self._buffer:
+                self._flush_chord()
+            return False
+
+        if not self._buffer:
+            self._chord_deadline = now_ns + self._chord_timeout_ns
+        self._buffer.append(code)
+        pressed = frozenset(self._buffer)
+        action = self._chords.get(pressed)
+        if action is not None:
+            self._buffer.clear()
+            self._chord_down = set(pressed)
+            self._chord_action = action
+            self._emit(action, 1)
+        elif not any(pressed < combo for combo in self._chords):
+            self._flush_chord()
+        return True
+
+    def _on_tap_hold_release(self, code: int) -> None:
+        pending = self._pending.pop(code, None)
+        if pending is not None:
+            tap = pending[0].tap
+            if tap is not None:
+                self._emit(tap, 1)
+                self._emit(tap, 0)
+            return
+        hold = self._holding.pop(code, None)
+        if hold is not None:
+            self._emit(hold, 0)
+
+    def _resolve_hold(self, code: int, strategy: TapHoldActionStrategy) -> None:
+        del self._pending[code]
+        self._holding[code] = strategy.hold
+        if strategy.hold is not None:
+            self._emit(strategy.hold, 1)
+
+    def _flush_chord(self) -> None:
+        buffered = list(self._buffer)
+        self._buffer.clear()
+        for code in buffered:
+            self._replay(code, 1)
+
+
+class RepeatScheduler:
+    """
+    Timer-driven repeat for held keys whose action uses the `synthesize` or
+    `turbo` repeat policy; shares the mapper's select deadline with
+    `TimingResolver`.
+
+    Synthesized repeat emits value 2 every interval after the initial delay.
+    Turbo alternates release/press every half period, starting from the press
+    the mapper already executed, so one cycle lasts exactly 1/`rate_hz`.
+    Deadlines advance by whole steps, so the rate does not drift with wakeup
+    jitter.
+    """
+
+    __slots__ = ("_emit", "_active")
+
+    def __init__(self, emit: Emit) -> None:
+        self._emit = emit
+        # code -> [action, deadline, step, turbo state (None, or True while pressed)]
+        self._active: Dict[int, List] = {}
+
+    def start(self, code: int, action: Action, now_ns: int) -> None:
+        policy = action.repeat_policy
+        if policy.mode == REPEAT_TURBO:
+            step = max(policy.interval_ns // 2, 1)
+            self._active[code] = [action, now_ns + step, step, True]
+        else:
+            self._active[code] = [action, now_ns + policy.delay_ns, policy.interval_ns, None]
+
+    def stop(self, code: int) -> bool:
+        """Stops repeating; returns False when a turbo key is already released."""
+        entry = self._active.pop(code, None)
+        return entry is None or entry[3] is not False
+
+    def next_deadline(self) -> Optional[int]:
+        if not self._active:
+            return None
+        return min(entry[1] for entry in self._active.values())
+
+    def expire(self, now_ns: int) -> None:
+        for entry in list(self._active.values()):
+            if now_ns < entry[1]:
+                continue
+            pressed = entry[3]
+            if pressed is None:
+                self._emit(entry[0], 2)
+            else:
+                entry[3] = not pressed
+                self._emit(entry[0], 0 if pressed else 1)
+            entry[1] += entry[2]
+            if entry[1] <= now_ns:
+                # Fell behind (e.g. a stalled loop): resume the cadence instead of bursting.
+                entry[1] = now_ns + entry[2]
+
+    def reset(self) -> None:
+        self._active.clear()
+
+
+class WheelAnimator:
+    """
+    Spreads smooth wheel steps over `smooth_frames` frames on the mapper's
+    select deadline; the first frame goes out immediately.
+    """
+
+    __slots__ = ("_bursts", "_frame_ns")
+
+    def __init__(self, frame_ms: int = SMOOTH_FRAME_MS) -> None:
+        self._bursts: List[List[Any]] = []
+        self._frame_ns = frame_ms * 1_000_000
+
+    def start(self, strategy: WheelActionStrategy, sink: Any, state: Dict[str, Any], now_ns: int) -> None:
+        self._bursts.append([strategy, sink, state, 0, now_ns])
+        self.expire(now_ns)
+
+    def next_deadline(self) -> Optional[int]:
+        if not self._bursts:
+            return None
+        return min(burst[4] for burst in self._bursts)
+
+    def expire(self, now_ns: int) -> None:
+        if not self._bursts:
+            return
+        remaining: List[List[Any]] = []
+        for burst in self._bursts:
+            strategy, sink, state, index, deadline = burst
+            if now_ns >= deadline:
+                strategy.emit_units(sink, strategy.frame_units(index), state)
+                burst[3] = index = index + 1
+                burst[4] = max(deadline + self._frame_ns, now_ns)
+            if index < strategy.smooth_frames:
+                remaining.append(burst)
+        self._bursts = remaining
+
+    def reset(self) -> None:
+        self._bursts.clear()
+
+
+__all__ = [
+    "DEFAULT_CHORD_TIMEOUT_MS",
+    "MAX_CHORD_TIMEOUT_MS",
+    "RepeatScheduler",
+    "TimingResolver",
+    "WheelAnimator",
+    "parse_chord_timeout",
+    "parse_chords",
+]
@@ -0,0 +1,63 @@
+import struct
+
+import pytest
+
+from synapse_like.remap.mapper import InputMapper, MappingConfig
+
+
+def pack(event_type, code, value):
+    """One raw `struct input_event` record, as a source device would deliver it."""
+    return struct.pack("llHHi", 1, 2, event_type, code, value)
+
+
+class RecordingSink:
+    """
+    Stand-in for a uinput device (and a SinkPool factory).
+
+    Writes are recorded as (type, code, value) and SYN_REPORTs as ("syn",);
+    `fd` is what raw passthrough writes to, -1 when the test does not read it.
+    """
+
+    def __init__(self, caps=None, name="", bustype=None, *, fd=-1):
+        self.caps = caps
+        self.name = name
+        self.fd = fd
+        self.writes = []
+        self.closed = False
+
+    def write(self, event_type, code, value):
+        self.writes.append((event_type, code, value))
+
+    def syn(self):
+        self.writes.append(("syn",))
+
+    def close(self):
+        self.closed = True
+
+    def events(self):
+        """Recorded writes without the SYN_REPORTs."""
+        return [write for write in self.writes if write != ("syn",)]
+
+
+@pytest.fixture
+def sink():
+    return RecordingSink()
+
+
+@pytest.fixture
+def sink_factory():
+    return RecordingSink
+
+
+@pytest.fixture
+def make_mapper():
+    """Builds an InputMapper on /dev/null whose key and pointer outputs are RecordingSinks."""
+
+    def build(mappings=None, *, fd=-1, **config):
+        mapper = InputMapper(MappingConfig(device_path="/dev/null", mappings=mappings or {}, **config))
+        mapper._sink = RecordingSink(fd=fd)
+        mapper._pointer_sink = RecordingSink()
+        mapper._bind_outputs()
+        return mapper
+
+    return build
@@ -0,0 +1,27 @@
+from evdev import ecodes
+
+from synapse_like.remap.codes import canonical_name, code_name, name_code
+
+
+def test_aliases_resolve_to_one_canonical_name_and_every_spelling_parses():
+    assert code_name(ecodes.KEY_A) == "KEY_A"
+    assert code_name(ecodes.BTN_LEFT) == "BTN_LEFT"
+    assert code_name(ecodes.KEY_MUTE) == "KEY_MUTE"
+    assert code_name(ecodes.BTN_SOUTH) == "BTN_SOUTH"
+    assert code_name(ecodes.REL_WHEEL, ecodes.EV_REL) == "REL_WHEEL"
+    assert code_name(ecodes.MSC_SCAN, ecodes.EV_MSC) == "MSC_SCAN"
+    assert code_name(ecodes.KEY_CNT - 1) == str(ecodes.KEY_CNT - 1)
+
+    assert name_code("BTN_MOUSE") == name_code("BTN_LEFT") == ecodes.BTN_LEFT
+    assert name_code("KEY_MIN_INTERESTING") == ecodes.KEY_MUTE
+    assert name_code("183") == 183
+    assert name_code("KEY_NOPE") is None
+
+    assert canonical_name("BTN_MOUSE") == "BTN_LEFT"
+    assert canonical_name("BTN_GAMEPAD") == "BTN_SOUTH"
+    assert canonical_name("KEY_SCREENLOCK") == "KEY_COFFEE"
+    assert canonical_name("MSC_SCAN:458756") == "MSC_SCAN:458756"
+    for code in range(ecodes.KEY_CNT):
+        name = code_name(code)
+        if not name.isdigit():
+            assert name_code(name) == code
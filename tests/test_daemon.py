@@ -0,0 +1,85 @@
+from synapse_like.daemon import process
+from synapse_like.daemon.process import RemapDaemon
+from synapse_like.remap.profiler import PROFILE_DIR, profile_output_path
+from synapse_like.remap.timing import DEFAULT_CHORD_TIMEOUT_MS
+
+
+class FakeConnection:
+    def __init__(self, requests):
+        self.requests = list(requests)
+        self.responses = []
+
+    def recv(self):
+        if not self.requests:
+            raise EOFError
+        return self.requests.pop(0)
+
+    def send(self, response):
+        self.responses.append(response)
+
+    def close(self):
+        pass
+
+
+class FakeListener:
+    def __init__(self, daemon, connection):
+        self.daemon = daemon
+        self.connection = connection
+
+    def accept(self):
+        if self.connection is None:
+            self.daemon._running = False
+            raise OSError("closed")
+        connection, self.connection = self.connection, None
+        return connection
+
+    def close(self):
+        pass
+
+
+def test_failing_request_is_answered_without_stopping_the_daemon(monkeypatch, tmp_path):
+    monkeypatch.setattr(process, "SOCKET_PATH", tmp_path / "daemon.sock")
+    daemon = RemapDaemon.__new__(RemapDaemon)
+    daemon._running = True
+    applied = []
+
+    def apply_config(template, kernel_filter=True):
+        applied.append(template)
+        raise OSError("device vanished")
+
+    monkeypatch.setattr(daemon, "_apply_config", apply_config)
+    connection = FakeConnection(
+        [
+            {"command": "APPLY", "device": "/dev/null", "chord_timeout_ms": "soon"},
+            {"command": "PING"},
+        ]
+    )
+    daemon._listener = FakeListener(daemon, connection)
+
+    daemon.run()
+
+    assert applied[0].chord_timeout_ms == DEFAULT_CHORD_TIMEOUT_MS
+    assert connection.responses == [
+        {"status": "error", "error": "device vanished"},
+        {"status": "ok", "payload": "pong"},
+    ]
+
+
+def test_raw_passthrough_is_opt_in_per_apply():
+    daemon = RemapDaemon.__new__(RemapDaemon)
+
+    assert not daemon._config_from_payload({"device": "/dev/null"}).raw_passthrough
+    assert daemon._config_from_payload({"device": "/dev/null", "raw_passthrough": True}).raw_passthrough
+
+
+def test_profile_output_outside_the_profile_dir_is_rejected():
+    daemon = RemapDaemon.__new__(RemapDaemon)
+    daemon._mappers = [object()]
+    daemon._profile_session = None
+
+    for output in ("/etc/cron.d/trace", "../trace.folded", "nested/trace.folded", ".."):
+        response = daemon._handle_profile({"mode": "stages", "output": output})
+        assert response["status"] == "error"
+        assert daemon._profile_session is None
+
+    assert profile_output_path("trace.folded") == str(PROFILE_DIR / "trace.folded")
@@ -0,0 +1,22 @@
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "importtime.py"
+
+
+def test_lean_entry_points_defer_heavy_dependencies():
+    entries = ["daemon-client", "profiles", "profile-service"]
+    if importlib.util.find_spec("typer") is not None:
+        entries.insert(0, "cli")
+    # Timing budgets are left to scripts/importtime.py; here only what gets loaded is checked.
+    result = subprocess.run(
+        [sys.executable, str(SCRIPT), "--budget-ms", "100000"] + [arg for entry in entries for arg in ("--entry", entry)],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    statuses = {line.split()[0]: line.split()[-1] for line in result.stdout.splitlines()}
+    assert statuses == {entry: "ok" for entry in entries}, result.stdout
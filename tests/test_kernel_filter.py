@@ -0,0 +1,23 @@
+import os
+
+from evdev import ecodes
+
+from synapse_like.remap.kernel_filter import EVIOCSMASK, apply_event_mask, build_code_bitmap
+
+
+def test_build_code_bitmap_sets_kernel_bit_positions():
+    bitmap = build_code_bitmap([ecodes.KEY_F13, ecodes.BTN_SIDE], ecodes.KEY_CNT)
+
+    assert len(bitmap) == 96
+    assert bitmap[183 >> 3] == 1 << (183 & 7)
+    assert bitmap[ecodes.BTN_SIDE >> 3] & (1 << (ecodes.BTN_SIDE & 7))
+
+
+def test_apply_event_mask_falls_back_on_non_evdev_fd():
+    read_fd, write_fd = os.pipe()
+    try:
+        assert apply_event_mask(read_fd, [183]) is False
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+    assert EVIOCSMASK == 0x40104593
@@ -0,0 +1,41 @@
+import time
+
+from synapse_like.remap.actions import Action
+from synapse_like.remap.launcher import SpawnHelper, build_argv
+
+
+def test_commands_skip_the_shell_unless_they_need_it():
+    assert build_argv("flatpak run 'org.gimp.GIMP'", shell=False) == ("flatpak", "run", "org.gimp.GIMP")
+    assert build_argv("echo hi | wc -c", shell=True) == ("/bin/sh", "-c", "echo hi | wc -c")
+
+    plain = Action.from_dict({"type": "launch_app", "payload": {"command": "firefox --new-window"}})
+    legacy_pipe = Action.from_dict({"type": "launch_app", "payload": {"command": "ls | head"}})
+    assert plain.strategy.shell is False
+    assert legacy_pipe.strategy.shell is True
+    assert Action.from_dict(plain.to_dict()).strategy.command == "firefox --new-window"
+
+
+def test_spawn_helper_deduplicates_rapid_repeats():
+    now = [10.0]
+    spawned = []
+    helper = SpawnHelper(dedup_window=0.5, clock=lambda: now[0], spawn=lambda argv: spawned.append(argv) or 4242)
+
+    assert helper.handle(["firefox"]) == 4242
+    now[0] += 0.1
+    assert helper.handle(["firefox"]) is None
+    assert helper.handle(["gimp"]) == 4242
+    now[0] += 1.0
+    assert helper.handle(["firefox"]) == 4242
+    assert spawned == [("firefox",), ("gimp",), ("firefox",)]
+
+
+def test_spawn_helper_reaps_finished_children():
+    helper = SpawnHelper(dedup_window=0.0)
+
+    pid = helper.handle(["true"])
+    assert pid in helper.children
+    deadline = time.monotonic() + 5.0
+    while helper.children and time.monotonic() < deadline:
+        time.sleep(0.01)
+        helper.reap()
+    assert helper.children == set()
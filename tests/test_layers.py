@@ -0,0 +1,78 @@
+from evdev import ecodes
+
+from synapse_like.remap.actions import Action, ActionType
+from synapse_like.remap.mapper import MappingConfig
+
+
+def build_mapper(make_mapper, mode):
+    return make_mapper(
+        {
+            "KEY_CAPSLOCK": Action(ActionType.LAYER, {"layer": "hyper", "mode": mode}),
+            "KEY_J": Action(ActionType.KEYSTROKE, {"key": "KEY_J"}),
+        },
+        layers={"hyper": {"KEY_J": Action(ActionType.KEYSTROKE, {"key": "KEY_DOWN"})}},
+    )
+
+
+def tap(mapper, code):
+    mapper._handle_key_event(code, 1, None)
+    mapper._handle_key_event(code, 0, None)
+
+
+def test_momentary_layer_applies_while_held_and_release_follows_press_layer(make_mapper):
+    mapper = build_mapper(make_mapper, "momentary")
+
+    mapper._handle_key_event(ecodes.KEY_CAPSLOCK, 1, None)
+    mapper._handle_key_event(ecodes.KEY_J, 1, None)
+    assert mapper.active_layers == ["base", "hyper"]
+    mapper._handle_key_event(ecodes.KEY_CAPSLOCK, 0, None)
+    mapper._handle_key_event(ecodes.KEY_J, 0, None)
+
+    assert mapper.active_layers == ["base"]
+    assert mapper._sink.events() == [
+        (ecodes.EV_KEY, ecodes.KEY_DOWN, 1),
+        (ecodes.EV_KEY, ecodes.KEY_DOWN, 0),
+    ]
+
+
+def test_toggle_and_oneshot_layers(make_mapper):
+    mapper = build_mapper(make_mapper, "toggle")
+    tap(mapper, ecodes.KEY_CAPSLOCK)
+    tap(mapper, ecodes.KEY_J)
+    tap(mapper, ecodes.KEY_J)
+    tap(mapper, ecodes.KEY_CAPSLOCK)
+    tap(mapper, ecodes.KEY_J)
+    keys = [code for _, code, value in mapper._sink.events() if value == 1]
+    assert keys == [ecodes.KEY_DOWN, ecodes.KEY_DOWN, ecodes.KEY_J]
+
+    mapper = build_mapper(make_mapper, "oneshot")
+    tap(mapper, ecodes.KEY_CAPSLOCK)
+    tap(mapper, ecodes.KEY_J)
+    tap(mapper, ecodes.KEY_J)
+    keys = [code for _, code, value in mapper._sink.events() if value == 1]
+    assert keys == [ecodes.KEY_DOWN, ecodes.KEY_J]
+    assert mapper.active_layers == ["base"]
+
+
+def test_layers_roundtrip_through_config_dict(make_mapper):
+    config = build_mapper(make_mapper, "toggle").config
+    restored = MappingConfig.from_dict(config.to_dict())
+
+    assert restored.layers["hyper"]["KEY_J"].strategy.key == "KEY_DOWN"
+    assert restored.mappings["KEY_CAPSLOCK"].strategy.mode == "toggle"
+
+
+def test_alias_groups_expand_into_every_layer(make_mapper):
+    scroll = Action(ActionType.SCROLL_UP)
+    down = Action(ActionType.KEYSTROKE, {"key": "KEY_DOWN"})
+    mapper = make_mapper(
+        {"KEY_MACRO1": scroll, "KEY_F13": Action(ActionType.NONE)},
+        layers={"hyper": {"KEY_F20": down}},
+        aliases=[["KEY_MACRO1", "KEY_PROG1", "KEY_F13"], ["KEY_F20", "194"]],
+    )
+    engine = mapper._layers
+
+    assert engine.codes[ecodes.KEY_PROG1] is scroll
+    assert engine.codes[ecodes.KEY_F13].type == ActionType.NONE
+    assert engine._layers["hyper"].codes[ecodes.KEY_F24] is down
+    assert mapper.config.mappings.keys() == {"KEY_MACRO1", "KEY_F13"}
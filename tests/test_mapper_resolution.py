@@ -1,3 +1,5 @@
+from evdev import ecodes
+
 from synapse_like.remap.actions import Action, ActionType
 from synapse_like.remap.mapper import InputMapper, MappingConfig
 
@@ -24,3 +26,22 @@ def test_resolve_mapping_by_scan_code():
     result = mapper._resolve_mapping("KEY_F13", 183, 70068)
     assert result is not None
     assert result.type == ActionType.SCROLL_UP
+
+
+def test_active_key_snapshots_track_presses_and_generation():
+    mapper = InputMapper(MappingConfig(device_path="/dev/null"))
+    generation = mapper.state_generation
+
+    mapper._update_active_keys(ecodes.KEY_A, 1)
+    mapper._update_active_keys(ecodes.KEY_A, 2)
+    mapper._update_active_keys(ecodes.KEY_LEFTCTRL, 1)
+    assert mapper.active_codes() == [ecodes.KEY_LEFTCTRL, ecodes.KEY_A]
+    assert mapper.state_generation == generation + 2
+
+    published = mapper.key_snapshot
+    mapper._update_active_keys(ecodes.KEY_A, 0)
+    mapper._update_active_keys(ecodes.KEY_A, 0)
+    assert mapper.active_keys == {"KEY_LEFTCTRL"}
+    assert mapper.state_generation == generation + 3
+    # Readers holding an older snapshot keep a consistent view.
+    assert published.held == (1 << ecodes.KEY_A) | (1 << ecodes.KEY_LEFTCTRL)
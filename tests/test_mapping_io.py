@@ -1,12 +1,52 @@
-from synapse_like.gui.mapping_io import normalize_loaded_mappings
+import json
+from pathlib import Path
+
+from synapse_like.gui.constants import KEY_ALIASES
+from synapse_like.gui.mapping_io import alias_groups, canonical_keys, load_mapping_file, save_mapping_file
 from synapse_like.remap.actions import Action, ActionType
 
 
-def test_normalize_loaded_mappings_expands_alias_group():
-    action = Action(ActionType.SCROLL_UP)
-    mappings = {"KEY_F13": action}
-    normalized = normalize_loaded_mappings(mappings, dynamic_aliases={})
+def test_loaded_profile_keeps_one_entry_per_alias_group():
+    mappings = load_mapping_file(str(Path(__file__).parent.parent / "mapping.json"))[1]
+
+    assert sorted(mappings) == [
+        "KEY_MACRO1", "KEY_MACRO2",
+        "MSC_SCAN:458856", "MSC_SCAN:458857", "MSC_SCAN:70068", "MSC_SCAN:70069",
+    ]
+    assert mappings["KEY_MACRO1"].type == ActionType.SCROLL_UP
+
+
+def test_alias_groups_follow_builtin_groups_before_dynamic_ones():
+    action = Action(ActionType.SCROLL_DOWN)
+    dynamic = {"M1": ["KEY_F13", "999"], "G1": ["KEY_F20", "194"]}
+    groups = alias_groups({"KEY_F13": action, "194": action, "KEY_A": action}, dynamic)
+
+    assert groups == [canonical_keys(KEY_ALIASES["M1"]), ["KEY_F20", "KEY_F24"]]
+
+
+def test_version_2_profile_migrates_to_canonical_compact_version_3(tmp_path):
+    path = tmp_path / "profile.json"
+    scroll = {"type": "scroll_up", "payload": {}}
+    path.write_text(
+        json.dumps(
+            {
+                "version": 2,
+                "mappings": {
+                    "KEY_MACRO1": scroll,
+                    "KEY_F13": scroll,
+                    "183": scroll,
+                    "MSC_SCAN:70068": scroll,
+                    "MSC_SCAN_HEX:70068": scroll,
+                },
+                "dynamic_aliases": {"M1": ["KEY_F13", "183", "KEY_MACRO1"]},
+            }
+        )
+    )
+    device_path, mappings, aliases, key_id_map, linked_apps, _ = load_mapping_file(str(path))
+    assert list(mappings) == ["KEY_MACRO1", "MSC_SCAN:70068", "MSC_SCAN:%d" % 0x70068]
 
-    assert normalized["KEY_F13"].type == ActionType.SCROLL_UP
-    assert normalized["KEY_MACRO1"].type == ActionType.SCROLL_UP
-    assert normalized["183"].type == ActionType.SCROLL_UP
+    save_mapping_file(str(path), device_path, mappings, aliases, key_id_map, linked_apps)
+    saved = json.loads(path.read_text())
+    assert saved["version"] == 3
+    assert list(saved["mappings"]) == ["KEY_MACRO1", "MSC_SCAN:70068", "MSC_SCAN:%d" % 0x70068]
+    assert load_mapping_file(str(path))[1].keys() == mappings.keys()
@@ -0,0 +1,37 @@
+from synapse_like.remap.actions import Action, ActionType
+from synapse_like.remap.metrics import MapperMetrics, render_prometheus
+
+
+def test_observe_loop_tracks_histogram_and_max():
+    metrics = MapperMetrics()
+    metrics.observe_loop(10_000)
+    metrics.observe_loop(400_000)
+
+    snapshot = metrics.snapshot()
+
+    assert snapshot["max_loop_us"] == 400.0
+    assert sum(snapshot["latency"]["counts"]) == 2
+    assert snapshot["latency"]["counts"][0] == 1
+
+
+def test_action_writes_are_counted_through_metered_sink(make_mapper):
+    mapper = make_mapper({"183": Action(ActionType.SCROLL_UP)})
+
+    mapper._handle_action(mapper._resolve_mapping("KEY_F13", 183, None), 1)
+
+    assert mapper.metrics.events_out == 2
+    assert mapper._pointer_sink.writes[-1] == ("syn",)
+
+
+def test_render_prometheus_emits_cumulative_buckets():
+    metrics = MapperMetrics()
+    metrics.record_hit(183)
+    metrics.observe_loop(30_000)
+    snapshot = metrics.snapshot()
+    snapshot["device_path"] = "/dev/input/event3"
+
+    text = render_prometheus([snapshot], code_name=lambda code: "KEY_F13")
+
+    assert 'synapse_like_mapping_hits_total{device="/dev/input/event3",key="KEY_F13"} 1' in text
+    assert 'synapse_like_loop_latency_seconds_bucket{device="/dev/input/event3",le="+Inf"} 1' in text
+    assert 'synapse_like_loop_latency_seconds_bucket{device="/dev/input/event3",le="5e-05"} 1' in text
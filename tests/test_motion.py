@@ -0,0 +1,66 @@
+import os
+import struct
+
+from conftest import pack
+from evdev import ecodes
+
+from synapse_like.remap.mapper import EVENT_SIZE
+from synapse_like.remap.motion import MotionPipeline, MotionSettings
+
+
+def test_fractional_sensitivity_carries_sub_pixel_remainder():
+    pipeline = MotionPipeline.from_settings(MotionSettings(sensitivity=0.5))
+
+    pipeline.transform(1, -1)
+    assert (pipeline.out_x, pipeline.out_y) == (0, -1)
+    pipeline.transform(1, -1)
+    assert (pipeline.out_x, pipeline.out_y) == (1, 0)
+
+
+def test_swap_and_invert_axes_and_identity_is_skipped():
+    assert MotionPipeline.from_settings(MotionSettings()) is None
+
+    pipeline = MotionPipeline.from_settings(MotionSettings(swap_axes=True, invert_x=True))
+    pipeline.transform(3, 7)
+    assert (pipeline.out_x, pipeline.out_y) == (-7, 3)
+
+
+def test_curve_gain_is_interpolated_between_points():
+    settings = MotionSettings.from_dict({"curve": [[0, 1.0], [10, 2.0]], "sensitivity": "bad"})
+
+    assert settings.sensitivity == 1.0
+    assert settings.gain_at(5) == 1.5
+    assert settings.gain_at(50) == 2.0
+
+
+def test_non_finite_values_fall_back_to_neutral_settings():
+    for sensitivity in ("inf", "nan", float("-inf"), -2, 0):
+        assert MotionSettings.from_dict({"sensitivity": sensitivity}).sensitivity == 1.0
+
+    settings = MotionSettings.from_dict({"curve": [[0, "inf"], ["nan", 2.0], [4, 1.5]]})
+    assert settings.curve == [(4.0, 1.5)]
+
+
+def test_raw_batch_rewrites_pointer_motion_before_syn_report(make_mapper):
+    read_fd, write_fd = os.pipe()
+    mapper = make_mapper(fd=write_fd, motion=MotionSettings(sensitivity=2.0))
+    button = pack(ecodes.EV_KEY, ecodes.BTN_LEFT, 1)
+    batch = bytearray(
+        pack(ecodes.EV_REL, ecodes.REL_X, 3)
+        + button
+        + pack(ecodes.EV_REL, ecodes.REL_Y, -2)
+        + pack(ecodes.EV_SYN, ecodes.SYN_REPORT, 0)
+    )
+
+    mapper._process_raw(memoryview(batch), len(batch))
+    os.close(write_fd)
+    forwarded = os.read(read_fd, 4096)
+    os.close(read_fd)
+
+    records = [struct.unpack("llHHi", forwarded[i:i + EVENT_SIZE])[2:] for i in range(0, len(forwarded), EVENT_SIZE)]
+    assert records == [
+        (ecodes.EV_KEY, ecodes.BTN_LEFT, 1),
+        (ecodes.EV_REL, ecodes.REL_X, 6),
+        (ecodes.EV_REL, ecodes.REL_Y, -4),
+        (ecodes.EV_SYN, ecodes.SYN_REPORT, 0),
+    ]
@@ -0,0 +1,71 @@
+from evdev import ecodes
+
+from synapse_like.remap.actions import Action, ActionType
+from synapse_like.remap.layers import compile_layer
+from synapse_like.remap.macros import play_program
+from synapse_like.remap.native import ACTION_BUTTON, ACTION_CLICK, ACTION_NUDGE, compile_native_table, pack_nudge
+
+
+def test_single_click_follows_key_and_double_click_is_a_timed_program(sink_factory):
+    sink = sink_factory()
+    single = Action(ActionType.MOUSE_CLICK, {"button": "BTN_RIGHT"})
+    for value in (1, 2, 0):
+        single.strategy.execute(sink, value, {})
+    assert sink.events() == [(ecodes.EV_KEY, ecodes.BTN_RIGHT, 1), (ecodes.EV_KEY, ecodes.BTN_RIGHT, 0)]
+
+    double = Action(ActionType.MOUSE_CLICK, {"button": "BTN_LEFT", "clicks": 2, "interval_ms": 40})
+    delays = []
+    sink = sink_factory()
+    play_program(sink, double.strategy._program, sleep=delays.append)
+    assert [value for _, _, value in sink.events()] == [1, 0, 1, 0]
+    assert delays == [0.04]
+
+
+def test_drag_lock_toggles_and_nudge_moves_on_press_and_repeat(sink_factory):
+    sink = sink_factory()
+    drag = Action(ActionType.DRAG_LOCK, {"button": "BTN_LEFT"})
+    state = {}
+    for value in (1, 0, 1, 0):
+        drag.strategy.execute(sink, value, state)
+    assert sink.events() == [(ecodes.EV_KEY, ecodes.BTN_LEFT, 1), (ecodes.EV_KEY, ecodes.BTN_LEFT, 0)]
+
+    sink = sink_factory()
+    nudge = Action(ActionType.MOUSE_NUDGE, {"dx": -5, "dy": 0})
+    for value in (1, 2, 0):
+        nudge.strategy.execute(sink, value, {})
+    assert sink.events() == [(ecodes.EV_REL, ecodes.REL_X, -5), (ecodes.EV_REL, ecodes.REL_X, -5)]
+
+
+def test_drag_lock_latch_belongs_to_each_mapper(make_mapper):
+    drag = Action(ActionType.DRAG_LOCK, {"button": "BTN_LEFT"})
+    first = make_mapper({"KEY_F1": drag})
+    second = make_mapper({"KEY_F1": drag})
+
+    first._handle_action(drag, 1)
+    second._handle_action(drag, 1)
+    assert first._pointer_sink.events() == [(ecodes.EV_KEY, ecodes.BTN_LEFT, 1)]
+    assert second._pointer_sink.events() == [(ecodes.EV_KEY, ecodes.BTN_LEFT, 1)]
+
+    first.stop()
+    assert first._action_state == {}
+
+
+def test_native_table_covers_pointer_actions_and_rejects_python_only_ones():
+    layer = compile_layer(
+        "base",
+        {
+            "KEY_F1": Action(ActionType.MOUSE_CLICK, {"button": "BTN_MIDDLE"}),
+            "KEY_F2": Action(ActionType.MOUSE_CLICK, {"clicks": 2, "interval_ms": 0}),
+            "KEY_F3": Action(ActionType.MOUSE_NUDGE, {"dx": 3, "dy": -4}),
+        },
+    )
+    table = compile_native_table(layer.codes, layer.scans)
+
+    assert table[ecodes.KEY_F1] == (ACTION_BUTTON, ecodes.BTN_MIDDLE, 0)
+    assert table[ecodes.KEY_F2] == (ACTION_CLICK, ecodes.BTN_LEFT, 2)
+    assert table[ecodes.KEY_F3] == (ACTION_NUDGE, 0, pack_nudge(3, -4))
+    argument = table[ecodes.KEY_F3][2]
+    assert ((argument >> 16), ((argument & 0xFFFF) ^ 0x8000) - 0x8000) == (3, -4)
+
+    layer.codes[ecodes.KEY_F4] = Action(ActionType.TEXT, {"text": "oi"})
+    assert compile_native_table(layer.codes) is None
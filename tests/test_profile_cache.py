@@ -0,0 +1,48 @@
+from synapse_like.gui import mapping_io
+from synapse_like.gui.profile_cache import cache_path, load_profile_cache
+from synapse_like.gui.profile_service import ProfileService
+from synapse_like.remap.actions import Action, ActionType
+
+
+def _save(service):
+    path = service.save_named_profile(
+        name="Work",
+        device_path="/dev/input/event3",
+        mappings={"KEY_F13": Action(ActionType.SCROLL_UP), "KEY_A": Action(ActionType.KEYSTROKE, {"key": "KEY_B"})},
+        dynamic_aliases={},
+        key_id_map={},
+        linked_apps=["code"],
+    )
+    service.flush()
+    return path
+
+
+def test_saved_profile_loads_from_sidecar_without_parsing_json(tmp_path, monkeypatch):
+    service = ProfileService(profile_dir=tmp_path)
+    path = _save(service)
+    assert cache_path(path).exists()
+
+    compiled = load_profile_cache(path)
+    assert compiled.mappings["KEY_A"].strategy.key == "KEY_B"
+    assert compiled.mappings.keys() == {"KEY_F13", "KEY_A"}
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("JSON parsed")
+
+    monkeypatch.setattr(mapping_io.json, "load", fail)
+    device_path, mappings, _, _, linked_apps, _ = service.load_named_profile("Work")
+    assert (device_path, linked_apps) == ("/dev/input/event3", ["code"])
+    assert mappings["KEY_F13"].type == ActionType.SCROLL_UP
+
+
+def test_edited_json_invalidates_the_sidecar(tmp_path):
+    service = ProfileService(profile_dir=tmp_path)
+    path = _save(service)
+    path.write_text(path.read_text().replace("/dev/input/event3", "/dev/input/event9"))
+
+    assert load_profile_cache(path) is None
+    assert service.load_named_profile("Work")[0] == "/dev/input/event9"
+    assert load_profile_cache(path).device_path == "/dev/input/event9"
+
+    assert service.delete_profile("Work")
+    assert not cache_path(path).exists()
@@ -1,5 +1,9 @@
+import json
+
+from synapse_like.gui.mapping_io import RemapOptions
 from synapse_like.gui.profile_service import ProfileService
 from synapse_like.remap.actions import Action, ActionType
+from synapse_like.remap.motion import MotionSettings
 
 
 def test_find_profile_for_window_class_matches_saved_profile(tmp_path):
@@ -17,3 +21,47 @@ def test_find_profile_for_window_class_matches_saved_profile(tmp_path):
 
     assert profile is not None
     assert profile.name == "Gaming"
+
+
+def test_motion_settings_round_trip_through_saved_profile(tmp_path):
+    service = ProfileService(profile_dir=tmp_path)
+    motion = MotionSettings(sensitivity=1.5, curve=[(0.0, 1.0), (20.0, 2.0)], invert_y=True)
+    path = service.save_named_profile(
+        name="Aim",
+        device_path="/dev/input/event0",
+        mappings={},
+        dynamic_aliases={},
+        key_id_map={},
+        options=RemapOptions(motion=motion),
+    )
+
+    assert service.load_named_profile("Aim")[5].motion == motion
+    service.flush()
+    assert json.loads(path.read_text())["motion"]["sensitivity"] == 1.5
+    assert service.load_named_profile("Aim")[5].motion == motion
+    assert ProfileService(profile_dir=tmp_path).load_named_profile("Aim")[5].motion == motion
+
+
+def test_layers_chords_and_shared_output_round_trip_through_saved_profile(tmp_path):
+    service = ProfileService(profile_dir=tmp_path)
+    options = RemapOptions(
+        layers={"hyper": {"KEY_J": Action(ActionType.KEYSTROKE, {"key": "KEY_DOWN"})}},
+        chords={"KEY_J+KEY_K": Action(ActionType.KEYSTROKE, {"key": "KEY_ESC"})},
+        chord_timeout_ms=80,
+        shared_output=True,
+    )
+    service.save_named_profile(
+        name="Vim",
+        device_path="/dev/input/event0",
+        mappings={"KEY_CAPSLOCK": Action(ActionType.LAYER, {"layer": "hyper", "mode": "momentary"})},
+        dynamic_aliases={},
+        key_id_map={},
+        options=options,
+    )
+    service.flush()
+
+    loaded = ProfileService(profile_dir=tmp_path).load_named_profile("Vim")[5]
+    assert loaded.layers["hyper"]["KEY_J"].strategy.key == "KEY_DOWN"
+    assert loaded.chords["KEY_J+KEY_K"].strategy.key == "KEY_ESC"
+    assert loaded.chord_timeout_ms == 80
+    assert loaded.shared_output
@@ -0,0 +1,71 @@
+import json
+
+from synapse_like.core import profiles
+from synapse_like.core.models import Profile
+from synapse_like.core.profile_store import REMAP_SECTION_DEFAULTS, ProfileStore
+from synapse_like.gui.mapping_io import RemapOptions
+from synapse_like.gui.profile_service import ProfileService
+from synapse_like.remap.actions import Action, ActionType
+
+
+def test_hardware_and_remap_sections_share_one_profile_document(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiles, "PROFILES_DIR", tmp_path)
+    (tmp_path / "Legacy.json").write_text(
+        json.dumps({"schema_version": 1, "name": "Legacy", "targets": ["kbd"], "settings": {"kbd": {"dpi": 800}}})
+    )
+    assert profiles.load_profile("Legacy").settings == {"kbd": {"dpi": 800}}
+
+    service = ProfileService(profile_dir=tmp_path)
+    service.save_named_profile(
+        name="Legacy",
+        device_path="/dev/input/event2",
+        mappings={"KEY_F13": Action(ActionType.SCROLL_UP)},
+        dynamic_aliases={},
+        key_id_map={},
+        linked_apps=["blender"],
+    )
+    service.flush()
+    profiles.save_profile(Profile(schema_version=1, name="Legacy", targets=["kbd"], settings={"kbd": {"dpi": 1600}}))
+
+    document = json.loads((tmp_path / "Legacy.json").read_text())
+    assert document["version"] == 3
+    assert document["hardware"]["settings"] == {"kbd": {"dpi": 1600}}
+    assert service.load_named_profile("Legacy")[1]["KEY_F13"].type == ActionType.SCROLL_UP
+    assert service.find_profile_for_window_class("Blender").name == "Legacy"
+    assert profiles.list_profiles() == ["Legacy"]
+
+
+def test_index_picks_up_in_place_edits_and_fills_missing_remap_sections(tmp_path):
+    store = ProfileStore(tmp_path)
+    path = tmp_path / "Work.json"
+    path.write_text(json.dumps({"version": 3, "device_path": "/dev/input/event1", "mappings": {}, "linked_apps": []}))
+    assert [entry.linked_apps for entry in store.entries()] == [[]]
+
+    # Same directory entry, new content: the directory mtime does not change.
+    path.write_text(json.dumps({"version": 3, "device_path": "/dev/input/event1", "linked_apps": ["krita"]}))
+    assert [entry.linked_apps for entry in store.entries()] == [["krita"]]
+
+    document = store.read_document("Work")
+    assert {key: document[key] for key in REMAP_SECTION_DEFAULTS} == REMAP_SECTION_DEFAULTS
+    assert RemapOptions.from_document(document) == RemapOptions()
+
+
+def test_hardware_save_keeps_a_queued_remap_save(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiles, "PROFILES_DIR", tmp_path)
+    service = ProfileService(profile_dir=tmp_path)
+    assert service.store is profiles._store()
+
+    service.save_named_profile(
+        name="Work",
+        device_path="/dev/input/event2",
+        mappings={"KEY_F13": Action(ActionType.SCROLL_UP)},
+        dynamic_aliases={},
+        key_id_map={},
+        linked_apps=[],
+    )
+    profiles.save_profile(Profile(schema_version=1, name="Work", targets=["kbd"], settings={"kbd": {"dpi": 800}}))
+    service.flush()
+
+    document = json.loads((tmp_path / "Work.json").read_text())
+    assert document["hardware"]["settings"] == {"kbd": {"dpi": 800}}
+    assert list(document["mappings"]) == ["KEY_F13"]
@@ -0,0 +1,56 @@
+import threading
+import time
+
+from synapse_like.remap.profiler import STAGE_EXECUTE, STAGE_READ, ProfileSession, SamplingProfiler, StageTracer
+
+
+class FakeMapper:
+    device_path = "/dev/input/event7"
+    thread_id = None
+
+    def __init__(self):
+        self.tracer = None
+
+    def set_tracer(self, tracer):
+        self.tracer = tracer
+
+
+def test_stage_tracer_folds_stages_in_microseconds():
+    tracer = StageTracer()
+    tracer.add(STAGE_READ, 5_000)
+    tracer.add(STAGE_EXECUTE, 2_500)
+    tracer.add(STAGE_EXECUTE, -1)
+
+    assert tracer.folded("kbd") == ["synapse-like;kbd;read 5", "synapse-like;kbd;execute 2"]
+
+
+def test_profile_session_detaches_tracer_and_writes_output(tmp_path):
+    mapper = FakeMapper()
+    output = tmp_path / "profile.folded"
+    session = ProfileSession([mapper], mode="stages", duration=30, output_path=str(output))
+
+    session.start()
+    mapper.tracer.add(STAGE_READ, 3_000)
+    session.finish()
+
+    assert mapper.tracer is None
+    assert output.read_text() == "synapse-like;/dev/input/event7;read 3\n"
+
+
+def test_sampling_profiler_records_target_thread_stack():
+    stop = threading.Event()
+
+    def busy_worker():
+        while not stop.is_set():
+            time.sleep(0.001)
+
+    worker = threading.Thread(target=busy_worker, daemon=True)
+    worker.start()
+    profiler = SamplingProfiler({worker.ident: "mouse"})
+    profiler.sample_once()
+    stop.set()
+    worker.join()
+
+    (line,) = profiler.folded()
+    assert line.startswith("synapse-like;mouse;")
+    assert "busy_worker (test_profiler.py:" in line
@@ -0,0 +1,41 @@
+import os
+
+from conftest import pack
+from evdev import ecodes
+
+from synapse_like.remap.actions import Action, ActionType
+from synapse_like.remap.mapper import EVENT_SIZE
+
+
+def test_raw_batch_forwards_unmapped_events_byte_for_byte(make_mapper):
+    read_fd, write_fd = os.pipe()
+    mapper = make_mapper({"183": Action(ActionType.SCROLL_UP)}, fd=write_fd, raw_passthrough=True)
+    motion = pack(ecodes.EV_REL, ecodes.REL_X, 5) + pack(ecodes.EV_REL, ecodes.REL_Y, -3)
+    syn = pack(ecodes.EV_SYN, ecodes.SYN_REPORT, 0)
+    mapped_key = pack(ecodes.EV_KEY, 183, 1)
+    batch = bytearray(motion + syn + mapped_key + syn)
+
+    mapper._process_raw(memoryview(batch), len(batch))
+    os.close(write_fd)
+    forwarded = os.read(read_fd, 4096)
+    os.close(read_fd)
+
+    assert forwarded == motion + syn + syn
+    assert mapper._pointer_sink.writes == [(ecodes.EV_REL, ecodes.REL_WHEEL, 1), ("syn",)]
+    assert mapper.metrics.events_in == 5
+    assert mapper.metrics.passthrough == 4
+
+
+def test_raw_batch_uses_scan_code_across_batches(make_mapper):
+    read_fd, write_fd = os.pipe()
+    mapper = make_mapper({"MSC_SCAN:70068": Action(ActionType.SCROLL_DOWN)}, fd=write_fd, raw_passthrough=True)
+    first = bytearray(pack(ecodes.EV_MSC, ecodes.MSC_SCAN, 70068))
+    second = bytearray(pack(ecodes.EV_KEY, ecodes.KEY_F13, 1) + pack(ecodes.EV_SYN, ecodes.SYN_REPORT, 0))
+
+    mapper._process_raw(memoryview(first), EVENT_SIZE)
+    mapper._process_raw(memoryview(second), len(second))
+    os.close(write_fd)
+    os.close(read_fd)
+
+    assert mapper._pointer_sink.writes[0] == (ecodes.EV_REL, ecodes.REL_WHEEL, -1)
+    assert mapper._pending_scan is None
@@ -0,0 +1,78 @@
+from evdev import ecodes
+
+from synapse_like.remap.actions import Action, ActionType, RepeatPolicy
+from synapse_like.remap.timing import RepeatScheduler
+
+
+def test_keystroke_forwards_repeats_and_suppress_policy_drops_them(make_mapper):
+    mapper = make_mapper(
+        {
+            "KEY_A": Action(ActionType.KEYSTROKE, {"key": "KEY_B"}),
+            "KEY_C": Action(ActionType.KEYSTROKE, {"key": "KEY_D"}, repeat=RepeatPolicy("suppress")),
+        }
+    )
+
+    for code in (ecodes.KEY_A, ecodes.KEY_C):
+        assert mapper._handle_key_event(code, 2, None)
+
+    assert mapper._sink.events() == [(ecodes.EV_KEY, ecodes.KEY_B, 2)]
+
+
+def test_synthesized_repeat_scrolls_at_configured_rate_until_release(make_mapper):
+    policy = RepeatPolicy("synthesize", delay_ms=100, rate_hz=100)
+    action = Action(ActionType.SCROLL_UP, repeat=policy)
+    emitted = []
+    scheduler = RepeatScheduler(lambda action, value: emitted.append(value))
+
+    scheduler.start(ecodes.KEY_F13, action, 0)
+    scheduler.expire(99_000_000)
+    assert emitted == []
+    scheduler.expire(100_000_000)
+    scheduler.expire(110_000_000)
+    assert emitted == [2, 2]
+    scheduler.expire(500_000_000)
+    assert scheduler.next_deadline() == 510_000_000
+    scheduler.stop(ecodes.KEY_F13)
+    assert scheduler.next_deadline() is None
+
+    mapper = make_mapper({"KEY_F13": action})
+    mapper._handle_key_event(ecodes.KEY_F13, 1, None)
+    assert mapper._handle_key_event(ecodes.KEY_F13, 2, None)
+    assert mapper._repeater.next_deadline() is not None
+    mapper._handle_key_event(ecodes.KEY_F13, 0, None)
+    assert mapper._repeater.next_deadline() is None
+    assert mapper._pointer_sink.events() == [(ecodes.EV_REL, ecodes.REL_WHEEL, 1)]
+
+
+def test_repeat_policy_roundtrip_is_optional_in_action_dict():
+    plain = Action(ActionType.SCROLL_DOWN)
+    assert "repeat" not in plain.to_dict()
+
+    action = Action.from_dict({"type": "scroll_down", "repeat": {"mode": "synthesize", "rate_hz": 5000}})
+    assert action.repeat_policy.mode == "synthesize"
+    assert action.repeat_policy.rate_hz == 1000.0
+
+
+def test_turbo_cycles_press_release_at_rate_and_ends_released(make_mapper):
+    action = Action(ActionType.KEYSTROKE, {"key": "KEY_SPACE"}, repeat=RepeatPolicy("turbo", rate_hz=20))
+    emitted = []
+    scheduler = RepeatScheduler(lambda action, value: emitted.append(value))
+
+    scheduler.start(ecodes.KEY_F14, action, 0)
+    for now in range(0, 200_000_001, 1_000_000):
+        scheduler.expire(now)
+    # 20 Hz: a release/press edge every 25 ms after the initial press.
+    assert emitted == [0, 1] * 4
+    assert scheduler.next_deadline() == 225_000_000
+    assert scheduler.stop(ecodes.KEY_F14)
+
+    mapper = make_mapper({"KEY_F14": action})
+    mapper._handle_key_event(ecodes.KEY_F14, 1, None)
+    mapper._repeater.expire(mapper._repeater.next_deadline())
+    mapper._handle_key_event(ecodes.KEY_F14, 0, None)
+    assert [value for _, _, value in mapper._sink.events()] == [1, 0]
+
+
+def test_turbo_is_ignored_by_actions_without_press_release_semantics():
+    action = Action(ActionType.MACRO, repeat=RepeatPolicy("turbo"))
+    assert action.repeat_policy.mode == "suppress"
@@ -0,0 +1,39 @@
+from evdev import ecodes
+
+from synapse_like.remap.actions import Action, ActionType
+from synapse_like.remap.mapper import InputMapper, MappingConfig
+from synapse_like.remap.sinks import SHARED_SOURCE, SinkPool
+
+
+def shared_mapper(pool, path):
+    mapper = InputMapper(
+        MappingConfig(
+            device_path=path,
+            mappings={"KEY_F1": Action(ActionType.KEYSTROKE, {"key": "KEY_LEFTSHIFT"})},
+            shared_output=True,
+        ),
+        sink_pool=pool,
+    )
+    mapper._sink = mapper._open_sink("keys", {ecodes.EV_KEY: [ecodes.KEY_A, ecodes.KEY_LEFTSHIFT]})
+    mapper._bind_outputs()
+    return mapper
+
+
+def test_interfaces_share_one_keyboard_and_modifier_state(sink_factory):
+    pool = SinkPool(factory=sink_factory)
+    first = shared_mapper(pool, "/dev/input/event3")
+    second = shared_mapper(pool, "/dev/input/event4")
+    sink = first._sink
+    assert second._sink is sink and sink.name == "synapse-like keyboard"
+
+    # Shift held via a mapping on one interface and physically on the other.
+    first._handle_key_event(ecodes.KEY_F1, 1, None)
+    assert second._handle_key_event(ecodes.KEY_LEFTSHIFT, 1, None)
+    # Releasing the physical copy must not release the mapped one.
+    assert second._handle_key_event(ecodes.KEY_LEFTSHIFT, 0, None)
+    assert sink.events() == [(ecodes.EV_KEY, ecodes.KEY_LEFTSHIFT, 1)]
+
+    assert not second._handle_key_event(ecodes.KEY_A, 1, None)
+    first.stop()
+    assert sink.events()[-1] == (ecodes.EV_KEY, ecodes.KEY_LEFTSHIFT, 0)
+    assert pool.stats()["pooled"] == 1 and (SHARED_SOURCE, "keys") in pool._sinks
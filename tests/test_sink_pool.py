@@ -0,0 +1,99 @@
+import threading
+
+from evdev import ecodes
+
+from synapse_like.remap.metrics import MapperMetrics
+from synapse_like.remap.sinks import MeteredSink, SinkPool
+
+
+def test_released_sink_is_reused_until_capabilities_grow(sink_factory):
+    pool = SinkPool(factory=sink_factory)
+    caps = {ecodes.EV_KEY: [ecodes.KEY_A, ecodes.KEY_B]}
+
+    first = pool.acquire("/dev/input/event3", "keys", caps, "kbd", 3)
+    pool.release(first)
+    assert not first.closed
+    assert (ecodes.EV_KEY, ecodes.KEY_A, 0) in first.writes
+
+    smaller = pool.acquire("/dev/input/event3", "keys", {ecodes.EV_KEY: [ecodes.KEY_A]}, "kbd", 3)
+    assert smaller is first
+    pool.release(smaller)
+
+    grown = pool.acquire("/dev/input/event3", "keys", {ecodes.EV_KEY: [ecodes.KEY_C]}, "kbd", 3)
+    assert grown is not first and first.closed
+    assert grown.caps[ecodes.EV_KEY] == sorted([ecodes.KEY_A, ecodes.KEY_B, ecodes.KEY_C])
+    assert pool.stats() == {"pooled": 1, "idle": 0, "created": 2, "reused": 1}
+
+
+def test_prune_closes_idle_sinks_of_unmapped_sources(sink_factory):
+    pool = SinkPool(factory=sink_factory)
+    gone = pool.acquire("/dev/input/event4", "pointer", {ecodes.EV_REL: [ecodes.REL_WHEEL]}, "ptr", 3)
+    kept = pool.acquire("/dev/input/event5", "pointer", {ecodes.EV_REL: [ecodes.REL_WHEEL]}, "ptr", 3)
+    pool.release(gone)
+    pool.release(kept)
+
+    pool.prune(["/dev/input/event5"])
+
+    assert gone.closed and not kept.closed
+    assert pool.stats()["pooled"] == 1
+
+
+def test_mapper_stop_releases_synthetic_keys_on_pooled_sink(sink_factory):
+    from synapse_like.remap.actions import Action, ActionType
+    from synapse_like.remap.mapper import InputMapper, MappingConfig
+    from synapse_like.remap.macros import play_program
+
+    pool = SinkPool(factory=sink_factory)
+    mapper = InputMapper(
+        MappingConfig(
+            device_path="/dev/input/event6",
+            mappings={"KEY_F1": Action(ActionType.KEYSTROKE, {"key": "KEY_C", "modifiers": ["KEY_LEFTCTRL"]})},
+        ),
+        sink_pool=pool,
+    )
+    mapper._sink = pool.acquire("/dev/input/event6", "keys", {ecodes.EV_KEY: [ecodes.KEY_C]}, "kbd", 3)
+    mapper._bind_outputs()
+    output = mapper._key_output
+
+    mapper._handle_key_event(ecodes.KEY_F1, 1, None)
+    assert output.pressed == (1 << ecodes.KEY_LEFTCTRL) | (1 << ecodes.KEY_C)
+    sink = mapper._sink
+    mapper.stop()
+
+    released = [code for _, code, value in sink.events() if value == 0]
+    assert set(released[:2]) == {ecodes.KEY_C, ecodes.KEY_LEFTCTRL}
+    assert output.pressed == 0
+
+    # A macro still queued for the stopped mapper writes nothing.
+    before = len(sink.writes)
+    play_program(output, ((0.0, ecodes.KEY_A, 1),), sleep=lambda _: None)
+    assert len(sink.writes) == before
+
+
+def test_press_racing_detach_is_released_after_it_lands(sink_factory):
+    writing = threading.Event()
+    proceed = threading.Event()
+
+    class SlowSink(sink_factory):
+        def write(self, event_type, code, value):
+            if value == 1:
+                writing.set()
+                proceed.wait(1.0)
+            super().write(event_type, code, value)
+
+    sink = SlowSink()
+    output = MeteredSink(sink, MapperMetrics())
+    writer = threading.Thread(target=output.write, args=(ecodes.EV_KEY, ecodes.KEY_A, 1))
+    writer.start()
+    assert writing.wait(1.0)
+    detacher = threading.Thread(target=output.detach)
+    detacher.start()
+    detacher.join(0.05)
+    assert detacher.is_alive()  # waits for the press in flight
+    proceed.set()
+    writer.join(1.0)
+    detacher.join(1.0)
+
+    assert sink.events() == [(ecodes.EV_KEY, ecodes.KEY_A, 1), (ecodes.EV_KEY, ecodes.KEY_A, 0)]
+    output.write(ecodes.EV_KEY, ecodes.KEY_B, 1)
+    assert output.pressed == 0 and len(sink.events()) == 2
@@ -0,0 +1,73 @@
+import threading
+
+from synapse_like.core import storage
+from synapse_like.core.storage import CoalescingWriter, atomic_write_bytes, journal_versions, rollback
+from synapse_like.gui.profile_service import ProfileService
+from synapse_like.remap.actions import Action, ActionType
+
+
+def test_coalesced_saves_write_once_and_journal_allows_rollback(tmp_path):
+    path = tmp_path / "profile.json"
+    atomic_write_bytes(path, b"v1")
+
+    writer = CoalescingWriter(delay=60.0)
+    writer.submit(path, b"v2", journal_depth=2)
+    writer.submit(path, b"v3", journal_depth=2)
+    assert path.read_bytes() == b"v1"
+    assert writer.flush(timeout=5.0)
+
+    assert path.read_bytes() == b"v3"
+    assert [version.read_bytes() for version in journal_versions(path)] == [b"v1"]
+    assert rollback(path, journal_depth=2)
+    assert path.read_bytes() == b"v1"
+    assert [version.read_bytes() for version in journal_versions(path)] == [b"v3", b"v1"]
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_pending_profile_is_readable_before_it_reaches_disk(tmp_path):
+    service = ProfileService(profile_dir=tmp_path, writer=CoalescingWriter(delay=60.0))
+    path = service.save_named_profile(
+        name="Draft",
+        device_path="/dev/input/event1",
+        mappings={"KEY_F13": Action(ActionType.SCROLL_DOWN)},
+        dynamic_aliases={},
+        key_id_map={},
+        linked_apps=["gimp"],
+    )
+
+    assert not path.exists()
+    assert [profile.name for profile in service.list_profiles()] == ["Draft"]
+    assert service.load_named_profile("Draft")[1]["KEY_F13"].type == ActionType.SCROLL_DOWN
+
+    assert service.flush(timeout=5.0)
+    assert path.exists()
+    assert service.load_named_profile("Draft")[4] == ["gimp"]
+
+
+def test_concurrent_writes_to_one_path_use_separate_temporary_files(tmp_path, monkeypatch):
+    path = tmp_path / "profile.json"
+    both_written = threading.Barrier(2, timeout=5.0)
+    replace = storage.os.replace
+
+    def replace_together(source, target):
+        both_written.wait()
+        replace(source, target)
+
+    monkeypatch.setattr(storage.os, "replace", replace_together)
+    errors = []
+
+    def write(data):
+        try:
+            atomic_write_bytes(path, data, durable=False)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(data,)) for data in (b"sync", b"background")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert path.read_bytes() in (b"sync", b"background")
+    assert not list(tmp_path.glob(".*.tmp"))
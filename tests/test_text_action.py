@@ -0,0 +1,58 @@
+from evdev import ecodes
+
+from synapse_like.remap.actions import Action, ActionType
+from synapse_like.remap.macros import compile_macro, compile_text, play_program
+
+
+def test_text_compiles_with_shift_and_layout_specific_keys():
+    program = compile_text("A/", layout="br-abnt2", rate_cps=10)
+
+    assert [(code, value) for _, code, value in program] == [
+        (ecodes.KEY_LEFTSHIFT, 1),
+        (ecodes.KEY_A, 1),
+        (ecodes.KEY_A, 0),
+        (ecodes.KEY_LEFTSHIFT, 0),
+        (ecodes.KEY_RO, 1),
+        (ecodes.KEY_RO, 0),
+    ]
+    assert [delay for delay, _, _ in program if delay] == [0.1, 0.1]
+
+
+def test_unmapped_characters_use_unicode_input_fallback(sink):
+    play_program(sink, compile_text("é", layout="us"), sleep=lambda _: None)
+
+    pressed = [code for _, code, value in sink.events() if value == 1]
+    assert pressed == [
+        ecodes.KEY_LEFTCTRL,
+        ecodes.KEY_LEFTSHIFT,
+        ecodes.KEY_U,
+        ecodes.KEY_E,
+        ecodes.KEY_9,
+        ecodes.KEY_SPACE,
+    ]
+
+
+def test_text_action_roundtrip_and_required_codes():
+    action = Action.from_dict({"type": "text", "payload": {"text": "ok!", "rate_cps": 0}})
+
+    assert action.type == ActionType.TEXT
+    assert action.strategy.rate_cps == 1.0
+    assert set(action.strategy.required_key_codes()) == {
+        ecodes.KEY_O,
+        ecodes.KEY_K,
+        ecodes.KEY_1,
+        ecodes.KEY_LEFTSHIFT,
+    }
+    assert Action.from_dict(action.to_dict()).strategy.text == "ok!"
+
+
+def test_macro_delays_fold_into_next_step():
+    program = compile_macro(
+        [
+            {"type": "key", "code": "KEY_A", "state": 1},
+            {"type": "delay", "value": 25},
+            {"type": "key", "code": "KEY_A", "state": 0},
+        ]
+    )
+
+    assert program == ((0.0, ecodes.KEY_A, 1), (0.025, ecodes.KEY_A, 0))
@@ -0,0 +1,96 @@
+from evdev import ecodes
+
+from synapse_like.remap.actions import Action, ActionType
+from synapse_like.remap.mapper import MappingConfig
+from synapse_like.remap.timing import (
+    DEFAULT_CHORD_TIMEOUT_MS,
+    MAX_CHORD_TIMEOUT_MS,
+    TimingResolver,
+    parse_chords,
+)
+
+MS = 1_000_000
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, action, value):
+        self.events.append((action.strategy.key, value))
+
+    def replay(self, code, value):
+        self.events.append((code, value))
+
+
+def keystroke(name):
+    return Action(ActionType.KEYSTROKE, {"key": name})
+
+
+def dual_role():
+    return Action(
+        ActionType.TAP_HOLD,
+        {"tap": keystroke("KEY_ESC").to_dict(), "hold": keystroke("KEY_LEFTCTRL").to_dict(), "hold_ms": 200},
+    )
+
+
+def test_tap_hold_resolves_by_threshold_and_interrupting_key():
+    recorder = Recorder()
+    resolver = TimingResolver({}, recorder.emit, recorder.replay)
+    strategy = dual_role().strategy
+
+    resolver.start_tap_hold(ecodes.KEY_CAPSLOCK, strategy, 0)
+    assert resolver.timeout(50 * MS) == 0.15
+    assert resolver.intercept(ecodes.KEY_CAPSLOCK, 0, 120 * MS)
+    assert recorder.events == [("KEY_ESC", 1), ("KEY_ESC", 0)]
+
+    recorder.events.clear()
+    resolver.start_tap_hold(ecodes.KEY_CAPSLOCK, strategy, 1000 * MS)
+    resolver.expire(1250 * MS)
+    assert resolver.intercept(ecodes.KEY_CAPSLOCK, 0, 1300 * MS)
+    assert recorder.events == [("KEY_LEFTCTRL", 1), ("KEY_LEFTCTRL", 0)]
+
+    recorder.events.clear()
+    resolver.start_tap_hold(ecodes.KEY_CAPSLOCK, strategy, 2000 * MS)
+    assert not resolver.intercept(ecodes.KEY_C, 1, 2010 * MS)
+    assert recorder.events == [("KEY_LEFTCTRL", 1)]
+    assert resolver.next_deadline() is None
+
+
+def test_chord_completes_or_replays_buffered_keys_on_timeout():
+    recorder = Recorder()
+    chords = parse_chords({"KEY_J+KEY_K": keystroke("KEY_ESC")})
+    resolver = TimingResolver(chords, recorder.emit, recorder.replay, chord_timeout_ms=50)
+
+    assert not resolver.intercept(ecodes.KEY_A, 1, 0)
+    assert resolver.intercept(ecodes.KEY_J, 1, 0)
+    assert resolver.intercept(ecodes.KEY_K, 1, 20 * MS)
+    assert resolver.intercept(ecodes.KEY_J, 0, 60 * MS)
+    assert resolver.intercept(ecodes.KEY_K, 0, 61 * MS)
+    assert recorder.events == [("KEY_ESC", 1), ("KEY_ESC", 0)]
+
+    recorder.events.clear()
+    assert resolver.intercept(ecodes.KEY_J, 1, 100 * MS)
+    resolver.expire(151 * MS)
+    assert recorder.events == [(ecodes.KEY_J, 1)]
+    assert not resolver.intercept(ecodes.KEY_J, 0, 160 * MS)
+
+
+def test_mapper_replays_unmapped_chord_member_to_sink(make_mapper):
+    mapper = make_mapper(chords={"KEY_J+KEY_K": keystroke("KEY_ESC")})
+
+    assert mapper._handle_key_event(ecodes.KEY_J, 1, None)
+    assert not mapper._handle_key_event(ecodes.KEY_L, 1, None)
+    assert mapper._sink.events() == [(ecodes.EV_KEY, ecodes.KEY_J, 1)]
+
+
+def test_chord_timeout_is_parsed_defensively():
+    assert MappingConfig.from_dict({"device_path": "/dev/null", "chord_timeout_ms": "80"}).chord_timeout_ms == 80
+    for bad in ("soon", None, [1], float("inf")):
+        config = MappingConfig.from_dict({"device_path": "/dev/null", "chord_timeout_ms": bad})
+        assert config.chord_timeout_ms == DEFAULT_CHORD_TIMEOUT_MS
+    assert MappingConfig.from_dict({"device_path": "/dev/null", "chord_timeout_ms": -5}).chord_timeout_ms == 1
+    assert (
+        MappingConfig.from_dict({"device_path": "/dev/null", "chord_timeout_ms": 10**9}).chord_timeout_ms
+        == MAX_CHORD_TIMEOUT_MS
+    )
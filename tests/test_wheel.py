@@ -0,0 +1,66 @@
+from evdev import ecodes
+
+from synapse_like.remap.actions import Action, ActionType, ScrollDownActionStrategy, ScrollUpActionStrategy
+from synapse_like.remap.timing import WheelAnimator
+
+SYN = ("syn",)
+
+
+def test_hi_res_steps_accumulate_into_legacy_notches(sink):
+    strategy = ScrollUpActionStrategy(amount=60, hi_res=True)
+
+    state = {}
+    strategy.execute(sink, 1, state)
+    strategy.execute(sink, 2, state)
+
+    assert sink.writes == [
+        (ecodes.EV_REL, ecodes.REL_WHEEL_HI_RES, 60),
+        SYN,
+        (ecodes.EV_REL, ecodes.REL_WHEEL_HI_RES, 60),
+        (ecodes.EV_REL, ecodes.REL_WHEEL, 1),
+        SYN,
+    ]
+
+
+def test_horizontal_scroll_and_default_output_is_one_notch(sink):
+    ScrollDownActionStrategy(horizontal=True).execute(sink, 1, {})
+    ScrollDownActionStrategy().execute(sink, 1, {})
+
+    assert sink.writes == [(ecodes.EV_REL, ecodes.REL_HWHEEL, -1), SYN, (ecodes.EV_REL, ecodes.REL_WHEEL, -1), SYN]
+
+
+def test_smooth_burst_is_spread_across_frames(sink):
+    strategy = ScrollUpActionStrategy(amount=120, hi_res=True, smooth_frames=3)
+    animator = WheelAnimator(frame_ms=8)
+
+    animator.start(strategy, sink, {}, 0)
+    assert animator.next_deadline() == 8_000_000
+    animator.expire(8_000_000)
+    animator.expire(16_000_000)
+
+    hi_res = [value for _, code, value in sink.events() if code == ecodes.REL_WHEEL_HI_RES]
+    assert hi_res == [40, 40, 40]
+    assert (ecodes.EV_REL, ecodes.REL_WHEEL, 1) in sink.writes
+    assert animator.next_deadline() is None
+
+
+def test_pointer_caps_advertise_hi_res_axes(make_mapper):
+    mapper = make_mapper({"KEY_F13": Action(ActionType.SCROLL_UP, {"hi_res": True, "horizontal": True})})
+
+    rels = mapper._pointer_caps()[ecodes.EV_REL]
+    assert ecodes.REL_HWHEEL_HI_RES in rels
+    assert ecodes.REL_HWHEEL in rels
+
+
+def test_remainder_is_kept_per_mapper_not_on_the_shared_strategy(make_mapper):
+    action = Action(ActionType.SCROLL_UP, {"amount": 60, "hi_res": True})
+    first = make_mapper({"KEY_F13": action})
+    second = make_mapper({"KEY_F13": action})
+
+    for mapper in (first, second):
+        mapper._handle_action(action, 1)
+    assert not any(code == ecodes.REL_WHEEL for _, code, _ in first._pointer_sink.events())
+
+    first._handle_action(action, 1)
+    assert (ecodes.EV_REL, ecodes.REL_WHEEL, 1) in first._pointer_sink.events()
+    assert not any(code == ecodes.REL_WHEEL for _, code, _ in second._pointer_sink.events())